@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from .models import UserProfile, Wallet
+
+# Wallets every account gets on signup
+DEFAULT_WALLET_CURRENCIES = ('NGN', 'KES')
+
+
+class AccountProvisioningService:
+    """Create a user, their profile and default wallets in one transaction"""
+
+    @staticmethod
+    def split_name(full_name):
+        """Split a full name into (first_name, last_name)"""
+        parts = (full_name or '').split(' ')
+        return parts[0], ' '.join(parts[1:])
+
+    @staticmethod
+    def create_default_wallets(user):
+        """Insert any missing default wallets for user in a single query"""
+        Wallet.objects.bulk_create(
+            [Wallet(owner=user, currency=currency) for currency in DEFAULT_WALLET_CURRENCIES],
+            ignore_conflicts=True
+        )
+
+    @staticmethod
+    def provision_user(email, full_name, password_hash=None, verification_status='PENDING'):
+        """Create a new account and return (user, created).
+
+        password_hash must already be encoded (see PasswordHashingService);
+        without one the account gets an unusable password, as for Google
+        sign-ups. If another request registered the same email first, the
+        existing user is returned with created=False.
+        """
+        first_name, last_name = AccountProvisioningService.split_name(full_name)
+        user = User(
+            username=email,
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            password=password_hash or make_password(None)
+        )
+        # Wallets are created below, the post_save signal must not add them again
+        user._skip_default_wallets = True
+
+        try:
+            with transaction.atomic():
+                user.save()
+                UserProfile.objects.create(
+                    user=user,
+                    full_name=full_name,
+                    verification_status=verification_status
+                )
+                AccountProvisioningService.create_default_wallets(user)
+        except IntegrityError:
+            existing = User.objects.filter(email=email).first()
+            if existing is None:
+                raise
+            return existing, False
+
+        return user, True
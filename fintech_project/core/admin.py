@@ -1,7 +1,58 @@
+import json
+from django import forms
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from .models import Wallet, Transaction, KYCDocument, UserProfile, PaymentMethod, ExchangeRate
+from .models import Wallet, Transaction, KYCDocument, UserProfile, PaymentMethod, ExchangeRate, OutboundNotification, WalletReconciliation, BalanceHold, Transfer
+from .kyc_review import KYCReviewService
+from .balance_adjustments import BalanceAdjustmentService
+from .holds import BalanceHoldService
+from . import money
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that takes large counts from the Postgres planner.
+
+    An exact COUNT(*) reads every row. On Postgres the unfiltered count
+    comes from pg_class.reltuples and a filtered one from the EXPLAIN row
+    estimate, both of which are constant time. Small results, and other
+    databases, are counted exactly.
+    """
+
+    EXACT_BELOW = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return super().count
+
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+            else:
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            row = cursor.fetchone()
+
+        if queryset.query.where:
+            plan = json.loads(row[0]) if isinstance(row[0], str) else row[0]
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+        else:
+            estimate = row[0] if row else 0
+
+        if estimate < self.EXACT_BELOW:
+            return super().count
+        return estimate
+
 
 # Customize User admin to show email instead of username
 class CustomUserAdmin(UserAdmin):
@@ -41,6 +92,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user_email', 'full_name', 'country', 'verification_status', 'daily_limit', 'monthly_limit', 'created_at')
     list_filter = ('verification_status', 'country', 'created_at')
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'full_name')
+    list_select_related = ('user',)
     readonly_fields = ('created_at', 'updated_at')
     list_editable = ('verification_status', 'daily_limit', 'monthly_limit')
     actions = ['approve_users', 'reject_users', 'reset_limits', 'set_high_limits']
@@ -50,9 +102,8 @@ class UserProfileAdmin(admin.ModelAdmin):
     user_email.short_description = 'Email'
     
     def approve_users(self, request, queryset):
-        updated = queryset.update(verification_status='APPROVED')
-        for profile in queryset:
-            profile.update_limits()
+        daily_limit, monthly_limit = UserProfile.VERIFIED_LIMITS
+        updated = queryset.update(verification_status='APPROVED', daily_limit=daily_limit, monthly_limit=monthly_limit)
         self.message_user(request, f'{updated} users approved and limits updated.')
     approve_users.short_description = 'Approve selected users'
     
@@ -62,11 +113,9 @@ class UserProfileAdmin(admin.ModelAdmin):
     reject_users.short_description = 'Reject selected users'
     
     def reset_limits(self, request, queryset):
-        for profile in queryset:
-            profile.daily_limit = 100.00
-            profile.monthly_limit = 1000.00
-            profile.save()
-        self.message_user(request, f'Limits reset for {queryset.count()} users.')
+        daily_limit, monthly_limit = UserProfile.UNVERIFIED_LIMITS
+        updated = queryset.update(daily_limit=daily_limit, monthly_limit=monthly_limit)
+        self.message_user(request, f'Limits reset for {updated} users.')
     reset_limits.short_description = 'Reset to default limits'
     
     def set_high_limits(self, request, queryset):
@@ -77,32 +126,74 @@ class UserProfileAdmin(admin.ModelAdmin):
         self.message_user(request, f'High limits set for {queryset.count()} users.')
     set_high_limits.short_description = 'Set high limits VIP'
 
+class WalletAdminForm(forms.ModelForm):
+    """Wallet form that edits the balance in display units"""
+    balance = forms.DecimalField(max_digits=30, decimal_places=9, initial=0)
+    
+    class Meta:
+        model = Wallet
+        exclude = ('balance_minor', 'held_minor')
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial['balance'] = self.instance.balance
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('balance') is not None and cleaned_data.get('currency'):
+            try:
+                cleaned_data['balance_minor'] = money.to_minor(cleaned_data['balance'], cleaned_data['currency'])
+            except ValueError as e:
+                self.add_error('balance', str(e))
+            else:
+                if cleaned_data['balance_minor'] < self.instance.held_minor:
+                    self.add_error('balance', f'Balance cannot be below the {self.instance.held_balance} held for pending withdrawals')
+        return cleaned_data
+
 @admin.register(Wallet)
 class WalletAdmin(admin.ModelAdmin):
-    list_display = ('owner_email', 'currency', 'balance', 'deposit_address', 'created_at')
+    form = WalletAdminForm
+    list_display = ('owner_email', 'currency', 'balance', 'held_balance', 'deposit_address', 'created_at')
     list_filter = ('currency', 'created_at')
+    list_select_related = ('owner',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = ('owner__email', 'currency')
     readonly_fields = ('created_at',)
-    list_editable = ('balance',)
     actions = ['zero_balances', 'add_bonus_balance', 'freeze_wallets']
     
     def owner_email(self, obj):
         return obj.owner.email
     owner_email.short_description = 'Owner Email'
     
+    def held_balance(self, obj):
+        return obj.held_balance
+    held_balance.short_description = 'Held'
+    
+    def save_model(self, request, obj, form, change):
+        # Balance edits are booked as adjustments, never written directly
+        if 'balance' not in form.changed_data:
+            return super().save_model(request, obj, form, change)
+        if change:
+            other_fields = [name for name in form.changed_data if name != 'balance']
+            if other_fields:
+                obj.save(update_fields=other_fields)
+        else:
+            obj.save()
+        BalanceAdjustmentService.set_balance(obj.pk, form.cleaned_data['balance_minor'], 'Admin balance edit', request.user)
+        obj.balance_minor = form.cleaned_data['balance_minor']
+    
     def zero_balances(self, request, queryset):
-        updated = queryset.update(balance=0)
+        updated = BalanceAdjustmentService.zero(queryset, 'Admin: zero balance', request.user)
         self.message_user(request, f'{updated} wallet balances set to zero.')
     zero_balances.short_description = 'Zero selected wallet balances'
     
     def add_bonus_balance(self, request, queryset):
-        for wallet in queryset:
-            if wallet.currency in ['NGN', 'KES']:
-                wallet.balance += 1000  # Add 1000 fiat
-            else:
-                wallet.balance += 0.001  # Add small crypto amount
-            wallet.save()
-        self.message_user(request, f'Bonus balance added to {queryset.count()} wallets.')
+        credited = BalanceAdjustmentService.credit(
+            queryset, BalanceAdjustmentService.bonus_amounts(), 'Admin: bonus balance', request.user
+        )
+        self.message_user(request, f'Bonus balance added to {credited} wallets.')
     add_bonus_balance.short_description = 'Add bonus balance'
     
     def freeze_wallets(self, request, queryset):
@@ -113,7 +204,12 @@ class WalletAdmin(admin.ModelAdmin):
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('wallet_owner_email', 'wallet_currency', 'type', 'amount', 'counterparty', 'created_at')
-    list_filter = ('type', 'wallet__currency', 'created_at')
+    list_filter = ('type', 'wallet__currency')
+    list_select_related = ('wallet__owner',)
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = ('wallet__owner__email', 'counterparty')
     readonly_fields = ('created_at',)
     
@@ -127,44 +223,46 @@ class TransactionAdmin(admin.ModelAdmin):
 
 @admin.register(KYCDocument)
 class KYCDocumentAdmin(admin.ModelAdmin):
-    list_display = ('user_email', 'doc_type', 'country', 'status', 'confidence_score', 'created_at')
-    list_filter = ('status', 'doc_type', 'country', 'created_at')
-    search_fields = ('user__email', 'doc_type')
-    readonly_fields = ('created_at', 'confidence_score', 'extracted_data')
-    list_editable = ('status',)
+    list_display = ('preview', 'user_email', 'doc_type', 'country', 'status', 'confidence_score', 'duplicate_of', 'created_at')
+    list_filter = ('status', 'doc_type', 'country', ('duplicate_of', admin.EmptyFieldListFilter), 'created_at')
+    search_fields = ('user__email', 'doc_type', 'content_sha256')
+    list_select_related = ('user', 'duplicate_of__user')
+    readonly_fields = ('review_preview', 'created_at', 'confidence_score', 'extracted_data', 'content_sha256', 'perceptual_hash', 'duplicate_of')
+    exclude = ('phash_band_0', 'phash_band_1', 'phash_band_2', 'phash_band_3', 'thumbnail', 'review_image')
     actions = ['approve_kyc', 'reject_kyc', 'reset_to_pending', 'bulk_approve_high_confidence']
     
     def user_email(self, obj):
         return obj.user.email
     user_email.short_description = 'User Email'
     
+    def preview(self, obj):
+        if not obj.thumbnail:
+            return '-'
+        return format_html('<img src="{}" style="max-height:60px">', obj.thumbnail.url)
+    
+    def review_preview(self, obj):
+        if not obj.review_image:
+            return '-'
+        return format_html('<a href="{}"><img src="{}" style="max-width:800px"></a>', obj.document.url, obj.review_image.url)
+    review_preview.short_description = 'Document'
+    
+    def save_model(self, request, obj, form, change):
+        # Decisions go through the review service, which updates the owner's profile
+        decisions = {status: action for action, status in KYCReviewService.DECISIONS.items()}
+        if not change or 'status' not in form.changed_data or obj.status not in decisions:
+            return super().save_model(request, obj, form, change)
+        other_fields = [name for name in form.changed_data if name != 'status']
+        if other_fields:
+            obj.save(update_fields=other_fields)
+        KYCReviewService.decide(KYCDocument.objects.filter(pk=obj.pk), decisions[obj.status], request.user)
+    
     def approve_kyc(self, request, queryset):
-        from django.utils import timezone
-        updated = 0
-        for kyc in queryset:
-            kyc.status = 'APPROVED'
-            kyc.reviewed_by = request.user
-            kyc.reviewed_at = timezone.now()
-            kyc.save()
-            
-            # Update user profile
-            profile, created = UserProfile.objects.get_or_create(user=kyc.user)
-            profile.verification_status = 'APPROVED'
-            if kyc.country:
-                profile.country = kyc.country
-            profile.update_limits()
-            updated += 1
-        
+        updated = KYCReviewService.decide(queryset, 'approve', request.user)
         self.message_user(request, f'{updated} KYC documents approved and user profiles updated.')
     approve_kyc.short_description = 'Approve selected KYC documents'
     
     def reject_kyc(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(
-            status='REJECTED',
-            reviewed_by=request.user,
-            reviewed_at=timezone.now()
-        )
+        updated = KYCReviewService.decide(queryset, 'reject', request.user)
         self.message_user(request, f'{updated} KYC documents rejected.')
     reject_kyc.short_description = 'Reject selected KYC documents'
     
@@ -174,23 +272,8 @@ class KYCDocumentAdmin(admin.ModelAdmin):
     reset_to_pending.short_description = 'Reset to pending status'
     
     def bulk_approve_high_confidence(self, request, queryset):
-        from django.utils import timezone
         high_confidence = queryset.filter(confidence_score__gte=80.0)
-        updated = 0
-        for kyc in high_confidence:
-            kyc.status = 'APPROVED'
-            kyc.reviewed_by = request.user
-            kyc.reviewed_at = timezone.now()
-            kyc.save()
-            
-            # Update user profile
-            profile, created = UserProfile.objects.get_or_create(user=kyc.user)
-            profile.verification_status = 'APPROVED'
-            if kyc.country:
-                profile.country = kyc.country
-            profile.update_limits()
-            updated += 1
-        
+        updated = KYCReviewService.decide(high_confidence, 'approve', request.user)
         self.message_user(request, f'{updated} high-confidence KYC documents approved.')
     bulk_approve_high_confidence.short_description = 'Approve high confidence documents'
 
@@ -199,6 +282,7 @@ class PaymentMethodAdmin(admin.ModelAdmin):
     list_display = ('user_email', 'method_type', 'account_number', 'bank_name', 'is_active', 'created_at')
     list_filter = ('method_type', 'is_active', 'created_at')
     search_fields = ('user__email', 'account_number', 'bank_name')
+    list_select_related = ('user',)
     
     def user_email(self, obj):
         return obj.user.email
@@ -208,4 +292,100 @@ class PaymentMethodAdmin(admin.ModelAdmin):
 class ExchangeRateAdmin(admin.ModelAdmin):
     list_display = ('from_currency', 'to_currency', 'rate', 'updated_at')
     list_filter = ('from_currency', 'to_currency', 'updated_at')
-    search_fields = ('from_currency', 'to_currency')
\ No newline at end of file
+    search_fields = ('from_currency', 'to_currency')
+
+@admin.register(WalletReconciliation)
+class WalletReconciliationAdmin(admin.ModelAdmin):
+    list_display = ('wallet', 'status', 'balance', 'ledger_total', 'difference', 'last_transaction_id', 'checked_at')
+    list_filter = ('status', 'wallet__currency')
+    list_select_related = ('wallet__owner',)
+    search_fields = ('wallet__owner__email',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def balance(self, obj):
+        return money.format_minor(obj.balance_minor, obj.wallet.currency)
+    
+    def ledger_total(self, obj):
+        return money.format_minor(obj.ledger_total_minor, obj.wallet.currency)
+    
+    def difference(self, obj):
+        return money.format_minor(obj.difference_minor, obj.wallet.currency)
+    
+    # Written only by the reconcile_wallets command
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(BalanceHold)
+class BalanceHoldAdmin(admin.ModelAdmin):
+    list_display = ('wallet', 'type', 'amount', 'status', 'counterparty', 'reference', 'created_at', 'resolved_at')
+    list_filter = ('status', 'type', 'wallet__currency')
+    list_select_related = ('wallet__owner',)
+    search_fields = ('wallet__owner__email', 'counterparty', 'reference')
+    ordering = ('-created_at',)
+    actions = ['capture_holds', 'release_holds']
+    
+    # Holds hold no editable state; operators resolve them with the actions
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def capture_holds(self, request, queryset):
+        # Transfer holds are captured by settle_transfers, which also credits the recipient
+        captured = sum(
+            1 for hold in queryset.filter(status='HELD', type='WITHDRAW')
+            if BalanceHoldService.capture(hold, metadata={'captured_by': request.user.email})
+        )
+        self.message_user(request, f'{captured} holds captured.')
+    capture_holds.short_description = 'Capture selected holds (payout went through)'
+    
+    def release_holds(self, request, queryset):
+        released = sum(
+            1 for hold in queryset.filter(status='HELD')
+            if BalanceHoldService.release(hold, reason=f'Released by {request.user.email}')
+        )
+        self.message_user(request, f'{released} holds released.')
+    release_holds.short_description = 'Release selected holds (payout failed)'
+
+@admin.register(Transfer)
+class TransferAdmin(admin.ModelAdmin):
+    list_display = ('id', 'sender', 'recipient', 'amount', 'status', 'error', 'created_at', 'settled_at')
+    list_filter = ('status', 'sender__currency')
+    list_select_related = ('sender__owner', 'recipient__owner')
+    search_fields = ('sender__owner__email', 'recipient__owner__email')
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    # Written only through TransferService
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(OutboundNotification)
+class OutboundNotificationAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'channel', 'kind', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'channel', 'kind')
+    search_fields = ('recipient',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    exclude = ('payload',)
+    actions = ['retry_notifications']
+    
+    def retry_notifications(self, request, queryset):
+        from django.utils import timezone
+        # Dead-lettered rows whose code was redacted have nothing left to send
+        retryable = queryset.exclude(status='SENT').exclude(status='DEAD', payload__has_key='redacted')
+        updated = retryable.update(status='PENDING', attempts=0, next_attempt_at=timezone.now())
+        skipped = queryset.filter(status='DEAD', payload__has_key='redacted').count()
+        message = f'{updated} notifications queued for retry.'
+        if skipped:
+            message += f' {skipped} dead-lettered notifications had their contents removed and were skipped.'
+        self.message_user(request, message)
+    retry_notifications.short_description = 'Retry selected notifications'
\ No newline at end of file
@@ -1,6 +1,7 @@
 import requests
 import json
 from django.conf import settings
+from django.utils import timezone
 
 class AlternativeEmailService:
     """Alternative email service using EmailJS or similar service"""
@@ -79,11 +80,10 @@ class AlternativeEmailService:
         """Generate magic link for passwordless login"""
         from django.utils.http import urlsafe_base64_encode
         from django.utils.encoding import force_bytes
-        import hashlib
+        from .otp_service import OTPService
         
         # Create a secure token
-        token_data = f"{email}:{code}:{settings.SECRET_KEY}"
-        token = hashlib.sha256(token_data.encode()).hexdigest()[:32]
+        token = OTPService.link_token('login', email, code)
         
         # Encode email for URL
         email_b64 = urlsafe_base64_encode(force_bytes(email))
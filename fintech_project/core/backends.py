@@ -1,14 +1,29 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from .password_service import PasswordHashingService
 
 User = get_user_model()
 
 class EmailBackend(ModelBackend):
+    """Log in by email (or username), checking the password on the hashing pool.
+
+    This is the only backend: ModelBackend would hash a wrong password a
+    second time, on the request thread. Once the user is found a wrong
+    password raises PermissionDenied, so no other backend is tried either.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        # Provisioning sets username=email; the seeded admin logs in by username
+        user = User.objects.filter(Q(email=username) | Q(username=username)).order_by('id').first()
+        if user is None:
             return None
-        return None
\ No newline at end of file
+        if PasswordHashingService.verify(user, password) and self.user_can_authenticate(user):
+            return user
+        raise PermissionDenied
@@ -0,0 +1,131 @@
+import uuid
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F
+from . import money
+from .models import Wallet, Transaction
+
+
+class BalanceAdjustmentService:
+    """Operator balance adjustments (promotions, corrections, write-offs).
+
+    Every adjustment moves the balance with an atomic UPDATE and writes a
+    matching ADJUSTMENT ledger entry in the same transaction, so wallet
+    balances always equal the sum of their transactions. Work is done in
+    chunks of wallets: each chunk is a few statements however many wallets
+    it holds, and no transaction stays open for the whole run. Entries
+    from one run share a batch id in their metadata.
+    """
+
+    CHUNK_SIZE = 2000
+
+    FIAT_CURRENCIES = ('NGN', 'KES')
+    FIAT_BONUS = Decimal('1000')
+    CRYPTO_BONUS = Decimal('0.001')
+
+    @staticmethod
+    def bonus_amounts():
+        """Per-currency amounts for the admin 'Add bonus balance' action"""
+        return {
+            currency: (BalanceAdjustmentService.FIAT_BONUS if currency in BalanceAdjustmentService.FIAT_CURRENCIES
+                       else BalanceAdjustmentService.CRYPTO_BONUS)
+            for currency, _ in Wallet.CURRENCY_CHOICES
+        }
+
+    @staticmethod
+    def _chunks(queryset, chunk_size):
+        """(id, currency) lists for the wallets in queryset, by keyset on id"""
+        rows = queryset.order_by('id').values_list('id', 'currency')
+        last_id = 0
+        while True:
+            chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return
+            last_id = chunk[-1][0]
+            yield chunk
+
+    @staticmethod
+    def _entry(wallet_id, amount_minor, reason, actor, batch):
+        return Transaction(
+            wallet_id=wallet_id,
+            type='ADJUSTMENT',
+            amount_minor=amount_minor,
+            counterparty=reason,
+            metadata={
+                'reason': reason,
+                'adjusted_by': actor.email if actor else None,
+                'batch': batch,
+            }
+        )
+
+    @staticmethod
+    def credit(queryset, amounts, reason, actor=None, chunk_size=None):
+        """Add amounts[currency] to every wallet in queryset, returning how many were credited.
+
+        Amounts are in display units (Decimal('1000') NGN). Wallets whose
+        currency is not in amounts are left alone; negative amounts debit.
+        """
+        amounts = {currency: money.to_minor(amount, currency) for currency, amount in amounts.items() if amount}
+        batch = uuid.uuid4().hex
+        credited = 0
+
+        for chunk in BalanceAdjustmentService._chunks(queryset, chunk_size or BalanceAdjustmentService.CHUNK_SIZE):
+            by_currency = {}
+            for wallet_id, currency in chunk:
+                if currency in amounts:
+                    by_currency.setdefault(currency, []).append(wallet_id)
+
+            with transaction.atomic():
+                entries = []
+                for currency, wallet_ids in by_currency.items():
+                    amount = amounts[currency]
+                    Wallet.objects.filter(id__in=wallet_ids).update(balance_minor=F('balance_minor') + amount)
+                    entries.extend(
+                        BalanceAdjustmentService._entry(wallet_id, amount, reason, actor, batch)
+                        for wallet_id in wallet_ids
+                    )
+                Transaction.objects.bulk_create(entries)
+            credited += len(entries)
+
+        return credited
+
+    @staticmethod
+    def zero(queryset, reason, actor=None, chunk_size=None):
+        """Set every wallet's available balance to zero, booking the removed amount; returns wallets changed.
+
+        Funds held for pending withdrawals stay, so those holds can still be captured.
+        """
+        batch = uuid.uuid4().hex
+        changed = 0
+
+        for chunk in BalanceAdjustmentService._chunks(queryset, chunk_size or BalanceAdjustmentService.CHUNK_SIZE):
+            with transaction.atomic():
+                # Locked so the booked amount is exactly what was removed
+                balances = list(
+                    Wallet.objects
+                    .select_for_update()
+                    .filter(id__in=[wallet_id for wallet_id, _ in chunk])
+                    .exclude(balance_minor=F('held_minor'))
+                    .values_list('id', 'balance_minor', 'held_minor')
+                )
+                if not balances:
+                    continue
+                Wallet.objects.filter(id__in=[wallet_id for wallet_id, _, _ in balances]).update(balance_minor=F('held_minor'))
+                Transaction.objects.bulk_create([
+                    BalanceAdjustmentService._entry(wallet_id, held - balance, reason, actor, batch)
+                    for wallet_id, balance, held in balances
+                ])
+            changed += len(balances)
+
+        return changed
+
+    @staticmethod
+    def set_balance(wallet_id, balance_minor, reason, actor=None):
+        """Set one wallet's balance in minor units, booking the difference; returns the difference"""
+        with transaction.atomic():
+            current = Wallet.objects.select_for_update().values_list('balance_minor', flat=True).get(id=wallet_id)
+            delta = balance_minor - current
+            if delta:
+                Wallet.objects.filter(id=wallet_id).update(balance_minor=balance_minor)
+                BalanceAdjustmentService._entry(wallet_id, delta, reason, actor, uuid.uuid4().hex).save()
+        return delta
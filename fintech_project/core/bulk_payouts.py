@@ -0,0 +1,274 @@
+import csv
+import json
+import uuid
+import tempfile
+from collections import defaultdict
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from . import money
+from .holds import BalanceHoldService
+from .models import Wallet, BalanceHold, PaymentGateway, WithdrawalRequest
+from .security import FinancialValidator
+
+
+class BulkPayoutService:
+    """Mass payouts (payroll, refunds) from an uploaded CSV or NDJSON file.
+
+    The upload is parsed as a stream, CHUNK_SIZE rows at a time. Each row
+    is validated, and then a single transaction holds the funds for the
+    chunk's valid rows and bulk_creates their WithdrawalRequests. Memory
+    and the number of transactions depend on the chunk size, not on the
+    file. Rows draw on the available balance in file order; a row it no
+    longer covers is rejected, and later, smaller rows may still go
+    through.
+
+    Every row's WithdrawalRequest carries an idempotency key, the upload's
+    key plus the row number. Uploading the same file again with the same
+    key reports the rows already created as duplicates instead of paying
+    them twice.
+
+    process() yields one result per row and a final summary. run()
+    processes the whole upload before returning those results, which the
+    API then streams back as NDJSON.
+    """
+
+    CHUNK_SIZE = 1000
+
+    # Results of larger uploads are spooled to a temporary file
+    RESULTS_IN_MEMORY = 1024 * 1024
+
+    FORMATS = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+
+    COLUMNS = ('currency', 'amount', 'destination')  # plus an optional 'reference'
+
+    @staticmethod
+    def format_for(content_type):
+        """Input format for a request Content-Type, or None"""
+        for name, mime in BulkPayoutService.FORMATS.items():
+            if content_type == mime:
+                return name
+        return None
+
+    @staticmethod
+    def _text(lines):
+        for number, line in enumerate(lines):
+            try:
+                text = line.decode('utf-8')
+            except UnicodeDecodeError:
+                raise ValueError("File must be UTF-8 encoded")
+            yield text.lstrip('\ufeff') if number == 0 else text
+
+    @staticmethod
+    def parse(lines, input_format):
+        """(row_number, row dict or None, error) for each row of an iterable of byte lines.
+
+        Raises ValueError when the file as a whole is unusable (encoding,
+        missing CSV columns).
+        """
+        text = BulkPayoutService._text(lines)
+        if input_format == 'csv':
+            reader = csv.DictReader(text)
+            missing = [column for column in BulkPayoutService.COLUMNS if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+            for row_number, row in enumerate(reader, start=1):
+                yield row_number, row, None
+            return
+
+        row_number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield row_number, None, 'Invalid JSON'
+                continue
+            if not isinstance(row, dict):
+                yield row_number, None, 'Row must be a JSON object'
+                continue
+            yield row_number, row, None
+
+    @staticmethod
+    def gateways():
+        """{currency: active PaymentGateway} from the gateways' supported_currencies"""
+        by_currency = {}
+        for gateway in PaymentGateway.objects.filter(is_active=True).order_by('id'):
+            for currency in gateway.config.get('supported_currencies', []):
+                by_currency.setdefault(currency, gateway)
+        return by_currency
+
+    @staticmethod
+    def validate(row, wallets, gateways):
+        """(wallet, amount_minor, destination, gateway) for a row; ValueError if it cannot be paid"""
+        currency = str(row.get('currency') or '').strip().upper()
+        if currency not in money.SCALES:
+            raise ValueError(f"Unsupported currency: {currency}")
+        wallet = wallets.get(currency)
+        if wallet is None:
+            raise ValueError(f"{currency} wallet not found")
+        gateway = gateways.get(currency)
+        if gateway is None:
+            raise ValueError(f"No payout gateway for {currency}")
+
+        amount = str(row.get('amount') or '').strip()
+        destination = str(row.get('destination') or '').strip()
+        if not destination or len(destination) > 255:
+            raise ValueError("Destination required (at most 255 characters)")
+        try:
+            FinancialValidator.validate_amount(amount, currency)
+            FinancialValidator.validate_payout_destination(destination, currency)
+        except ValidationError as e:
+            raise ValueError(e.messages[0])
+        return wallet, money.parse_amount(amount, currency), destination, gateway
+
+    @staticmethod
+    def _flush(user, chunk, batch):
+        """Hold funds and create WithdrawalRequests for a chunk.
+
+        Returns its results in row order and the WithdrawalRequests created.
+        """
+        results = {row_number: {'row': row_number, 'status': 'rejected', 'error': error}
+                   for row_number, valid, reference, error in chunk if error}
+        keys = {row_number: f"{batch}:{row_number}" for row_number, valid, reference, error in chunk if not error}
+        wallets = {}
+        by_wallet = defaultdict(list)
+        for row_number, valid, reference, error in chunk:
+            if not error:
+                wallets[valid[0].id] = valid[0]
+                by_wallet[valid[0].id].append((row_number, valid, reference))
+
+        with transaction.atomic():
+            # Wallet rows are locked in id order, as everywhere else. This
+            # also makes a retry wait for a still-running upload of the
+            # same rows before it looks for them
+            list(Wallet.objects.select_for_update().filter(id__in=by_wallet).order_by('id').values_list('id', flat=True))
+            done = set(
+                WithdrawalRequest.objects
+                .filter(user=user, idempotency_key__in=keys.values())
+                .values_list('idempotency_key', flat=True)
+            )
+
+            requests = []
+            for wallet_id in sorted(by_wallet):
+                items = [item for item in by_wallet[wallet_id] if keys[item[0]] not in done]
+                holds = [
+                    BalanceHold(
+                        amount_minor=amount_minor,
+                        type='WITHDRAW',
+                        counterparty=destination,
+                        metadata={'batch': batch, 'row': row_number},
+                    )
+                    for row_number, (wallet, amount_minor, destination, gateway), reference in items
+                ]
+                placed = {id(hold) for hold in BalanceHoldService.place_many(wallets[wallet_id], holds)}
+                for (row_number, (wallet, amount_minor, destination, gateway), reference), hold in zip(items, holds):
+                    if id(hold) not in placed:
+                        results[row_number] = {'row': row_number, 'status': 'rejected', 'error': 'Insufficient balance'}
+                        continue
+                    requests.append(WithdrawalRequest(
+                        user=user,
+                        wallet=wallet,
+                        amount_minor=amount_minor,
+                        gateway=gateway,
+                        destination=destination,
+                        hold=hold,
+                        idempotency_key=keys[row_number],
+                        metadata={'batch': batch, 'row': row_number, 'reference': reference},
+                    ))
+            WithdrawalRequest.objects.bulk_create(requests)
+
+            # Read back by key: not every backend returns ids from bulk_create
+            ids = dict(
+                WithdrawalRequest.objects
+                .filter(user=user, idempotency_key__in=keys.values())
+                .values_list('idempotency_key', 'id')
+            )
+
+        for row_number, key in keys.items():
+            if row_number not in results:
+                status = 'duplicate' if key in done else 'accepted'
+                results[row_number] = {'row': row_number, 'status': status, 'withdrawal_id': ids[key]}
+        return [results[row_number] for row_number in sorted(results)], requests
+
+    @staticmethod
+    def process(user, lines, input_format, batch=None, chunk_size=None):
+        """Generate result dicts for an upload of byte lines.
+
+        batch is the upload's idempotency key; without one the upload
+        cannot be safely retried.
+        """
+        chunk_size = chunk_size or BulkPayoutService.CHUNK_SIZE
+        max_rows = settings.BULK_PAYOUT_MAX_ROWS
+        batch = batch or uuid.uuid4().hex
+        wallets = {wallet.currency: wallet for wallet in Wallet.objects.filter(owner=user)}
+        gateways = BulkPayoutService.gateways()
+        counts = {'rows': 0, 'accepted': 0, 'duplicate': 0, 'rejected': 0}
+        totals = defaultdict(int)
+        chunk = []
+
+        def flush():
+            results, created = BulkPayoutService._flush(user, chunk, batch)
+            chunk.clear()
+            for result in results:
+                counts[result['status']] += 1
+            for request in created:
+                totals[request.wallet.currency] += request.amount_minor
+            return results
+
+        # Reported after the rows read so far have been processed
+        fatal = None
+        rows = BulkPayoutService.parse(lines, input_format)
+        while True:
+            try:
+                row_number, row, error = next(rows)
+            except StopIteration:
+                break
+            except ValueError as e:
+                fatal = str(e)
+                break
+            if row_number > max_rows:
+                fatal = f"Files are limited to {max_rows} rows; the rest was not processed"
+                break
+
+            valid = reference = None
+            if not error:
+                try:
+                    valid = BulkPayoutService.validate(row, wallets, gateways)
+                    reference = str(row.get('reference') or '')[:255]
+                except ValueError as e:
+                    error = str(e)
+            chunk.append((row_number, valid, reference, error))
+            counts['rows'] += 1
+
+            if len(chunk) >= chunk_size:
+                yield from flush()
+
+        if chunk:
+            yield from flush()
+        if fatal:
+            yield {'error': fatal}
+        yield {
+            'done': True,
+            'batch': batch,
+            **counts,
+            'totals': {currency: money.format_minor(total, currency) for currency, total in totals.items()},
+        }
+
+    @staticmethod
+    def run(user, lines, input_format, batch=None, chunk_size=None):
+        """Process a whole upload now; returns its NDJSON results as a rewound text file.
+
+        Nothing is left to the response, so a client that disconnects
+        while the results stream back cannot leave the upload half-applied.
+        """
+        results = tempfile.SpooledTemporaryFile(max_size=BulkPayoutService.RESULTS_IN_MEMORY, mode='w+')
+        for result in BulkPayoutService.process(user, lines, input_format, batch, chunk_size):
+            results.write(json.dumps(result) + '\n')
+        results.seek(0)
+        return results
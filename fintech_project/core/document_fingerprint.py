@@ -0,0 +1,82 @@
+"""Exact and perceptual fingerprints of uploaded documents.
+
+The SHA-256 identifies byte-identical re-uploads. The 64-bit difference
+hash (dHash) survives re-encoding and resizing, so it also matches a
+re-saved, recompressed or scaled copy of the same image file. It is not
+meant to match a new photo of the same ID: framing, lighting and angle
+move the hash well past MAX_DISTANCE bits.
+
+The dHash is stored as four 16-bit bands. Two hashes within
+``BAND_COUNT - 1`` bits of each other must agree exactly on at least one
+band (pigeonhole), so near-duplicates are found with four indexed
+equality lookups rather than a scan of every document.
+
+dhash() decodes the image, so it runs in the KYC worker processes,
+under their memory cap; the file hash is a plain read.
+"""
+import hashlib
+from .image_preprocessing import MAX_PIXELS
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+HASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = HASH_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Largest distance the band lookup is guaranteed to find
+MAX_DISTANCE = BAND_COUNT - 1
+
+
+def file_sha256(file, chunk_size=1024 * 1024):
+    """Hex SHA-256 of a file object or path, read in chunks"""
+    digest = hashlib.sha256()
+    if isinstance(file, str):
+        with open(file, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(chunk_size), b''):
+                digest.update(chunk)
+    else:
+        file.seek(0)
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+        file.seek(0)
+    return digest.hexdigest()
+
+
+def dhash(source, max_pixels=MAX_PIXELS):
+    """64-bit difference hash: brightness gradients of a 9x8 thumbnail"""
+    image = Image.open(source)
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ValueError(f"Image too large to fingerprint: {width}x{height}")
+    # JPEGs decode at 1/8 scale; the hash only needs a few pixels
+    image.draft('L', (64, 64))
+    pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def to_hex(value):
+    return f'{value:016x}'
+
+
+def from_hex(value):
+    return int(value, 16)
+
+
+def bands(value):
+    """Split a 64-bit hash into BAND_COUNT integers, most significant first"""
+    return [(value >> (BAND_BITS * (BAND_COUNT - 1 - i))) & BAND_MASK for i in range(BAND_COUNT)]
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
@@ -0,0 +1,59 @@
+"""Reduced-size renditions of KYC document images for reviewers.
+
+Kept free of Django imports: rendering runs inside the KYC worker
+processes and returns encoded bytes; the parent stores them.
+"""
+import io
+import os
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# name -> (longest side in pixels, encoder quality)
+RENDITIONS = {
+    'thumb': (320, 70),
+    'review': (1600, 80),
+}
+
+
+ENCODER_OPTIONS = {
+    'WEBP': {'method': 4},
+    'JPEG': {'optimize': True, 'progressive': True},
+}
+
+
+def output_format():
+    """WebP where Pillow was built with it, JPEG otherwise"""
+    if Image and features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def rendition_name(original_name, rendition, extension):
+    """Storage name next to the original: kyc/abc.jpg -> kyc/abc.thumb.webp"""
+    root, _ = os.path.splitext(original_name)
+    return f"{root}.{rendition}.{extension}"
+
+
+def render(source):
+    """Encode every rendition of an image, returning {name: (bytes, extension)}"""
+    image_format, extension = output_format()
+    largest = max(size for size, _ in RENDITIONS.values())
+
+    image = Image.open(source)
+    # Decode JPEGs at a reduced scale; no rendition needs full resolution
+    image.draft('RGB', (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    renditions = {}
+    # Largest first so each smaller one is resized from the previous one
+    for name, (size, quality) in sorted(RENDITIONS.items(), key=lambda item: -item[1][0]):
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, image_format, quality=quality, **ENCODER_OPTIONS[image_format])
+        renditions[name] = (buffer.getvalue(), extension)
+    return renditions
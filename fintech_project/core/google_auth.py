@@ -1,13 +1,165 @@
 import os
+import re
+import json
+import time
+import hashlib
+import threading
 import requests
 from django.contrib.auth.models import User
 from django.conf import settings
-from .models import UserProfile, Wallet
+from django.core.cache import cache
+from .account_service import AccountProvisioningService
+
+try:
+    import jwt
+    from jwt.algorithms import RSAAlgorithm
+except ImportError:
+    # RS256 verification needs PyJWT with the cryptography backend
+    jwt = None
+    RSAAlgorithm = None
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+
+class GoogleKeySet:
+    """Google's ID-token signing keys, cached in-process.
+
+    Keys are kept for the max-age Google sends with the JWKS and refreshed in
+    a background thread shortly before they expire, so steady-state
+    verification never waits on the network. A blocking fetch only happens
+    on a cold start or when a token names a key we have not seen yet.
+
+    Fetches of either kind happen at most once per min_refresh_interval.
+    If they keep failing, the last good keys are still served for
+    stale_grace seconds past their expiry.
+    """
+
+    def __init__(self, url, refresh_margin=300, min_refresh_interval=60, stale_grace=6 * 3600):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self.stale_grace = stale_grace
+        self._keys = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def load(self, jwks, max_age=3600):
+        """Install a JWKS document (dict) as the current key set"""
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            if jwk.get('kty') == 'RSA' and jwk.get('kid'):
+                keys[jwk['kid']] = RSAAlgorithm.from_jwk(json.dumps(jwk))
+        with self._lock:
+            self._keys = keys
+            self._expires_at = time.time() + max_age
+
+    def refresh(self):
+        """Fetch the JWKS from Google, honouring Cache-Control max-age"""
+        self._last_fetch = time.time()
+        response = requests.get(self.url, timeout=10)
+        response.raise_for_status()
+
+        max_age = 3600
+        match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+        if match:
+            max_age = int(match.group(1))
+
+        self.load(response.json(), max_age)
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Google JWKS background refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name='google-jwks-refresh', daemon=True).start()
+
+    def get_key(self, kid):
+        """Return the public key for kid, or None if Google doesn't know it"""
+        now = time.time()
+        key = self._keys.get(kid)
+        throttled = now - self._last_fetch < self.min_refresh_interval
+
+        if key is not None and now < self._expires_at + self.stale_grace:
+            # Refresh ahead of expiry, or retry a failed refresh, without
+            # making this request wait
+            if now > self._expires_at - self.refresh_margin and not throttled:
+                self._refresh_in_background()
+            return key
+
+        # Cold cache, a rotated-in kid or keys past the grace period: fetch
+        # synchronously, but don't let unknown kids or an unreachable
+        # Google turn into a request per sign-in
+        if not throttled:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Google JWKS fetch failed: {e}")
+        if time.time() >= self._expires_at + self.stale_grace:
+            return None
+        return self._keys.get(kid)
+
 
 class GoogleAuthService:
+    key_set = GoogleKeySet(settings.GOOGLE_JWKS_URL)
+
+    @staticmethod
+    def verify_id_token(id_token):
+        """Verify a Google ID token locally against the cached signing keys"""
+        if jwt is None or RSAAlgorithm is None:
+            print("Google ID token verification unavailable: PyJWT[crypto] not installed")
+            return None
+
+        if not settings.GOOGLE_CLIENT_ID:
+            print("Google ID token verification requires GOOGLE_CLIENT_ID")
+            return None
+
+        try:
+            header = jwt.get_unverified_header(id_token)
+            key = GoogleAuthService.key_set.get_key(header.get('kid'))
+            if key is None:
+                return None
+
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=['RS256'],
+                audience=settings.GOOGLE_CLIENT_ID,
+                issuer=GOOGLE_ISSUERS,
+            )
+
+            return {
+                'email': claims.get('email'),
+                'name': claims.get('name'),
+                'picture': claims.get('picture'),
+                'verified_email': claims.get('email_verified', False)
+            }
+
+        except jwt.PyJWTError as e:
+            print(f"Google ID token rejected: {e}")
+            return None
+        except Exception as e:
+            print(f"Google ID token verification failed: {e}")
+            return None
+
     @staticmethod
     def verify_google_token(token):
         """Verify Google OAuth token and return user info"""
+        cache_key = f"google_token_{hashlib.sha256(token.encode()).hexdigest()}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached or None
+        
         try:
             # Verify token with Google
             response = requests.get(
@@ -16,6 +168,7 @@ class GoogleAuthService:
             )
             
             if response.status_code != 200:
+                cache.set(cache_key, {}, settings.GOOGLE_TOKEN_NEGATIVE_TTL)
                 return None
                 
             token_info = response.json()
@@ -27,17 +180,25 @@ class GoogleAuthService:
             )
             
             if profile_response.status_code != 200:
+                cache.set(cache_key, {}, settings.GOOGLE_TOKEN_NEGATIVE_TTL)
                 return None
                 
             user_info = profile_response.json()
             
-            return {
+            result = {
                 'email': user_info.get('email'),
                 'name': user_info.get('name'),
                 'picture': user_info.get('picture'),
                 'verified_email': user_info.get('verified_email', False)
             }
             
+            # Never cache past the token's own expiry
+            ttl = min(settings.GOOGLE_TOKEN_CACHE_TTL, int(token_info.get('expires_in', 0)))
+            if ttl > 0:
+                cache.set(cache_key, result, ttl)
+            
+            return result
+            
         except Exception as e:
             print(f"Google token verification failed: {e}")
             return None
@@ -56,29 +217,9 @@ class GoogleAuthService:
             except User.DoesNotExist:
                 pass
             
-            # Create new user
-            user = User.objects.create_user(
-                username=email,
-                email=email,
-                first_name=name.split(' ')[0] if name else '',
-                last_name=' '.join(name.split(' ')[1:]) if name and len(name.split(' ')) > 1 else ''
-            )
-            
-            # Create profile - Google users are auto-verified for email
-            UserProfile.objects.create(
-                user=user,
-                full_name=name,
-                verification_status='PENDING'  # Still need KYC for full verification
-            )
-            
-            # Create default NGN wallet
-            Wallet.objects.create(
-                owner=user,
-                currency='NGN',
-                balance=0
-            )
-            
-            return user, True
+            # Create user, profile and default wallets - Google users are
+            # auto-verified for email but still need KYC for full verification
+            return AccountProvisioningService.provision_user(email, name, verification_status='PENDING')
             
         except Exception as e:
             print(f"Error creating Google user: {e}")
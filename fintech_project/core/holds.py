@@ -0,0 +1,119 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Wallet, Transaction, BalanceHold
+
+
+class InsufficientFunds(Exception):
+    """Raised when a wallet's available balance cannot cover a hold"""
+
+
+class BalanceHoldService:
+    """Reserve funds before an external call, then capture or release them.
+
+    place() is one conditional UPDATE: it raises held_minor only if the
+    available balance (balance_minor - held_minor) covers the amount, so
+    concurrent spends cannot both succeed and nothing stays locked while
+    the provider is called. capture() turns the hold into the ledger entry
+    and debits the balance; release() just gives the funds back. Both are
+    guarded on the hold still being HELD, so each hold resolves once.
+    """
+
+    @staticmethod
+    def place(wallet, amount_minor, type, counterparty='', metadata=None):
+        """Hold amount_minor on wallet; raises InsufficientFunds"""
+        if amount_minor <= 0:
+            raise ValueError("Hold amount must be greater than 0")
+
+        with transaction.atomic():
+            reserved = (
+                Wallet.objects
+                .filter(id=wallet.id, balance_minor__gte=F('held_minor') + amount_minor)
+                .update(held_minor=F('held_minor') + amount_minor)
+            )
+            if not reserved:
+                raise InsufficientFunds("Insufficient balance")
+            return BalanceHold.objects.create(
+                wallet=wallet,
+                amount_minor=amount_minor,
+                type=type,
+                counterparty=counterparty,
+                metadata=metadata or {},
+            )
+
+    @staticmethod
+    def place_many(wallet, holds):
+        """Place unsaved BalanceHolds on wallet in order while the available balance covers them.
+
+        One locked read and one UPDATE however many holds there are.
+        Returns the placed (saved) holds, with their ids; the ones that did
+        not fit are left unsaved.
+        """
+        with transaction.atomic():
+            locked = Wallet.objects.select_for_update().only('balance_minor', 'held_minor').get(id=wallet.id)
+            available = locked.balance_minor - locked.held_minor
+            placed = []
+            for hold in holds:
+                if 0 < hold.amount_minor <= available:
+                    available -= hold.amount_minor
+                    hold.wallet_id = wallet.id
+                    placed.append(hold)
+            if placed:
+                Wallet.objects.filter(id=wallet.id).update(
+                    held_minor=F('held_minor') + sum(hold.amount_minor for hold in placed)
+                )
+                if connection.features.can_return_rows_from_bulk_insert:
+                    BalanceHold.objects.bulk_create(placed)
+                else:
+                    # bulk_create would leave the ids unset (MySQL)
+                    for hold in placed:
+                        hold.save()
+        return placed
+
+    @staticmethod
+    def _resolve(hold, status, **fields):
+        """Move hold from HELD to status; False if it was already resolved"""
+        resolved_at = timezone.now()
+        updated = (
+            BalanceHold.objects
+            .filter(id=hold.id, status='HELD')
+            .update(status=status, resolved_at=resolved_at, **fields)
+        )
+        if updated:
+            hold.status = status
+            hold.resolved_at = resolved_at
+            for name, value in fields.items():
+                setattr(hold, name, value)
+        return bool(updated)
+
+    @staticmethod
+    def capture(hold, reference='', metadata=None):
+        """Debit the held funds and write the ledger entry; returns the Transaction, or None if already resolved"""
+        metadata = {**hold.metadata, **(metadata or {})}
+        with transaction.atomic():
+            if not BalanceHoldService._resolve(hold, 'CAPTURED', reference=reference, metadata=metadata):
+                return None
+            Wallet.objects.filter(id=hold.wallet_id).update(
+                balance_minor=F('balance_minor') - hold.amount_minor,
+                held_minor=F('held_minor') - hold.amount_minor,
+            )
+            entry = Transaction.objects.create(
+                wallet_id=hold.wallet_id,
+                type=hold.type,
+                amount_minor=-hold.amount_minor,
+                counterparty=hold.counterparty,
+                metadata=metadata,
+            )
+            BalanceHold.objects.filter(id=hold.id).update(transaction=entry)
+            hold.transaction = entry
+        return entry
+
+    @staticmethod
+    def release(hold, reason=''):
+        """Return the held funds to the available balance; False if already resolved"""
+        metadata = {**hold.metadata, 'release_reason': reason} if reason else hold.metadata
+        with transaction.atomic():
+            if not BalanceHoldService._resolve(hold, 'RELEASED', metadata=metadata):
+                return False
+            Wallet.objects.filter(id=hold.wallet_id).update(held_minor=F('held_minor') - hold.amount_minor)
+        return True
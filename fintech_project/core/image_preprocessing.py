@@ -0,0 +1,137 @@
+"""Image preparation for OCR.
+
+Kept free of Django imports: it runs inside the KYC worker processes.
+"""
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def limit_worker_memory(max_megabytes):
+    """Cap the address space of the current (worker) process.
+
+    Used as a ProcessPoolExecutor initializer so a single oversized upload
+    fails with MemoryError instead of taking the whole host down. The limit
+    is inherited by the tesseract subprocess.
+    """
+    if not resource or not max_megabytes:
+        return
+    limit = max_megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+# Largest image any worker decodes; checked from the header first
+MAX_PIXELS = 40_000_000
+
+
+class OCRImagePreprocessor:
+    """Turn an uploaded photo into a small, clean, upright bitonal image.
+
+    ID cards and passport pages need roughly 300 DPI for tesseract, which
+    is under 2000 pixels on the long side; phone photos are often three
+    times that. JPEGs are decoded straight at a reduced scale (draft mode)
+    so the full-resolution bitmap never exists in memory, other formats are
+    refused above ``max_pixels`` before decoding.
+    """
+
+    def __init__(self, target_long_side=1800, max_pixels=MAX_PIXELS, deskew=True,
+                 max_skew=5.0, skew_step=0.5):
+        self.target_long_side = target_long_side
+        self.max_pixels = max_pixels
+        self.deskew = deskew
+        self.max_skew = max_skew
+        self.skew_step = skew_step
+
+    def prepare(self, source):
+        """Return a grayscale, binarized and deskewed image for OCR"""
+        image = Image.open(source)
+
+        width, height = image.size
+        if width * height > self.max_pixels:
+            raise ValueError(f"Image too large for OCR: {width}x{height}")
+
+        # JPEG only: pick the smallest DCT scale that is still >= target
+        scale = min(1.0, self.target_long_side / max(width, height))
+        image.draft('L', (int(width * scale), int(height * scale)))
+
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('L')
+        image.thumbnail((self.target_long_side, self.target_long_side), Image.LANCZOS)
+        image = ImageOps.autocontrast(image, cutoff=1)
+
+        if self.deskew:
+            angle = self.estimate_skew(image)
+            if angle:
+                image = image.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)
+
+        threshold = self.otsu_threshold(image.histogram())
+        return image.point([0 if level <= threshold else 255 for level in range(256)])
+
+    @staticmethod
+    def otsu_threshold(histogram):
+        """Gray level that best separates ink from paper (Otsu's method)"""
+        total = sum(histogram)
+        weighted_total = sum(level * count for level, count in enumerate(histogram))
+
+        best_threshold = 127
+        best_variance = 0.0
+        background = 0
+        weighted_background = 0
+
+        for level, count in enumerate(histogram):
+            background += count
+            if background == 0:
+                continue
+            foreground = total - background
+            if foreground == 0:
+                break
+
+            weighted_background += level * count
+            mean_background = weighted_background / background
+            mean_foreground = (weighted_total - weighted_background) / foreground
+            variance = background * foreground * (mean_background - mean_foreground) ** 2
+
+            if variance > best_variance:
+                best_variance = variance
+                best_threshold = level
+
+        return best_threshold
+
+    def estimate_skew(self, image):
+        """Angle (degrees) that makes text lines horizontal.
+
+        Text rows produce sharp peaks in the horizontal projection profile
+        when they are level, so we rotate a small copy through the allowed
+        range and keep the angle whose row profile has the highest variance.
+        The profile comes from resizing to a single column (BOX filter
+        averages each row), which keeps this in C.
+        """
+        sample = image.copy()
+        sample.thumbnail((600, 600))
+        threshold = self.otsu_threshold(sample.histogram())
+        # Ink white on black so rotation padding adds nothing to the profile
+        ink = sample.point([255 if level <= threshold else 0 for level in range(256)])
+
+        best_angle = 0.0
+        best_score = -1.0
+        steps = int(self.max_skew / self.skew_step)
+
+        for step in range(-steps, steps + 1):
+            angle = step * self.skew_step
+            rotated = ink.rotate(angle, resample=Image.NEAREST, expand=True) if angle else ink
+            rows = list(rotated.resize((1, rotated.height), Image.BOX).getdata())
+            mean = sum(rows) / len(rows)
+            score = sum((value - mean) ** 2 for value in rows)
+            if score > best_score:
+                best_score = score
+                best_angle = angle
+
+        return best_angle
@@ -0,0 +1,338 @@
+import logging
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import KYCDocument
+from .kyc_service import KYCVerificationService
+from .kyc_review import KYCReviewService
+from . import document_fingerprint
+from . import kyc_rules
+from . import document_renditions
+
+logger = logging.getLogger(__name__)
+
+
+class KYCJobService:
+    """Background OCR processing for uploaded KYC documents.
+
+    Uploads are saved as QUEUED and return immediately. The
+    ``process_kyc_jobs`` worker claims queued documents in batches, runs
+    extraction on a process pool (OCR is CPU-bound, so it scales with
+    cores) and applies the results from the parent process, which is the
+    only one touching the database.
+
+    Each document is fingerprinted first: an exact re-upload reuses the
+    cached extraction (minus the OCR text) instead of running OCR again,
+    and a perceptual match with another account's document blocks
+    auto-approval. The perceptual hash, thumbnail and review-size
+    renditions are computed on the same pool.
+    """
+
+    BATCH_SIZE = 20
+    LEASE_SECONDS = 600  # a PROCESSING document is re-queued after this
+    DUPLICATE_CANDIDATES = 200  # band matches checked per document
+    MAX_POOL_CRASHES = 3  # times a document may be in flight when the pool dies
+
+    # Written by apply_result; status only ever changes through a conditional update
+    RESULT_FIELDS = [
+        'extracted_data', 'confidence_score', 'processing_status', 'processed_at', 'country', 'duplicate_of',
+        'content_sha256', 'perceptual_hash', 'phash_band_0', 'phash_band_1', 'phash_band_2', 'phash_band_3',
+    ]
+
+    # rendition name -> KYCDocument field
+    RENDITION_FIELDS = {'thumb': 'thumbnail', 'review': 'review_image'}
+
+    @staticmethod
+    def claim_batch(batch_size=None):
+        """Mark up to batch_size queued documents as PROCESSING and return them"""
+        now = timezone.now()
+        stale = now - timedelta(seconds=KYCJobService.LEASE_SECONDS)
+
+        with transaction.atomic():
+            ids = list(
+                KYCDocument.objects
+                .select_for_update(skip_locked=True)
+                .filter(Q(processing_status='QUEUED') |
+                        Q(processing_status='PROCESSING', processing_started_at__lt=stale))
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size or KYCJobService.BATCH_SIZE]
+            )
+            KYCDocument.objects.filter(id__in=ids).update(
+                processing_status='PROCESSING',
+                processing_started_at=now
+            )
+
+        return list(KYCDocument.objects.filter(id__in=ids).select_related('user').order_by('id'))
+
+    @staticmethod
+    def fingerprint(doc):
+        """Set the SHA-256 field on doc (not saved)"""
+        with doc.document.open('rb') as f:
+            doc.content_sha256 = document_fingerprint.file_sha256(f)
+
+    @staticmethod
+    def set_perceptual_hash(doc, value):
+        """Set the perceptual hash fields on doc from a dhash() value (not saved)"""
+        doc.perceptual_hash = document_fingerprint.to_hex(value)
+        for i, band in enumerate(document_fingerprint.bands(value)):
+            setattr(doc, f'phash_band_{i}', band)
+
+    @staticmethod
+    def cacheable(doc, result):
+        """result as cached for re-uploads: without the OCR text, which is PII.
+
+        apply_result only reads the text to detect the country, so that is
+        worked out now and cached instead.
+        """
+        cached = {key: value for key, value in result.items() if key != 'raw_text'}
+        cached['text_country'] = KYCVerificationService.determine_country_from_document(
+            result.get('raw_text', ''), doc.doc_type
+        )
+        return cached
+
+    @staticmethod
+    def cache_key(doc):
+        # Extraction depends on the document type, country and rules as well as the image
+        return f"kyc_ocr_{kyc_rules.RULES_VERSION}_{doc.content_sha256}_{doc.doc_type}_{doc.country or ''}"
+
+    @staticmethod
+    def find_duplicate(doc):
+        """Another account's document whose image matches doc, or None"""
+        if not doc.perceptual_hash:
+            return None
+
+        value = document_fingerprint.from_hex(doc.perceptual_hash)
+        # Any match within MAX_DISTANCE bits shares at least one band exactly
+        band_filter = Q()
+        for i, band in enumerate(document_fingerprint.bands(value)):
+            band_filter |= Q(**{f'phash_band_{i}': band})
+
+        candidates = (
+            KYCDocument.objects
+            .filter(band_filter)
+            .exclude(user_id=doc.user_id)
+            .only('id', 'perceptual_hash')
+            .order_by('id')[:KYCJobService.DUPLICATE_CANDIDATES]
+        )
+        for candidate in candidates:
+            distance = document_fingerprint.hamming(value, document_fingerprint.from_hex(candidate.perceptual_hash))
+            if distance <= document_fingerprint.MAX_DISTANCE:
+                return candidate
+        return None
+
+    @staticmethod
+    def decide(doc):
+        """Auto-approval decision for doc's current extraction: (approve, reason)"""
+        should_approve, reason = KYCVerificationService.auto_approve_kyc(
+            doc.extracted_data,
+            doc.confidence_score,
+            doc.doc_type
+        )
+        if should_approve and doc.duplicate_of_id:
+            return False, f"Image matches KYC document {doc.duplicate_of_id} from another account"
+        return should_approve, reason
+
+    @staticmethod
+    def apply_result(doc, result):
+        """Store an extraction result on doc and auto-approve if it qualifies"""
+        doc.duplicate_of = KYCJobService.find_duplicate(doc)
+
+        if result['success']:
+            doc.extracted_data = result['extracted_data']
+            doc.confidence_score = result['confidence_score']
+            doc.processing_status = 'DONE'
+
+            # Auto-detect country if not provided
+            if not doc.country:
+                # Passport MRZ carries the issuing state
+                detected_country = result['extracted_data'].get('issuing_country')
+                if not detected_country or len(detected_country) != 2:
+                    if 'text_country' in result:
+                        detected_country = result['text_country']
+                    else:
+                        detected_country = KYCVerificationService.determine_country_from_document(
+                            result.get('raw_text', ''), doc.doc_type
+                        )
+                if detected_country:
+                    doc.country = detected_country
+
+            # Real verification criteria
+            should_approve, reason = KYCJobService.decide(doc)
+            if not should_approve:
+                # Requires manual review
+                print(f"KYC requires manual review: {reason}")
+        else:
+            # OCR failed - manual review required
+            should_approve = False
+            doc.processing_status = 'FAILED'
+            doc.extracted_data = {'error': result.get('error', 'OCR processing failed')}
+            doc.confidence_score = 0.0
+            print(f"KYC OCR failed: {result.get('error')}")
+
+        doc.processed_at = timezone.now()
+        with transaction.atomic():
+            # Only what extraction produced: a reviewer may have claimed or
+            # decided the document while it was being processed
+            doc.save(update_fields=KYCJobService.RESULT_FIELDS)
+            if should_approve:
+                approved = KYCDocument.objects.filter(pk=doc.pk, status='PENDING').update(
+                    status='APPROVED', reviewed_at=doc.processed_at
+                )
+                if approved:
+                    doc.status, doc.reviewed_at = 'APPROVED', doc.processed_at
+                    # Update user profile only if truly verified
+                    KYCReviewService.update_profiles(KYCDocument.objects.filter(id=doc.id), 'APPROVED')
+
+    @staticmethod
+    def requeue(docs):
+        """Put documents that were in flight when the worker pool died back in the queue.
+
+        One of them may be what killed it (a segfault, or the memory cap);
+        a document caught in MAX_POOL_CRASHES crashes is failed for manual
+        review instead of taking the pool down forever.
+        """
+        retry = []
+        for doc in docs:
+            key = f"kyc_pool_crash_{doc.id}"
+            crashes = cache.get(key, 0) + 1
+            cache.set(key, crashes, 24 * 3600)
+            if crashes >= KYCJobService.MAX_POOL_CRASHES:
+                KYCJobService._store(doc, {'success': False, 'error': 'OCR worker crashed on this document'})
+            else:
+                retry.append(doc.id)
+        KYCDocument.objects.filter(id__in=retry, processing_status='PROCESSING').update(
+            processing_status='QUEUED',
+            processing_started_at=None
+        )
+
+    @staticmethod
+    def process_batch(executor, batch_size=None):
+        """Run one claimed batch through executor, returning how many were handled.
+
+        Raises BrokenProcessPool, after re-queueing the affected documents,
+        when a worker process died; the caller needs a new executor.
+        """
+        docs = KYCJobService.claim_batch(batch_size)
+        if not docs:
+            return 0
+
+        results = []
+        futures = {}
+        hash_futures = {}
+        render_futures = {}
+        broken = []
+
+        def with_hash(doc):
+            """Wait for doc's perceptual hash; False if the pool died computing it"""
+            future = hash_futures.pop(doc.id, None)
+            if future is None:
+                return True
+            try:
+                KYCJobService.set_perceptual_hash(doc, future.result())
+            except BrokenProcessPool:
+                broken.append(doc)
+                return False
+            except Exception as e:
+                logger.warning(f"Could not fingerprint KYC document {doc.id}: {e}")
+            return True
+
+        for doc in docs:
+            if document_renditions.Image and not doc.thumbnail:
+                try:
+                    render_futures[executor.submit(document_renditions.render, doc.document.path)] = doc
+                except Exception as e:
+                    logger.warning(f"Could not queue renditions for KYC document {doc.id}: {e}")
+
+            try:
+                KYCJobService.fingerprint(doc)
+            except Exception as e:
+                logger.warning(f"Could not fingerprint KYC document {doc.id}: {e}")
+
+            # Decoding the image is done by the workers, under their memory cap
+            if document_fingerprint.Image:
+                try:
+                    hash_futures[doc.id] = executor.submit(document_fingerprint.dhash, doc.document.path)
+                except BrokenProcessPool:
+                    broken.append(doc)
+                    continue
+                except Exception as e:
+                    logger.warning(f"Could not fingerprint KYC document {doc.id}: {e}")
+
+            # Same bytes, type and country as an earlier upload: skip OCR
+            cached = cache.get(KYCJobService.cache_key(doc)) if doc.content_sha256 else None
+            if cached:
+                results.append((doc, cached))
+                continue
+
+            try:
+                future = executor.submit(
+                    KYCVerificationService.extract_document_data,
+                    doc.document.path,
+                    doc.doc_type,
+                    doc.country
+                )
+            except BrokenProcessPool:
+                broken.append(doc)
+                continue
+            except Exception as e:
+                results.append((doc, {'success': False, 'error': str(e)}))
+                continue
+            futures[future] = doc
+
+        for doc, result in results:
+            if with_hash(doc):
+                KYCJobService._store(doc, result)
+
+        for future in as_completed(futures):
+            doc = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                broken.append(doc)
+                continue
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+
+            if not with_hash(doc):
+                continue
+            if result['success'] and doc.content_sha256:
+                cache.set(KYCJobService.cache_key(doc), KYCJobService.cacheable(doc, result), settings.KYC_OCR_CACHE_TTL)
+            KYCJobService._store(doc, result)
+
+        # After apply_result has saved each document, so the rendition
+        # fields are written by a targeted update and not overwritten
+        for future in as_completed(render_futures):
+            doc = render_futures[future]
+            try:
+                KYCJobService.store_renditions(doc, future.result())
+            except Exception as e:
+                logger.warning(f"Could not render KYC document {doc.id}: {e}")
+
+        if broken:
+            KYCJobService.requeue(broken)
+            raise BrokenProcessPool(f"KYC worker pool died with {len(broken)} documents in flight")
+        return len(docs)
+
+    @staticmethod
+    def store_renditions(doc, renditions):
+        """Save rendered images next to doc's original and record them"""
+        updates = {}
+        for name, (data, extension) in renditions.items():
+            target = document_renditions.rendition_name(doc.document.name, name, extension)
+            field = KYCJobService.RENDITION_FIELDS[name]
+            updates[field] = doc.document.storage.save(target, ContentFile(data))
+            setattr(doc, field, updates[field])
+        KYCDocument.objects.filter(id=doc.id).update(**updates)
+
+    @staticmethod
+    def _store(doc, result):
+        try:
+            KYCJobService.apply_result(doc, result)
+        except Exception as e:
+            logger.exception(f"Failed to store KYC result for document {doc.id}: {e}")
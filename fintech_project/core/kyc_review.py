@@ -0,0 +1,196 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Q, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import KYCDocument, UserProfile
+
+
+class KYCReviewService:
+    """Manual KYC review queue, claim-based assignment and decisions.
+
+    A reviewer claims a document before deciding on it. Claims are a
+    conditional UPDATE, so two reviewers can never both hold the same
+    document, and they expire after CLAIM_SECONDS so an abandoned claim
+    returns the document to the queue.
+
+    Decisions are set-based: approving or rejecting any number of
+    documents is a fixed handful of UPDATEs, whether it comes from the
+    review API, an admin bulk action or the OCR worker.
+    """
+
+    CLAIM_SECONDS = 900
+
+    DECISIONS = {'approve': 'APPROVED', 'reject': 'REJECTED'}
+
+    # Confidence bands for filtering; 70 is the auto-approval threshold
+    CONFIDENCE_BANDS = {
+        'low': (None, 50.0),
+        'medium': (50.0, 70.0),
+        'high': (70.0, None),
+    }
+
+    QUEUE_FIELDS = (
+        'id', 'doc_type', 'country', 'confidence_score', 'status', 'processing_status',
+        'document', 'thumbnail', 'review_image', 'duplicate_of', 'claimed_at', 'created_at',
+        'user__email', 'assigned_to__email',
+    )
+
+    @staticmethod
+    def _claim_available(reviewer):
+        """Documents that are unclaimed, whose claim expired, or held by reviewer"""
+        stale = timezone.now() - timedelta(seconds=KYCReviewService.CLAIM_SECONDS)
+        return Q(assigned_to__isnull=True) | Q(claimed_at__lt=stale) | Q(assigned_to=reviewer)
+
+    @staticmethod
+    def queue(status='PENDING', confidence_band=None, country=None, doc_type=None,
+              assignment=None, reviewer=None):
+        """Review queue queryset, oldest first, with only the columns a list needs"""
+        queryset = KYCDocument.objects.filter(status=status)
+
+        if confidence_band:
+            if confidence_band not in KYCReviewService.CONFIDENCE_BANDS:
+                raise ValueError(f"Unknown confidence band: {confidence_band}")
+            low, high = KYCReviewService.CONFIDENCE_BANDS[confidence_band]
+            if low is not None:
+                queryset = queryset.filter(confidence_score__gte=low)
+            if high is not None:
+                queryset = queryset.filter(confidence_score__lt=high)
+        if country:
+            queryset = queryset.filter(country=country)
+        if doc_type:
+            queryset = queryset.filter(doc_type=doc_type)
+
+        if assignment == 'mine':
+            queryset = queryset.filter(assigned_to=reviewer)
+        elif assignment == 'available':
+            queryset = queryset.filter(KYCReviewService._claim_available(reviewer))
+        elif assignment:
+            raise ValueError(f"Unknown assignment filter: {assignment}")
+
+        return (
+            queryset
+            .select_related('user', 'assigned_to')
+            .only(*KYCReviewService.QUEUE_FIELDS)
+            .order_by('created_at', 'id')
+        )
+
+    @staticmethod
+    def claim(doc_id, reviewer):
+        """Claim (or renew a claim on) a pending document; False if someone else holds it"""
+        updated = (
+            KYCDocument.objects
+            .filter(KYCReviewService._claim_available(reviewer), id=doc_id, status='PENDING')
+            .update(assigned_to=reviewer, claimed_at=timezone.now())
+        )
+        return updated == 1
+
+    @staticmethod
+    def claim_next(reviewer, queryset):
+        """Claim the oldest available document in queryset, or return None"""
+        with transaction.atomic():
+            doc_id = (
+                queryset
+                .filter(KYCReviewService._claim_available(reviewer), status='PENDING')
+                .exclude(assigned_to=reviewer)
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list('id', flat=True)
+                .first()
+            )
+            if doc_id is None or not KYCReviewService.claim(doc_id, reviewer):
+                return None
+        return doc_id
+
+    @staticmethod
+    def release(doc_id, reviewer):
+        """Give up reviewer's claim on a document"""
+        updated = (
+            KYCDocument.objects
+            .filter(id=doc_id, assigned_to=reviewer)
+            .update(assigned_to=None, claimed_at=None)
+        )
+        return updated == 1
+
+    @staticmethod
+    def held_by_other(doc, reviewer):
+        """True if doc has an unexpired claim by someone other than reviewer"""
+        if not doc.assigned_to_id or doc.assigned_to_id == reviewer.id:
+            return False
+        stale = timezone.now() - timedelta(seconds=KYCReviewService.CLAIM_SECONDS)
+        return doc.claimed_at is not None and doc.claimed_at >= stale
+
+    @staticmethod
+    def decide(queryset, action, reviewer=None):
+        """Approve or reject every document in queryset, returning how many changed.
+
+        Documents and their owners' profiles (status, country, limits) are
+        updated together in one transaction.
+        """
+        if action not in KYCReviewService.DECISIONS:
+            raise ValueError(f"Unknown KYC action: {action}")
+        status = KYCReviewService.DECISIONS[action]
+        now = timezone.now()
+
+        with transaction.atomic():
+            # Locked, so these are exactly the rows the UPDATE changes
+            ids = list(
+                KYCDocument.objects
+                .select_for_update()
+                .filter(pk__in=queryset.values('pk'))
+                .values_list('id', flat=True)
+            )
+            if not ids:
+                return 0
+            KYCDocument.objects.filter(id__in=ids).update(
+                status=status,
+                reviewed_by=reviewer,
+                reviewed_at=now,
+                assigned_to=None,
+                claimed_at=None
+            )
+            KYCReviewService.update_profiles(KYCDocument.objects.filter(id__in=ids), status)
+
+        return len(ids)
+
+    @staticmethod
+    def update_profiles(documents, verification_status):
+        """Set the verification status and limits of the owners of documents.
+
+        Missing profiles are created first. On approval the profile country
+        is taken from the owner's most recent document that has one. An
+        owner who still has another approved document is not downgraded.
+        """
+        owners = User.objects.filter(id__in=documents.values('user_id'))
+        if verification_status != 'APPROVED':
+            owners = owners.exclude(kyc_documents__status='APPROVED')
+        owners = owners.values('id')
+
+        missing = list(
+            User.objects.filter(id__in=owners, profile__isnull=True).values_list('id', flat=True)
+        )
+        if missing:
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id) for user_id in missing],
+                ignore_conflicts=True,
+                batch_size=500
+            )
+
+        daily_limit, monthly_limit = UserProfile.limits_for(verification_status)
+        changes = {
+            'verification_status': verification_status,
+            'daily_limit': daily_limit,
+            'monthly_limit': monthly_limit,
+            'updated_at': timezone.now(),
+        }
+        if verification_status == 'APPROVED':
+            latest_country = (
+                documents
+                .filter(user_id=OuterRef('user_id'), country__isnull=False)
+                .exclude(country='')
+                .order_by('-id')
+                .values('country')[:1]
+            )
+            changes['country'] = Coalesce(Subquery(latest_country), F('country'))
+
+        return UserProfile.objects.filter(user_id__in=owners).update(**changes)
@@ -0,0 +1,132 @@
+import queue
+import smtplib
+import threading
+import time
+import logging
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Rejections of a single message; the connection that raised them is fine
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+class SMTPConnectionPool:
+    """A small pool of authenticated SMTP connections.
+
+    Opening a connection costs a TCP handshake, STARTTLS and LOGIN, which
+    is most of the time spent sending a single verification email. The pool
+    keeps up to ``size`` connections open and hands them out one sender at
+    a time. Connections idle for longer than ``max_idle`` seconds are
+    checked with NOOP before reuse, and a send that fails because the
+    server dropped the connection is retried once on a fresh one.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True,
+                 size=2, timeout=10, max_idle=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, server):
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self):
+        """Take an open connection, reusing an idle one when possible"""
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used < self.max_idle or self._is_alive(server):
+                return server
+            self._close(server)
+
+    def send(self, from_addr, to_addrs, message):
+        """Send an already-rendered message through a pooled connection"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise smtplib.SMTPException("Timed out waiting for an SMTP connection")
+
+        try:
+            for attempt in range(2):
+                server = self._checkout() if attempt == 0 else self._connect()
+                try:
+                    server.sendmail(from_addr, to_addrs, message)
+                except MESSAGE_ERRORS:
+                    self._idle.put((server, time.monotonic()))
+                    raise
+                except OSError as e:
+                    # Dropped or broken connection (SMTPException is an OSError)
+                    self._close(server)
+                    if attempt:
+                        raise
+                    logger.info(f"SMTP connection failed ({e}), retrying on a new one")
+                    continue
+
+                self._idle.put((server, time.monotonic()))
+                return
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool():
+    """Process-wide SMTP pool configured from the EMAIL_* settings"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool(
+                    settings.EMAIL_HOST,
+                    settings.EMAIL_PORT,
+                    username=settings.EMAIL_HOST_USER,
+                    password=settings.EMAIL_HOST_PASSWORD,
+                    use_tls=settings.EMAIL_USE_TLS,
+                    size=settings.EMAIL_POOL_SIZE,
+                    timeout=settings.EMAIL_TIMEOUT,
+                )
+    return _pool
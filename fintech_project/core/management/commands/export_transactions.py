@@ -0,0 +1,40 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from core.transaction_export import TransactionExportService
+
+
+class Command(BaseCommand):
+    help = 'Export transactions as CSV or NDJSON to a file or stdout, in constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format', choices=list(TransactionExportService.FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--user', help='Owner email or user id')
+        parser.add_argument('--currency')
+        parser.add_argument('--type')
+        parser.add_argument('--from', dest='date_from', help='Start date or datetime (inclusive)')
+        parser.add_argument('--to', dest='date_to', help='End date or datetime (a bare date includes that day)')
+        parser.add_argument('--chunk-size', type=int, default=TransactionExportService.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            queryset = TransactionExportService.queryset(
+                user=options['user'],
+                currency=options['currency'],
+                type=options['type'],
+                date_from=options['date_from'],
+                date_to=options['date_to']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = TransactionExportService.chunks(queryset, options['export_format'], options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        with open(options['output'], 'w', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,58 @@
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.image_preprocessing import limit_worker_memory
+from core.kyc_jobs import KYCJobService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run OCR extraction for queued KYC documents on a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Documents claimed per round (default: 2 per worker)')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-memory-mb', type=int, default=settings.KYC_WORKER_MEMORY_MB,
+                            help='Address-space limit per worker process, 0 for none')
+        parser.add_argument('--once', action='store_true', help='Process the queued documents and exit')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size'] or workers * 2
+
+        def new_executor():
+            return ProcessPoolExecutor(max_workers=workers, initializer=limit_worker_memory,
+                                       initargs=(options['max_memory_mb'],))
+
+        executor = new_executor()
+        try:
+            while True:
+                close_old_connections()
+                started = time.monotonic()
+                try:
+                    processed = KYCJobService.process_batch(executor, batch_size)
+                except BrokenProcessPool as e:
+                    # A worker was killed (OOM, segfault); its documents were re-queued
+                    logger.error(f"{e}, starting a new pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_executor()
+                    continue
+
+                if processed:
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(f"Processed {processed} KYC documents in {elapsed:.1f}s")
+                    continue
+
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
+        finally:
+            executor.shutdown()
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.notification_service import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notifications from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=NotificationService.BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the due notifications and exit')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        while True:
+            close_old_connections()
+            sent, failed, dead = NotificationService.process_batch(batch_size)
+
+            if sent or failed or dead:
+                self.stdout.write(f"Sent {sent}, retrying {failed}, dead-lettered {dead}")
+                continue
+
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
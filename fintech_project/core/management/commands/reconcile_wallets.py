@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.models import Wallet
+from core.reconciliation import WalletReconciliationService
+
+
+def _reconcile(wallet_ids, full):
+    try:
+        return WalletReconciliationService.reconcile_chunk(wallet_ids, full)
+    finally:
+        # Worker threads each hold their own connection
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = ('Check every wallet balance against the sum of its transactions. '
+            'Only transactions newer than each wallet\'s watermark are aggregated unless --full is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Chunks reconciled in parallel')
+        parser.add_argument('--chunk-size', type=int, default=WalletReconciliationService.CHUNK_SIZE)
+        parser.add_argument('--currency', help='Only wallets in this currency')
+        parser.add_argument('--full', action='store_true', help='Ignore watermarks and re-aggregate every transaction')
+
+    def handle(self, *args, **options):
+        queryset = Wallet.objects.all()
+        if options['currency']:
+            queryset = queryset.filter(currency=options['currency'].upper())
+
+        workers = options['workers']
+        if connection.vendor == 'sqlite':
+            # SQLite allows one writer at a time
+            workers = 1
+
+        started = time.monotonic()
+        checked = 0
+        mismatches = []
+        pending = set()
+
+        def collect(done):
+            nonlocal checked
+            for future in done:
+                count, found = future.result()
+                checked += count
+                mismatches.extend(found)
+                for rec in found:
+                    self.stdout.write(
+                        f"  wallet {rec.wallet_id}: balance {rec.balance_minor} != ledger {rec.ledger_total_minor} "
+                        f"minor units (difference {rec.difference_minor})"
+                    )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for wallet_ids in WalletReconciliationService.wallet_id_chunks(queryset, options['chunk_size']):
+                # Keep a bounded number of chunks in flight
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                    self.stdout.write(f"{checked} wallets checked ({checked / (time.monotonic() - started):.0f}/s)")
+                pending.add(executor.submit(_reconcile, wallet_ids, options['full']))
+            collect(wait(pending).done)
+
+        elapsed = time.monotonic() - started
+        summary = f"Checked {checked} wallets in {elapsed:.1f}s, {len(mismatches)} mismatched"
+        if mismatches:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
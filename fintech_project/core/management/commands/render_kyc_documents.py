@@ -0,0 +1,50 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core import document_renditions
+from core.kyc_jobs import KYCJobService
+from core.models import KYCDocument
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail and review renditions for KYC documents that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        # New uploads are rendered by process_kyc_jobs
+        queryset = (
+            KYCDocument.objects
+            .filter(thumbnail='', processing_status__in=['DONE', 'FAILED'])
+            .only('id', 'document')
+            .order_by('id')
+        )
+        started = time.monotonic()
+        last_id = 0
+        rendered = failed = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                close_old_connections()
+                docs = list(queryset.filter(id__gt=last_id)[:options['chunk_size']])
+                if not docs:
+                    break
+                last_id = docs[-1].id
+
+                futures = [(doc, executor.submit(document_renditions.render, doc.document.path)) for doc in docs]
+                for doc, future in futures:
+                    try:
+                        KYCJobService.store_renditions(doc, future.result())
+                        rendered += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f"  #{doc.id}: {e}")
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{rendered} rendered, {failed} failed ({rendered / elapsed:.1f} docs/s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} documents, {failed} failed"))
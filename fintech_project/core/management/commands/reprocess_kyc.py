@@ -0,0 +1,172 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from core.image_preprocessing import limit_worker_memory
+from core.kyc_jobs import KYCJobService
+from core.kyc_review import KYCReviewService
+from core.kyc_service import KYCVerificationService
+from core.models import KYCDocument
+
+
+class Command(BaseCommand):
+    help = ('Re-run extraction and auto-approval rules over processed KYC documents. '
+            'Prints what would change unless --apply is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='Write the new results and approvals')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--status', action='append', choices=['PENDING', 'APPROVED', 'REJECTED'],
+                            help='Only documents with this review status (repeatable)')
+        parser.add_argument('--doc-type', help='Only this document type')
+        parser.add_argument('--checkpoint', help='JSON file recording progress; resumed from if it exists')
+        parser.add_argument('--max-memory-mb', type=int, default=settings.KYC_WORKER_MEMORY_MB,
+                            help='Address-space limit per worker process, 0 for none')
+
+    def handle(self, *args, **options):
+        state = self.load_checkpoint(options)
+        if state['last_id']:
+            self.stdout.write(f"Resuming after document {state['last_id']} ({state['processed']} already done)")
+
+        # Queued and in-flight documents belong to process_kyc_jobs
+        queryset = KYCDocument.objects.filter(processing_status__in=['DONE', 'FAILED'])
+        if options['status']:
+            queryset = queryset.filter(status__in=options['status'])
+        if options['doc_type']:
+            queryset = queryset.filter(doc_type=options['doc_type'])
+        queryset = queryset.order_by('id')
+
+        started = time.monotonic()
+        processed_this_run = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=limit_worker_memory,
+                                 initargs=(options['max_memory_mb'],)) as executor:
+            while True:
+                close_old_connections()
+                # Keyset pagination: stable and index-only however deep we are
+                docs = list(queryset.filter(id__gt=state['last_id'])[:options['chunk_size']])
+                if not docs:
+                    break
+
+                results = executor.map(
+                    KYCVerificationService.extract_document_data,
+                    [doc.document.path for doc in docs],
+                    [doc.doc_type for doc in docs],
+                    [doc.country for doc in docs],
+                )
+                self.process_chunk(docs, results, state, options['apply'])
+
+                state['last_id'] = docs[-1].id
+                state['processed'] += len(docs)
+                processed_this_run += len(docs)
+                self.save_checkpoint(options['checkpoint'], state)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{state['processed']} documents processed "
+                    f"({processed_this_run / elapsed:.1f} docs/s)"
+                )
+
+        verb = 'Updated' if options['apply'] else 'Would update'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {state['changed']} documents, "
+            f"{'approved' if options['apply'] else 'would approve'} {state['approved']}, "
+            f"{state['failed']} failed extraction, {state['processed']} checked"
+        ))
+
+    def process_chunk(self, docs, results, state, apply):
+        changed = []
+        approved = []
+        now = timezone.now()
+
+        for doc, result in zip(docs, results):
+            if not result['success']:
+                state['failed'] += 1
+                self.stdout.write(f"  #{doc.id}: extraction failed: {result.get('error')}")
+                continue
+
+            old_data, old_score, old_status = doc.extracted_data, doc.confidence_score, doc.status
+            doc.extracted_data = result['extracted_data']
+            doc.confidence_score = result['confidence_score']
+            should_approve, reason = KYCJobService.decide(doc)
+
+            # Only documents nobody has reviewed are auto-approved; manual
+            # decisions are reported but never overturned
+            approve = should_approve and old_status == 'PENDING' and not doc.reviewed_by_id
+
+            if doc.extracted_data == old_data and doc.confidence_score == old_score and not approve:
+                if old_status == 'APPROVED' and not should_approve:
+                    self.stdout.write(f"  #{doc.id}: approved, but would no longer auto-approve ({reason})")
+                continue
+
+            diff = [f"confidence {old_score:g} -> {doc.confidence_score:g}"]
+            added = sorted(set(doc.extracted_data) - set(old_data))
+            removed = sorted(set(old_data) - set(doc.extracted_data))
+            if added:
+                diff.append(f"+{','.join(added)}")
+            if removed:
+                diff.append(f"-{','.join(removed)}")
+            if approve:
+                diff.append(f"status {old_status} -> APPROVED")
+            elif old_status == 'APPROVED' and not should_approve:
+                diff.append(f"would no longer auto-approve ({reason})")
+            self.stdout.write(f"  #{doc.id} {doc.doc_type} user {doc.user_id}: {'; '.join(diff)}")
+
+            doc.processing_status = 'DONE'
+            doc.processed_at = now
+            changed.append(doc)
+            if approve:
+                approved.append(doc)
+
+        state['changed'] += len(changed)
+        if not apply or not changed:
+            state['approved'] += len(approved)
+            return
+
+        with transaction.atomic():
+            # Status is left out: a reviewer may have decided a document
+            # since this chunk was read
+            KYCDocument.objects.bulk_update(
+                changed,
+                ['extracted_data', 'confidence_score', 'processing_status', 'processed_at']
+            )
+            # Promoted only if still undecided; the rows are locked so the
+            # ids are exactly the ones updated below
+            approved_ids = list(
+                KYCDocument.objects
+                .select_for_update()
+                .filter(id__in=[doc.id for doc in approved], status='PENDING', reviewed_by__isnull=True)
+                .values_list('id', flat=True)
+            )
+            if approved_ids:
+                KYCDocument.objects.filter(id__in=approved_ids).update(status='APPROVED', reviewed_at=now)
+                KYCReviewService.update_profiles(KYCDocument.objects.filter(id__in=approved_ids), 'APPROVED')
+        state['approved'] += len(approved_ids)
+
+    def load_checkpoint(self, options):
+        state = {'apply': options['apply'], 'last_id': 0, 'processed': 0, 'changed': 0, 'approved': 0, 'failed': 0}
+        path = options['checkpoint']
+        if not path or not os.path.exists(path):
+            return state
+
+        with open(path) as f:
+            saved = json.load(f)
+        if saved.get('apply') != options['apply']:
+            mode = 'an --apply' if saved.get('apply') else 'a dry'
+            raise CommandError(f"{path} is from {mode} run; use a new checkpoint file")
+        state.update(saved)
+        return state
+
+    def save_checkpoint(self, path, state):
+        if not path:
+            return
+        # Write-then-rename so an interrupted run never leaves a torn file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.transfers import TransferService
+
+
+class Command(BaseCommand):
+    help = 'Settle queued transfers in batches, one transaction per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=TransferService.BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Settle the queued transfers and exit')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        while True:
+            close_old_connections()
+            started = time.monotonic()
+            settled, rejected = TransferService.settle_batch(batch_size)
+
+            if settled or rejected:
+                self.stdout.write(f"Settled {settled}, rejected {rejected} in {time.monotonic() - started:.2f}s")
+                continue
+
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,174 @@
+"""Protected delivery of uploaded media (KYC documents).
+
+Media URLs are signed: the storage appends an expiry and an HMAC to every
+URL it hands out, and only API responses that already passed an
+authorization check contain those URLs. The serving view checks the
+signature and then gets out of the way:
+
+* ``MEDIA_DELIVERY = 'x-accel'`` hands the transfer to nginx through
+  X-Accel-Redirect (``MEDIA_ACCEL_PREFIX`` must be an ``internal``
+  location aliased to MEDIA_ROOT),
+* ``'x-sendfile'`` does the same for Apache / lighttpd,
+* ``'django'`` (default) streams the file itself with FileResponse, which
+  WSGI servers turn into ``os.sendfile``; single byte ranges and
+  conditional GET are handled here.
+"""
+import os
+import re
+import time
+import mimetypes
+from urllib.parse import quote, urlencode
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.core.signing import Signer
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+_signer = Signer(salt='core.media')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _expiry(now=None):
+    """Expiry rounded up to the next TTL boundary (plus one), so a file's
+    URL stays the same for a while and browsers can cache it"""
+    ttl = settings.MEDIA_URL_TTL
+    return (int(now or time.time()) // ttl + 2) * ttl
+
+
+def sign_media_path(name, expires):
+    return _signer.signature(f"{name}:{expires}")
+
+
+def check_media_signature(name, expires, signature):
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < time.time():
+        return False
+    return constant_time_compare(sign_media_path(name, expires), signature or '')
+
+
+class ProtectedMediaStorage(FileSystemStorage):
+    """FileSystemStorage whose URLs carry an expiring signature"""
+
+    def url(self, name):
+        url = super().url(name)
+        expires = _expiry()
+        return f"{url}?{urlencode({'exp': expires, 'sig': sign_media_path(name, expires)})}"
+
+
+class _RangeReader:
+    """File wrapper that stops after ``length`` bytes"""
+
+    def __init__(self, file, length, block_size=64 * 1024):
+        self.file = file
+        self.remaining = length
+        self.block_size = block_size
+
+    def __iter__(self):
+        while self.remaining > 0:
+            chunk = self.file.read(min(self.block_size, self.remaining))
+            if not chunk:
+                break
+            self.remaining -= len(chunk)
+            yield chunk
+
+    def close(self):
+        self.file.close()
+
+
+def _parse_range(header, size):
+    """(start, end) for a single satisfiable byte range, None to ignore, or False if unsatisfiable"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None  # malformed or multi-range: serve the whole file
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+@require_safe
+def protected_media(request, path):
+    if not check_media_signature(path, request.GET.get('exp'), request.GET.get('sig')):
+        return HttpResponse('Forbidden', status=403)
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('File not found')
+
+    etag = quote_etag(f"{stat.st_size:x}-{int(stat.st_mtime):x}")
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if conditional is not None:
+        return conditional
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    delivery = settings.MEDIA_DELIVERY
+
+    if delivery == 'x-accel':
+        response = HttpResponse(content_type=content_type)
+        # A header value, and nginx decodes it: spaces, '?' and '%' in file names must be escaped
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(path)
+    elif delivery == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        response = _file_response(request, full_path, stat.st_size, content_type, etag, int(stat.st_mtime))
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = f"private, max-age={max(int(request.GET['exp']) - int(time.time()), 0)}"
+    return response
+
+
+def _if_range_matches(if_range, etag, last_modified):
+    """Whether an If-Range validator (an entity tag or an HTTP date) still describes the file"""
+    if_range = if_range.strip()
+    if if_range.startswith(('"', 'W/')):
+        # Strong comparison: a weak tag never matches
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _file_response(request, full_path, size, content_type, etag, last_modified):
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    # A stale or unparseable If-Range validator means "send the whole (new) file"
+    if range_header and (not if_range or _if_range_matches(if_range, etag, last_modified)):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        # A real file object: the WSGI server can use os.sendfile
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = StreamingHttpResponse(_RangeReader(file, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -1,8 +1,9 @@
 import time
 from django.core.cache import cache
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 import logging
+from .password_service import PasswordPoolBusy
 
 logger = logging.getLogger(__name__)
 
@@ -67,4 +68,21 @@ class AuditLogMiddleware(MiddlewareMixin):
             user = getattr(request, 'user', None)
             logger.info(f"Financial operation: {request.method} {request.path} by {user}")
         
-        return None
\ No newline at end of file
+        return None
+
+class ServerBusyMiddleware(MiddlewareMixin):
+    """Answer 503 + Retry-After when the password hashing pool sheds a request.
+
+    Covers every view that authenticates without handling PasswordPoolBusy
+    itself: the JWT token endpoint, the admin login and the like.
+    """
+    
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PasswordPoolBusy):
+            return None
+        if request.path.startswith('/api/'):
+            response = JsonResponse({'error': 'Server busy, please try again shortly'}, status=503)
+        else:
+            response = HttpResponse('Server busy, please try again shortly', status=503, content_type='text/plain')
+        response['Retry-After'] = '1'
+        return response
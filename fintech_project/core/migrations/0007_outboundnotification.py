@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_userprofile_full_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('EMAIL', 'Email'), ('WEBHOOK', 'Webhook'), ('SMS', 'SMS')], default='EMAIL', max_length=10)),
+                ('kind', models.CharField(max_length=50)),
+                ('recipient', models.CharField(max_length=255)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('SENT', 'Sent'), ('DEAD', 'Dead')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='core_outbou_status_e880fc_idx')],
+            },
+        ),
+    ]
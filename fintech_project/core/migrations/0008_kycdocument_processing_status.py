@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_outboundnotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kycdocument',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Existing documents were processed synchronously on upload
+        migrations.AddField(
+            model_name='kycdocument',
+            name='processing_status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='DONE', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='kycdocument',
+            name='processing_status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='kycdocument',
+            index=models.Index(fields=['processing_status', 'id'], name='core_kycdoc_process_50594e_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_kycdocument_processing_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kycdocument',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='core.kycdocument'),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='phash_band_0',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='phash_band_1',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='phash_band_2',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='phash_band_3',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
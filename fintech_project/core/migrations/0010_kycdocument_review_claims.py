@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0009_kycdocument_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kycdocument',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='kycdocument',
+            index=models.Index(fields=['status', 'created_at'], name='core_kycdoc_status_1e5e08_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_kycdocument_review_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kycdocument',
+            name='review_image',
+            field=models.ImageField(blank=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='kycdocument',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_kycdocument_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['created_at', 'id'], name='core_transa_created_dcb6cd_idx'),
+        ),
+    ]
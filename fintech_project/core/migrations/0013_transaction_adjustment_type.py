@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_transaction_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='type',
+            field=models.CharField(choices=[('DEPOSIT', 'Deposit'), ('WITHDRAW', 'Withdraw'), ('TRANSFER', 'Transfer'), ('CONVERT', 'Convert'), ('ADJUSTMENT', 'Adjustment')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_transaction_adjustment_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletReconciliation',
+            fields=[
+                ('wallet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reconciliation', serialize=False, to='core.wallet')),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('ledger_total', models.DecimalField(decimal_places=8, default=0, max_digits=30)),
+                ('balance', models.DecimalField(decimal_places=8, default=0, max_digits=30)),
+                ('difference', models.DecimalField(decimal_places=8, default=0, max_digits=30)),
+                ('status', models.CharField(choices=[('OK', 'OK'), ('MISMATCH', 'Mismatch')], default='OK', max_length=10)),
+                ('checked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['wallet', 'id'], name='core_transa_wallet__f86f4f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walletreconciliation',
+            index=models.Index(fields=['status', 'checked_at'], name='core_wallet_status_bb1346_idx'),
+        ),
+    ]
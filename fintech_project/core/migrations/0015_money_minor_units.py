@@ -0,0 +1,117 @@
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Round
+
+# Frozen copy of core.money.SCALES at the time of this migration
+SCALES = {
+    'NGN': 2,
+    'KES': 2,
+    'BTC': 8,
+    'ETH': 9,
+    'USDT': 6,
+}
+
+
+def to_minor_units(apps, schema_editor):
+    Wallet = apps.get_model('core', 'Wallet')
+    Transaction = apps.get_model('core', 'Transaction')
+
+    # One UPDATE per currency and table; amounts finer than the currency
+    # allows (float arithmetic leftovers) are rounded half away from zero
+    for currency, scale in SCALES.items():
+        factor = Value(Decimal(10) ** scale)
+        Wallet.objects.filter(currency=currency).update(
+            balance_minor=Cast(Round(F('balance') * factor), models.BigIntegerField())
+        )
+        Transaction.objects.filter(wallet__currency=currency).update(
+            amount_minor=Cast(Round(F('amount') * factor), models.BigIntegerField())
+        )
+
+
+def to_decimal_units(apps, schema_editor):
+    Wallet = apps.get_model('core', 'Wallet')
+    Transaction = apps.get_model('core', 'Transaction')
+    decimal = models.DecimalField(max_digits=30, decimal_places=8)
+
+    for currency, scale in SCALES.items():
+        factor = Value(Decimal(10) ** -scale, output_field=models.DecimalField(max_digits=30, decimal_places=scale))
+        Wallet.objects.filter(currency=currency).update(
+            balance=Cast(F('balance_minor') * factor, decimal)
+        )
+        Transaction.objects.filter(wallet__currency=currency).update(
+            amount=Cast(F('amount_minor') * factor, decimal)
+        )
+
+
+def clear_reconciliations(apps, schema_editor):
+    # Derived data; the next reconcile_wallets pass rebuilds it in minor units
+    apps.get_model('core', 'WalletReconciliation').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_wallet_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallet',
+            name='balance_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='amount_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(to_minor_units, to_decimal_units),
+        # A default lets the migration be reversed on a populated table
+        migrations.AlterField(
+            model_name='transaction',
+            name='amount',
+            field=models.DecimalField(decimal_places=8, default=0, max_digits=30),
+        ),
+        migrations.RemoveField(
+            model_name='wallet',
+            name='balance',
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='amount',
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='amount_minor',
+            field=models.BigIntegerField(),
+        ),
+        migrations.RunPython(clear_reconciliations, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='walletreconciliation',
+            name='ledger_total',
+        ),
+        migrations.RemoveField(
+            model_name='walletreconciliation',
+            name='balance',
+        ),
+        migrations.RemoveField(
+            model_name='walletreconciliation',
+            name='difference',
+        ),
+        migrations.AddField(
+            model_name='walletreconciliation',
+            name='ledger_total_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='walletreconciliation',
+            name='balance_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='walletreconciliation',
+            name='difference_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallet',
+            name='held_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='BalanceHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount_minor', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('HELD', 'Held'), ('CAPTURED', 'Captured'), ('RELEASED', 'Released')], default='HELD', max_length=10)),
+                ('type', models.CharField(choices=[('DEPOSIT', 'Deposit'), ('WITHDRAW', 'Withdraw'), ('TRANSFER', 'Transfer'), ('CONVERT', 'Convert'), ('ADJUSTMENT', 'Adjustment')], max_length=20)),
+                ('counterparty', models.CharField(blank=True, max_length=255)),
+                ('reference', models.CharField(blank=True, max_length=255)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('transaction', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hold', to='core.transaction')),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='core.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_balanc_status_85378b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_balance_holds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount_minor', models.BigIntegerField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('SETTLED', 'Settled'), ('REJECTED', 'Rejected')], default='QUEUED', max_length=10)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('settled_at', models.DateTimeField(blank=True, null=True)),
+                ('hold', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transfer', to='core.balancehold')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incoming_transfers', to='core.wallet')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outgoing_transfers', to='core.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='core_transf_status_05901c_idx')],
+            },
+        ),
+    ]
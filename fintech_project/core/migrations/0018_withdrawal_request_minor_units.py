@@ -0,0 +1,68 @@
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Round
+
+# Frozen copy of core.money.SCALES at the time of this migration
+SCALES = {
+    'NGN': 2,
+    'KES': 2,
+    'BTC': 8,
+    'ETH': 9,
+    'USDT': 6,
+}
+
+
+def to_minor_units(apps, schema_editor):
+    WithdrawalRequest = apps.get_model('core', 'WithdrawalRequest')
+    for currency, scale in SCALES.items():
+        WithdrawalRequest.objects.filter(wallet__currency=currency).update(
+            amount_minor=Cast(Round(F('amount') * Value(Decimal(10) ** scale)), models.BigIntegerField())
+        )
+
+
+def to_decimal_units(apps, schema_editor):
+    WithdrawalRequest = apps.get_model('core', 'WithdrawalRequest')
+    decimal = models.DecimalField(max_digits=30, decimal_places=8)
+    for currency, scale in SCALES.items():
+        factor = Value(Decimal(10) ** -scale, output_field=models.DecimalField(max_digits=30, decimal_places=scale))
+        WithdrawalRequest.objects.filter(wallet__currency=currency).update(
+            amount=Cast(F('amount_minor') * factor, decimal)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_transfers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='withdrawalrequest',
+            name='amount_minor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(to_minor_units, to_decimal_units),
+        # A default lets the migration be reversed on a populated table
+        migrations.AlterField(
+            model_name='withdrawalrequest',
+            name='amount',
+            field=models.DecimalField(decimal_places=8, default=0, max_digits=30),
+        ),
+        migrations.RemoveField(
+            model_name='withdrawalrequest',
+            name='amount',
+        ),
+        migrations.AlterField(
+            model_name='withdrawalrequest',
+            name='amount_minor',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AddField(
+            model_name='withdrawalrequest',
+            name='hold',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='withdrawal_request', to='core.balancehold'),
+        ),
+    ]
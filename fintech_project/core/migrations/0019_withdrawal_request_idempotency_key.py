@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0018_withdrawal_request_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='withdrawalrequest',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=150, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='withdrawalrequest',
+            unique_together={('user', 'idempotency_key')},
+        ),
+    ]
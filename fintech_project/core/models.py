@@ -1,6 +1,9 @@
+from decimal import Decimal
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
+from . import money
 
 
 class Wallet(models.Model):
@@ -14,7 +17,10 @@ class Wallet(models.Model):
 
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='wallets')
     currency = models.CharField(max_length=10, choices=CURRENCY_CHOICES)
-    balance = models.DecimalField(max_digits=30, decimal_places=8, default=0)
+    balance_minor = models.BigIntegerField(default=0)  # see core.money
+    # Part of the balance reserved by pending holds (core.holds); spendable
+    # is balance_minor - held_minor
+    held_minor = models.BigIntegerField(default=0)
     deposit_address = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -24,6 +30,22 @@ class Wallet(models.Model):
     def __str__(self):
         return f"{self.owner.email} - {self.currency}"
 
+    @property
+    def balance(self):
+        return money.to_decimal(self.balance_minor, self.currency)
+
+    @property
+    def available_minor(self):
+        return self.balance_minor - self.held_minor
+
+    @property
+    def available_balance(self):
+        return money.to_decimal(self.available_minor, self.currency)
+
+    @property
+    def held_balance(self):
+        return money.to_decimal(self.held_minor, self.currency)
+
 
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
@@ -31,18 +53,124 @@ class Transaction(models.Model):
         ('WITHDRAW', 'Withdraw'),
         ('TRANSFER', 'Transfer'),
         ('CONVERT', 'Convert'),
+        ('ADJUSTMENT', 'Adjustment'),
     ]
 
     wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='transactions')
     type = models.CharField(max_length=20, choices=TRANSACTION_TYPES)
-    amount = models.DecimalField(max_digits=30, decimal_places=8)
+    amount_minor = models.BigIntegerField()  # in the wallet currency's minor units
     counterparty = models.CharField(max_length=255, blank=True, null=True)
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Admin changelist: newest-first ordering and date drill-down
+            models.Index(fields=['created_at', 'id']),
+            # Reconciliation: a wallet's transactions past its watermark
+            models.Index(fields=['wallet', 'id']),
+        ]
+
     def __str__(self):
         return f"{self.type} {self.amount} {self.wallet.currency}"
 
+    @property
+    def amount(self):
+        return money.to_decimal(self.amount_minor, self.wallet.currency)
+
+
+class BalanceHold(models.Model):
+    """Funds reserved on a wallet while an external payout is in flight.
+
+    A hold raises the wallet's held_minor; it changes balance_minor and
+    the ledger only when captured.
+    """
+    STATUS = [
+        ('HELD', 'Held'),
+        ('CAPTURED', 'Captured'),
+        ('RELEASED', 'Released'),
+    ]
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='holds')
+    amount_minor = models.BigIntegerField()  # positive, in the wallet currency's minor units
+    status = models.CharField(max_length=10, choices=STATUS, default='HELD')
+    type = models.CharField(max_length=20, choices=Transaction.TRANSACTION_TYPES)  # of the entry on capture
+    counterparty = models.CharField(max_length=255, blank=True)
+    reference = models.CharField(max_length=255, blank=True)  # provider reference, e.g. tx hash
+    metadata = models.JSONField(default=dict, blank=True)
+    transaction = models.OneToOneField(Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='hold')
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"Hold {self.amount} {self.wallet.currency} - {self.status}"
+
+    @property
+    def amount(self):
+        return money.to_decimal(self.amount_minor, self.wallet.currency)
+
+
+class Transfer(models.Model):
+    """A user-to-user transfer between two wallets of the same currency.
+
+    Instant transfers are written SETTLED. Queued ones hold the sender's
+    funds until the settle_transfers command books a batch of them.
+    """
+    STATUS = [
+        ('QUEUED', 'Queued'),
+        ('SETTLED', 'Settled'),
+        ('REJECTED', 'Rejected'),
+    ]
+
+    sender = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='outgoing_transfers')
+    recipient = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='incoming_transfers')
+    amount_minor = models.BigIntegerField()  # positive, in the wallets' currency minor units
+    note = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS, default='QUEUED')
+    hold = models.OneToOneField(BalanceHold, on_delete=models.SET_NULL, null=True, blank=True, related_name='transfer')
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Settlement: queued transfers in id order
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Transfer {self.amount} {self.sender.currency} - {self.status}"
+
+    @property
+    def amount(self):
+        return money.to_decimal(self.amount_minor, self.sender.currency)
+
+
+class WalletReconciliation(models.Model):
+    """Running ledger total of a wallet up to a transaction-id watermark"""
+    STATUS = [
+        ('OK', 'OK'),
+        ('MISMATCH', 'Mismatch'),
+    ]
+
+    wallet = models.OneToOneField(Wallet, on_delete=models.CASCADE, primary_key=True, related_name='reconciliation')
+    last_transaction_id = models.BigIntegerField(default=0)
+    # Minor units of the wallet's currency
+    ledger_total_minor = models.BigIntegerField(default=0)
+    balance_minor = models.BigIntegerField(default=0)  # wallet balance when checked
+    difference_minor = models.BigIntegerField(default=0)  # balance - ledger total
+    status = models.CharField(max_length=10, choices=STATUS, default='OK')
+    checked_at = models.DateTimeField(default=timezone.now)  # last pass that changed this row
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'checked_at'])]
+
+    def __str__(self):
+        return f"{self.wallet_id} {self.status} ({self.difference_minor})"
+
 
 class KYCDocument(models.Model):
     STATUS = [
@@ -51,17 +179,49 @@ class KYCDocument(models.Model):
         ('REJECTED', 'Rejected'),
     ]
 
+    PROCESSING_STATUS = [
+        ('QUEUED', 'Queued'),
+        ('PROCESSING', 'Processing'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='kyc_documents')
     document = models.ImageField(upload_to='kyc/')
+    # Renditions generated by the KYC worker, stored next to the original
+    thumbnail = models.ImageField(blank=True)
+    review_image = models.ImageField(blank=True)
     doc_type = models.CharField(max_length=50)
     country = models.CharField(max_length=2, blank=True, null=True)
     extracted_data = models.JSONField(default=dict, blank=True)
     confidence_score = models.FloatField(default=0.0)
     status = models.CharField(max_length=20, choices=STATUS, default='PENDING')
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_STATUS, default='QUEUED')
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Fingerprints: exact (OCR cache) and perceptual (duplicate detection),
+    # the 64-bit dHash also split into indexed 16-bit bands for lookups
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    perceptual_hash = models.CharField(max_length=16, blank=True)
+    phash_band_0 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    phash_band_1 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    phash_band_2 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    phash_band_3 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates')
+    # Reviewer currently working on the document (claims expire)
+    assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    claimed_at = models.DateTimeField(null=True, blank=True)
     reviewed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     reviewed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['processing_status', 'id']),
+            # Review queue: oldest first within a status
+            models.Index(fields=['status', 'created_at']),
+        ]
+
     def __str__(self):
         return f"KYC {self.user.email} ({self.doc_type}) - {self.status}"
 
@@ -114,18 +274,30 @@ class WithdrawalRequest(models.Model):
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE)
-    amount = models.DecimalField(max_digits=30, decimal_places=8)
+    amount_minor = models.BigIntegerField()  # in the wallet currency's minor units
     gateway = models.ForeignKey(PaymentGateway, on_delete=models.CASCADE)
     gateway_reference = models.CharField(max_length=255, blank=True)
     destination = models.CharField(max_length=255)  # bank account, mobile money, etc
     status = models.CharField(max_length=20, choices=STATUS, default='PENDING')
+    # Funds reserved until the gateway confirms or fails the payout
+    hold = models.OneToOneField(BalanceHold, on_delete=models.SET_NULL, null=True, blank=True, related_name='withdrawal_request')
+    # Bulk payouts: the upload's Idempotency-Key and the row number, so a
+    # retried upload skips the rows it already created
+    idempotency_key = models.CharField(max_length=150, null=True, blank=True)
     metadata = models.JSONField(default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        unique_together = ('user', 'idempotency_key')
+
     def __str__(self):
         return f"Withdrawal {self.amount} {self.wallet.currency} - {self.status}"
 
+    @property
+    def amount(self):
+        return money.to_decimal(self.amount_minor, self.wallet.currency)
+
 
 class ExchangeRate(models.Model):
     from_currency = models.CharField(max_length=10)
@@ -147,6 +319,10 @@ class UserProfile(models.Model):
         ('REJECTED', 'Rejected'),
     ]
     
+    # (daily, monthly) transaction limits
+    VERIFIED_LIMITS = (Decimal('10000.00'), Decimal('50000.00'))
+    UNVERIFIED_LIMITS = (Decimal('100.00'), Decimal('1000.00'))
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     full_name = models.CharField(max_length=200, blank=True, null=True)
     country = models.CharField(max_length=2, blank=True, null=True)
@@ -162,13 +338,12 @@ class UserProfile(models.Model):
     def is_verified(self):
         return self.verification_status == 'APPROVED'
     
+    @classmethod
+    def limits_for(cls, verification_status):
+        return cls.VERIFIED_LIMITS if verification_status == 'APPROVED' else cls.UNVERIFIED_LIMITS
+    
     def update_limits(self):
-        if self.is_verified():
-            self.daily_limit = 10000.00
-            self.monthly_limit = 50000.00
-        else:
-            self.daily_limit = 100.00
-            self.monthly_limit = 1000.00
+        self.daily_limit, self.monthly_limit = self.limits_for(self.verification_status)
         self.save()
         print(f"Updated limits for {self.user.email}: Daily={self.daily_limit}, Monthly={self.monthly_limit}")
 
@@ -189,3 +364,36 @@ class PaymentMethod(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.method_type}"
+
+
+class OutboundNotification(models.Model):
+    """Outbox row for a message to be delivered by the notification worker"""
+    CHANNELS = [
+        ('EMAIL', 'Email'),
+        ('WEBHOOK', 'Webhook'),
+        ('SMS', 'SMS'),
+    ]
+
+    STATUS = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('SENT', 'Sent'),
+        ('DEAD', 'Dead'),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNELS, default='EMAIL')
+    kind = models.CharField(max_length=50)  # login_code, registration_code, etc
+    recipient = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.channel} {self.kind} to {self.recipient} - {self.status}"
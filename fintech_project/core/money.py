@@ -0,0 +1,73 @@
+"""Money as integer minor units.
+
+Balances and ledger amounts are stored as BigIntegers in the smallest
+unit of their currency: kobo, cents, satoshi, gwei (ETH has 18 decimals
+on chain, which would not fit in 64 bits), and micro-USDT. Arithmetic,
+comparisons and SUMs are exact integer operations. Decimals appear only
+at the edges: parsing API input and formatting responses.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_DOWN
+
+SCALES = {
+    'NGN': 2,
+    'KES': 2,
+    'BTC': 8,
+    'ETH': 9,
+    'USDT': 6,
+}
+
+# Largest amount a BigInteger column holds, in minor units
+MAX_MINOR = 2 ** 63 - 1
+
+
+def scale(currency):
+    try:
+        return SCALES[currency]
+    except KeyError:
+        raise ValueError(f"Unsupported currency: {currency}")
+
+
+def to_minor(value, currency, rounding=None):
+    """Minor units for a display amount.
+
+    Without rounding, an amount more precise than the currency allows is
+    an error; pass a decimal rounding mode (e.g. ROUND_DOWN) for computed
+    amounts such as conversions.
+    """
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount: {value}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value}")
+    # Checked before scaling: a huge exponent would overflow the decimal
+    # context or build an enormous integer
+    if amount.copy_abs() > Decimal(MAX_MINOR).scaleb(-scale(currency)):
+        raise ValueError(f"Amount out of range: {value}")
+
+    minor = amount.scaleb(scale(currency))
+    if minor != minor.to_integral_value():
+        if rounding is None:
+            raise ValueError(f"{currency} amounts have at most {scale(currency)} decimal places")
+        minor = minor.quantize(Decimal(1), rounding=rounding)
+    return int(minor)
+
+
+def to_decimal(minor, currency):
+    """Display amount for minor units, with the currency's number of places"""
+    return Decimal(int(minor)).scaleb(-scale(currency))
+
+
+def format_minor(minor, currency):
+    """API string for minor units: '1500.00', '0.00050000'"""
+    return f"{to_decimal(minor, currency):f}"
+
+
+def parse_amount(value, currency):
+    """Minor units for a user-supplied positive amount; ValueError if invalid"""
+    if value is None or value == '':
+        raise ValueError("Amount required")
+    minor = to_minor(value, currency)
+    if minor <= 0:
+        raise ValueError("Amount must be greater than 0")
+    return minor
@@ -0,0 +1,150 @@
+"""Passport machine-readable zone (ICAO 9303 TD3) reading and parsing.
+
+Kept free of Django imports: it runs inside the KYC worker processes.
+"""
+import re
+from datetime import date
+
+TD3_LINE_LENGTH = 44
+
+# Tesseract settings for the MRZ crop: one uniform block, OCR-B alphabet only
+TESSERACT_CONFIG = '--dpi 300 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<'
+
+# The MRZ is the last ~quarter of a passport data page; a little extra
+# margin covers loose crops
+BAND_HEIGHT = 0.35
+
+ISO3_TO_ISO2 = {
+    'NGA': 'NG', 'KEN': 'KE', 'GHA': 'GH', 'ZAF': 'ZA', 'UGA': 'UG', 'TZA': 'TZ',
+    'RWA': 'RW', 'ETH': 'ET', 'EGY': 'EG', 'CMR': 'CM', 'SEN': 'SN', 'CIV': 'CI',
+    'BEN': 'BJ', 'TGO': 'TG', 'NER': 'NE', 'ZMB': 'ZM', 'ZWE': 'ZW', 'MWI': 'MW',
+    'SOM': 'SO', 'SDN': 'SD', 'SSD': 'SS', 'BDI': 'BI', 'COD': 'CD', 'MAR': 'MA',
+    'GBR': 'GB', 'USA': 'US', 'CAN': 'CA', 'FRA': 'FR', 'DEU': 'DE', 'D': 'DE',
+    'IND': 'IN', 'CHN': 'CN', 'ARE': 'AE', 'NLD': 'NL', 'ITA': 'IT', 'ESP': 'ES',
+}
+
+# OCR confusions between letters and digits in fields that must be numeric
+_TO_DIGIT = str.maketrans({'O': '0', 'Q': '0', 'D': '0', 'I': '1', 'L': '1', 'Z': '2',
+                           'S': '5', 'G': '6', 'B': '8'})
+
+_LINE_CHARS = re.compile(r'[^A-Z0-9<]')
+
+
+def check_digit(data):
+    """ICAO 9303 check digit: weights 7-3-1 over digits, A=10..Z=35, '<'=0"""
+    total = 0
+    for position, char in enumerate(data):
+        if char.isdigit():
+            value = int(char)
+        elif 'A' <= char <= 'Z':
+            value = ord(char) - 55
+        else:
+            value = 0
+        total += value * (7, 3, 1)[position % 3]
+    return str(total % 10)
+
+
+def crop_band(image):
+    """Bottom band of an upright passport page image, where the MRZ sits"""
+    width, height = image.size
+    return image.crop((0, int(height * (1 - BAND_HEIGHT)), width, height))
+
+
+def find_td3_lines(text):
+    """Return the two MRZ lines found in OCR text, or None"""
+    candidates = []
+    for line in text.upper().splitlines():
+        line = _LINE_CHARS.sub('', line.replace(' ', ''))
+        if len(line) >= TD3_LINE_LENGTH - 4 and '<' in line:
+            candidates.append(line[:TD3_LINE_LENGTH].ljust(TD3_LINE_LENGTH, '<'))
+
+    for first, second in zip(candidates, candidates[1:]):
+        if first.startswith('P'):
+            return first, second
+    return None
+
+
+def _mrz_date(value, future):
+    """YYMMDD to a date; the century is picked so birth dates lie in the past"""
+    try:
+        year, month, day = int(value[:2]), int(value[2:4]), int(value[4:6])
+        today = date.today()
+        century = 2000 if future or year <= today.year % 100 else 1900
+        return date(century + year, month, day)
+    except ValueError:
+        return None
+
+
+def _name(value):
+    return ' '.join(part for part in value.split('<') if part)
+
+
+def parse_td3(line1, line2):
+    """Parse and validate a TD3 (passport) MRZ.
+
+    Returns (extracted_data, confidence_score) in the shape the KYC
+    extractors use, or None if the lines are not a passport MRZ. Each of
+    the four check digits that validates adds 25 to the confidence, and
+    the passport number is only reported when its own check digit holds.
+    """
+    if len(line1) != TD3_LINE_LENGTH or len(line2) != TD3_LINE_LENGTH or line1[0] != 'P':
+        return None
+
+    issuing = line1[2:5].replace('<', '')
+    surname, _, given = line1[5:].partition('<<')
+
+    number, number_check = line2[0:9], line2[9].translate(_TO_DIGIT)
+    nationality = line2[10:13].replace('<', '')
+    birth = line2[13:19].translate(_TO_DIGIT)
+    birth_check = line2[19].translate(_TO_DIGIT)
+    sex = line2[20]
+    expiry = line2[21:27].translate(_TO_DIGIT)
+    expiry_check = line2[27].translate(_TO_DIGIT)
+    optional = line2[28:43]
+    composite_check = line2[43].translate(_TO_DIGIT)
+
+    checks = {
+        'number': check_digit(number) == number_check,
+        'birth': check_digit(birth) == birth_check,
+        'expiry': check_digit(expiry) == expiry_check,
+        'composite': check_digit(number + number_check + birth + birth_check +
+                                 expiry + expiry_check + optional) == composite_check,
+    }
+
+    extracted_data = {'source': 'mrz'}
+    confidence_score = 25.0 * sum(checks.values())
+
+    if checks['number']:
+        extracted_data['passport_number'] = number.replace('<', '')
+
+    name = ' '.join(filter(None, [_name(given), _name(surname)]))
+    if name:
+        extracted_data['name'] = name
+        extracted_data['surname'] = _name(surname)
+
+    if nationality:
+        extracted_data['nationality'] = ISO3_TO_ISO2.get(nationality, nationality)
+    if issuing:
+        extracted_data['issuing_country'] = ISO3_TO_ISO2.get(issuing, issuing)
+
+    birth_date = _mrz_date(birth, future=False)
+    if checks['birth'] and birth_date:
+        extracted_data['date_of_birth'] = birth_date.isoformat()
+
+    expiry_date = _mrz_date(expiry, future=True)
+    if checks['expiry'] and expiry_date:
+        extracted_data['expiry_date'] = expiry_date.isoformat()
+        extracted_data['expired'] = expiry_date < date.today()
+
+    if sex in ('M', 'F'):
+        extracted_data['gender'] = sex
+
+    return extracted_data, confidence_score
+
+
+def parse_mrz_text(text):
+    """Find and parse a passport MRZ in OCR text, or return None"""
+    lines = find_td3_lines(text)
+    if not lines:
+        return None
+    return parse_td3(*lines)
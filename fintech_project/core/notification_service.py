@@ -0,0 +1,166 @@
+import random
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboundNotification
+from .email_service import EmailService
+from .alternative_email import AlternativeEmailService
+from .notification_templates import templates
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService:
+    """Transactional outbox for emails, webhooks and SMS.
+
+    Request handlers only insert an OutboundNotification row; the
+    ``process_notifications`` worker claims due rows in batches, sends them
+    and records the outcome. Failed sends are retried with exponential
+    backoff and dead-lettered after MAX_ATTEMPTS.
+    """
+
+    BATCH_SIZE = 50
+    MAX_ATTEMPTS = 6
+    BASE_DELAY = 30        # seconds before the first retry
+    MAX_DELAY = 3600       # backoff cap
+    LEASE_SECONDS = 300    # a claimed row is retried if the worker dies; renewed while its batch is sent
+
+    # Payload fields kept on a dead-lettered row for diagnosis; everything
+    # else (codes, tokens, message bodies) is dropped
+    DIAGNOSTIC_FIELDS = ('locale', 'subject')
+
+    @staticmethod
+    def enqueue(kind, recipient, channel='EMAIL', **payload):
+        """Queue a notification; runs inside the caller's transaction"""
+        return OutboundNotification.objects.create(
+            channel=channel,
+            kind=kind,
+            recipient=recipient,
+            payload=payload
+        )
+
+    @staticmethod
+    def claim_batch(batch_size=None):
+        """Lease up to batch_size due notifications to this worker"""
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                OutboundNotification.objects
+                .select_for_update(skip_locked=True)
+                .filter(status__in=['PENDING', 'PROCESSING'], next_attempt_at__lte=now)
+                .order_by('next_attempt_at')
+                .values_list('id', flat=True)[:batch_size or NotificationService.BATCH_SIZE]
+            )
+            OutboundNotification.objects.filter(id__in=ids).update(
+                status='PROCESSING',
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=NotificationService.LEASE_SECONDS)
+            )
+        return list(OutboundNotification.objects.filter(id__in=ids).order_by('id'))
+
+    @staticmethod
+    def renew_lease(notifications):
+        """Extend the lease on claimed notifications, returning when it now ends"""
+        lease_until = timezone.now() + timedelta(seconds=NotificationService.LEASE_SECONDS)
+        OutboundNotification.objects.filter(
+            id__in=[notification.id for notification in notifications], status='PROCESSING'
+        ).update(next_attempt_at=lease_until)
+        return lease_until
+
+    @staticmethod
+    def dispatch(notification):
+        """Send one notification, returning (success, error)"""
+        payload = notification.payload
+
+        if notification.channel == 'EMAIL':
+            # Email kinds are notification template names
+            if notification.kind not in templates:
+                return False, f"Unknown email template: {notification.kind}"
+            if EmailService.send_template(notification.recipient, notification.kind, payload, payload.get('locale')):
+                return True, ''
+            return False, 'Email sending failed'
+
+        if notification.channel == 'WEBHOOK':
+            result = AlternativeEmailService.send_via_webhook(
+                notification.recipient,
+                payload.get('subject', ''),
+                payload.get('message', ''),
+                payload.get('code')
+            )
+        elif notification.channel == 'SMS':
+            result = AlternativeEmailService.send_sms_code(notification.recipient, payload.get('code'))
+        else:
+            return False, f"Unknown channel: {notification.channel}"
+
+        return result.get('success', False), result.get('error', '')
+
+    @staticmethod
+    def redact(payload):
+        """payload as kept on a dead-lettered row: diagnostic fields plus the names of those removed"""
+        kept = {name: payload[name] for name in NotificationService.DIAGNOSTIC_FIELDS if name in payload}
+        removed = sorted(set(payload) - set(kept))
+        if removed:
+            kept['redacted'] = removed
+        return kept
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Exponential backoff with jitter for the given attempt count"""
+        delay = min(NotificationService.BASE_DELAY * 2 ** (attempts - 1), NotificationService.MAX_DELAY)
+        return delay + random.uniform(0, delay / 10)
+
+    @staticmethod
+    def process_batch(batch_size=None):
+        """Claim and send one batch, returning (sent, failed, dead)"""
+        batch = NotificationService.claim_batch(batch_size)
+        if not batch:
+            return 0, 0, 0
+
+        sent_ids = []
+        failed = []
+        dead = 0
+        now = timezone.now()
+        lease_until = batch[0].next_attempt_at
+        renew_after = timedelta(seconds=NotificationService.LEASE_SECONDS / 2)
+
+        for notification in batch:
+            # A batch of slow sends (each can take a few SMTP timeouts) can
+            # outlast the lease. Outcomes are only written at the end, so
+            # renew it on the whole batch at half-time; otherwise another
+            # worker would claim and send the rows again
+            if timezone.now() >= lease_until - renew_after:
+                lease_until = NotificationService.renew_lease(batch)
+            try:
+                success, error = NotificationService.dispatch(notification)
+            except Exception as e:
+                success, error = False, str(e)
+
+            if success:
+                sent_ids.append(notification.id)
+                continue
+
+            notification.last_error = (error or 'Unknown error')[:1000]
+            if notification.attempts >= NotificationService.MAX_ATTEMPTS:
+                notification.status = 'DEAD'
+                # Like a sent row, a dead one must not keep its code readable
+                notification.payload = NotificationService.redact(notification.payload)
+                dead += 1
+                logger.error(f"Notification {notification.id} dead-lettered: {notification.last_error}")
+            else:
+                notification.status = 'PENDING'
+                notification.next_attempt_at = now + timedelta(
+                    seconds=NotificationService.retry_delay(notification.attempts)
+                )
+            failed.append(notification)
+
+        if sent_ids:
+            # Codes have no business staying in the table once delivered
+            OutboundNotification.objects.filter(id__in=sent_ids).update(
+                status='SENT', sent_at=now, payload={}, last_error=''
+            )
+        if failed:
+            OutboundNotification.objects.bulk_update(failed, ['status', 'next_attempt_at', 'last_error', 'payload'])
+
+        return len(sent_ids), len(failed) - dead, dead
@@ -0,0 +1,151 @@
+import base64
+import html
+from email.header import Header
+from string import Formatter
+
+# Headers shared by every rendered message. The HTML body is sent base64
+# encoded so localized (non-ASCII) templates need no per-message MIME work.
+STATIC_HEADERS = (
+    'MIME-Version: 1.0\n'
+    'Content-Type: text/html; charset="utf-8"\n'
+    'Content-Transfer-Encoding: base64\n'
+)
+
+
+class CompiledText:
+    """A ``{field}`` template parsed once into a %-format string.
+
+    Literal text is kept as-is (with ``%`` escaped) and every field becomes
+    a ``%s`` slot, so rendering is a single C-level string format instead
+    of re-parsing the template on every send. Only plain ``{name}`` fields
+    are supported; format specs, conversions, attribute or index lookups
+    raise ValueError here rather than being silently dropped.
+    """
+
+    __slots__ = ('fields', '_format', '_escape')
+
+    def __init__(self, text, escape=True):
+        chunks = []
+        fields = []
+        for literal, field, spec, conversion in Formatter().parse(text):
+            chunks.append(literal.replace('%', '%%'))
+            if field is not None:
+                if spec or conversion or not field.isidentifier():
+                    raise ValueError(f"Unsupported template field {{{field}{'!' + conversion if conversion else ''}"
+                                     f"{':' + spec if spec else ''}}}; use a plain {{name}}")
+                chunks.append('%s')
+                fields.append(field)
+        self.fields = tuple(fields)
+        self._format = ''.join(chunks)
+        self._escape = escape
+
+    def render(self, context):
+        if not self.fields:
+            return self._format % ()
+        if self._escape:
+            return self._format % tuple(html.escape(str(context[field])) for field in self.fields)
+        return self._format % tuple(str(context[field]) for field in self.fields)
+
+
+class NotificationTemplate:
+    """Subject and HTML body for one kind of email in one locale"""
+
+    __slots__ = ('subject', 'body', '_subject_header')
+
+    def __init__(self, subject, body):
+        if '\n' in subject or '\r' in subject:
+            raise ValueError("Subject must be a single line")
+        self.subject = CompiledText(subject, escape=False)
+        self.body = CompiledText(body)
+        # Static subjects (the common case) are header-encoded once
+        self._subject_header = None if self.subject.fields else self._encode_subject(subject)
+
+    @staticmethod
+    def _encode_subject(subject):
+        try:
+            subject.encode('ascii')
+            return subject
+        except UnicodeEncodeError:
+            return Header(subject, 'utf-8').encode()
+
+    def render(self, context):
+        """Return (subject, html_body)"""
+        return self.subject.render(context), self.body.render(context)
+
+    def render_message(self, sender, recipient, context):
+        """Return a complete RFC 5322 message ready for SMTP sendmail"""
+        if '\n' in recipient or '\r' in recipient:
+            raise ValueError("Invalid recipient address")
+
+        subject = self._subject_header
+        if subject is None:
+            rendered = self.subject.render(context)
+            # A line break in a context value would start a new header
+            if '\n' in rendered or '\r' in rendered:
+                raise ValueError("Invalid subject")
+            subject = self._encode_subject(rendered)
+        body = base64.encodebytes(self.body.render(context).encode('utf-8')).decode('ascii')
+        return f"From: {sender}\nTo: {recipient}\nSubject: {subject}\n{STATIC_HEADERS}\n{body}"
+
+
+class TemplateRegistry:
+    """Compiled notification templates keyed by (name, locale)"""
+
+    DEFAULT_LOCALE = 'en'
+
+    def __init__(self):
+        self._templates = {}
+
+    def register(self, name, subject, body, locale=DEFAULT_LOCALE):
+        self._templates[(name, locale)] = NotificationTemplate(subject, body)
+
+    def get(self, name, locale=None):
+        """Template for name in locale, falling back to the default locale"""
+        template = self._templates.get((name, locale or self.DEFAULT_LOCALE))
+        if template is None:
+            template = self._templates.get((name, self.DEFAULT_LOCALE))
+        if template is None:
+            raise KeyError(f"No notification template named {name!r}")
+        return template
+
+    def __contains__(self, name):
+        return (name, self.DEFAULT_LOCALE) in self._templates
+
+
+templates = TemplateRegistry()
+
+templates.register(
+    'login_code',
+    'BPAY - Your Login Verification Code',
+    """
+            <html><body>
+            <h1>BPAY Login Code</h1>
+            <p>Your verification code is: <strong>{code}</strong></p>
+            <p>This code expires in 5 minutes.</p>
+            </body></html>
+            """
+)
+
+templates.register(
+    'registration_code',
+    'BPAY - Verify Your Registration',
+    """
+            <html><body>
+            <h1>Welcome to BPAY</h1>
+            <p>Your registration code is: <strong>{code}</strong></p>
+            <p>This code expires in 10 minutes.</p>
+            </body></html>
+            """
+)
+
+templates.register(
+    'reset_code',
+    'BPAY - Password Reset Code',
+    """
+            <html><body>
+            <h1>BPAY Password Reset</h1>
+            <p>Your reset code is: <strong>{code}</strong></p>
+            <p>This code expires in 5 minutes.</p>
+            </body></html>
+            """
+)
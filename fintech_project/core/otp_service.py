@@ -0,0 +1,119 @@
+import hmac
+import hashlib
+import secrets
+import string
+from django.conf import settings
+from django.core.cache import cache
+
+
+class OTPLocked(Exception):
+    """Raised when too many wrong codes were tried for a purpose/email pair"""
+
+
+class OTPService:
+    """One-time codes for login, registration and password reset.
+
+    Each purpose/email pair holds a truncated HMAC of its current code (never
+    the code itself); the optional payload is stored under a second key
+    named after that HMAC. A separate counter caps guesses: once
+    MAX_ATTEMPTS have been made the live code is burned and no new one is
+    issued until the lockout window ends. A correct code is consumed by
+    deleting its payload key, and only the caller whose ``cache.delete``
+    returns True gets the payload, so a code can never be used twice, even
+    if a new code is issued while it is being verified.
+    """
+
+    CODE_LENGTH = 6
+    MAX_ATTEMPTS = 5
+    LOCKOUT_SECONDS = 900
+    TTLS = {
+        'login': 300,      # 5 minutes
+        'reset': 300,      # 5 minutes
+        'register': 600,   # 10 minutes
+    }
+
+    @staticmethod
+    def _key(purpose, email):
+        email_digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:24]
+        return f"otp:{purpose}:{email_digest}"
+
+    @staticmethod
+    def _digest(purpose, email, code):
+        message = f"{purpose}:{email.strip().lower()}:{code}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()[:16]
+
+    @staticmethod
+    def link_token(purpose, email, code):
+        """Token binding a magic link to its code, checked by magic_login"""
+        return OTPService._digest(f"link:{purpose}", email, code).hex()
+
+    @staticmethod
+    def _exhausted(attempts):
+        """True once attempts guesses leave none to make"""
+        return attempts >= OTPService.MAX_ATTEMPTS
+
+    @staticmethod
+    def is_locked(purpose, email):
+        return OTPService._exhausted(cache.get(f"{OTPService._key(purpose, email)}:n", 0))
+
+    @staticmethod
+    def issue(purpose, email, payload=None):
+        """Generate a code for email, replacing any earlier one, and return it"""
+        if OTPService.is_locked(purpose, email):
+            raise OTPLocked(f"Too many attempts for {purpose} code")
+
+        code = ''.join(secrets.choice(string.digits) for _ in range(OTPService.CODE_LENGTH))
+        key = OTPService._key(purpose, email)
+
+        digest = OTPService._digest(purpose, email, code)
+        ttl = OTPService.TTLS[purpose]
+        cache.set(f"{key}:{digest.hex()}", (payload,), ttl)
+        cache.set(key, digest, ttl)
+        # Starts the lockout window on first issue, left alone on re-issue
+        cache.add(f"{key}:n", 0, OTPService.LOCKOUT_SECONDS)
+        return code
+
+    @staticmethod
+    def verify(purpose, email, code):
+        """Check and consume a code.
+
+        Returns the payload stored with the code (True when there is none),
+        or None if the code is wrong, expired, already used or locked out.
+        """
+        if not email or not code:
+            return None
+
+        key = OTPService._key(purpose, email)
+        current = cache.get(key)
+        # Not bytes: a (digest, payload) record from before payloads had their own key
+        if not isinstance(current, bytes):
+            return None
+
+        # The counter is bumped before the code is checked, so concurrent
+        # guesses cannot all slip in under the limit
+        try:
+            attempts = cache.incr(f"{key}:n")
+        except ValueError:
+            attempts = 1
+            cache.set(f"{key}:n", attempts, OTPService.LOCKOUT_SECONDS)
+
+        # Guesses made before this one, compared the same way as is_locked
+        if OTPService._exhausted(attempts - 1):
+            cache.delete(key)
+            return None
+
+        digest = OTPService._digest(purpose, email, str(code))
+        if not hmac.compare_digest(current, digest):
+            return None
+
+        # Only one concurrent verifier gets True back from delete, and it
+        # can only consume the payload of the code it was given
+        record_key = f"{key}:{digest.hex()}"
+        record = cache.get(record_key)
+        if record is None or not cache.delete(record_key):
+            return None
+        cache.delete(key)
+        cache.delete(f"{key}:n")
+
+        payload, = record
+        return True if payload is None else payload
@@ -0,0 +1,88 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password hashing pool cannot take more work"""
+
+
+class PasswordHashingService:
+    """Run PBKDF2 hashing on a dedicated, bounded thread pool.
+
+    Hashing is CPU-bound, so a login burst handled on request threads starves
+    every other endpoint. Work is submitted to a small executor instead, and
+    once ``PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_DEPTH`` jobs are in
+    flight new requests are rejected with ``PasswordPoolBusy`` (sent as 503).
+    """
+
+    _executor = None
+    _slots = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_pool(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    workers = settings.PASSWORD_HASH_WORKERS
+                    cls._slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASH_QUEUE_DEPTH)
+                    cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        return cls._executor, cls._slots
+
+    @classmethod
+    def _run(cls, func, *args):
+        executor, slots = cls._get_pool()
+        if not slots.acquire(blocking=False):
+            logger.warning("Password hashing queue full, shedding request")
+            raise PasswordPoolBusy("Password hashing queue is full")
+
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda f: slots.release())
+
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+        except TimeoutError:
+            raise PasswordPoolBusy("Password hashing timed out")
+
+    @classmethod
+    def verify(cls, user, raw_password):
+        """Check a user's password off the request thread.
+
+        Mirrors ``AbstractBaseUser.check_password``: when the stored hash uses
+        an outdated hasher or iteration count it is re-hashed and saved.
+        """
+        if raw_password is None or not user.has_usable_password():
+            return False
+
+        needs_upgrade = []
+        is_correct = cls._run(check_password, raw_password, user.password, needs_upgrade.append)
+
+        if is_correct and needs_upgrade:
+            try:
+                user.password = cls.hash(raw_password)
+                user.save(update_fields=['password'])
+            except PasswordPoolBusy:
+                # Not worth failing a login over, upgrade on the next one
+                pass
+
+        return is_correct
+
+    @classmethod
+    def hash(cls, raw_password):
+        """Return an encoded hash for raw_password using the preferred hasher"""
+        return cls._run(make_password, raw_password)
+
+    @classmethod
+    def set_password(cls, user, raw_password):
+        """Equivalent of ``user.set_password`` with hashing done on the pool"""
+        user.password = cls.hash(raw_password)
+        user._password = raw_password
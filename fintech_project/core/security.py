@@ -51,30 +51,57 @@ class FinancialValidator:
         
         return address
     
+    @staticmethod
+    def validate_payout_destination(destination, currency):
+        """Validate where a payout goes: a NUBAN account for NGN, an M-Pesa number for KES, else a crypto address"""
+        patterns = {
+            'NGN': (r'^\d{10}$', "NGN destination must be a 10-digit bank account number"),
+            'KES': (r'^(?:\+?254|0)[17]\d{8}$', "KES destination must be an M-Pesa phone number"),
+        }
+        
+        if currency in patterns:
+            pattern, message = patterns[currency]
+            if not re.match(pattern, destination):
+                raise ValidationError(message)
+            return destination
+        
+        return FinancialValidator.validate_wallet_address(destination, currency)
+    
     @staticmethod
     def check_daily_limits(user, amount, currency):
         """Check if transaction exceeds daily limits"""
         from django.utils import timezone
+        from django.db.models import Sum
         from datetime import timedelta
-        from .models import Transaction
+        from .models import Transaction, BalanceHold
+        from . import money
         
         today = timezone.now().date()
         start_of_day = timezone.make_aware(timezone.datetime.combine(today, timezone.datetime.min.time()))
         
-        # Get today's transactions
-        today_transactions = Transaction.objects.filter(
+        # Today's outgoing total, summed in minor units by the database
+        outgoing_minor = Transaction.objects.filter(
+            wallet__owner=user,
+            wallet__currency=currency,
+            created_at__gte=start_of_day,
+            type__in=['WITHDRAW', 'TRANSFER'],
+            amount_minor__lt=0
+        ).aggregate(total=Sum('amount_minor'))['total'] or 0
+        # Plus queued transfers and pending withdrawals, not booked yet
+        held_minor = BalanceHold.objects.filter(
             wallet__owner=user,
             wallet__currency=currency,
             created_at__gte=start_of_day,
-            type__in=['WITHDRAW', 'TRANSFER']
-        )
+            type__in=['WITHDRAW', 'TRANSFER'],
+            status='HELD'
+        ).aggregate(total=Sum('amount_minor'))['total'] or 0
         
-        today_total = sum(t.amount for t in today_transactions)
+        today_total = money.to_decimal(held_minor - outgoing_minor, currency)
         user_profile = getattr(user, 'profile', None)
         
         if user_profile:
             daily_limit = user_profile.daily_limit
-            if today_total + amount > daily_limit:
+            if today_total + Decimal(str(amount)) > daily_limit:
                 raise ValidationError(f"Daily limit of {daily_limit} {currency} exceeded")
         
         return True
@@ -1,15 +1,32 @@
 from rest_framework import serializers
+from . import money
 from .models import Wallet, Transaction, KYCDocument
 
 
 class WalletSerializer(serializers.ModelSerializer):
+    balance = serializers.SerializerMethodField()
+    # Balance less funds held for pending withdrawals: what can be spent now
+    available_balance = serializers.SerializerMethodField()
+
     class Meta:
         model = Wallet
-        fields = ['id', 'owner', 'currency', 'balance', 'deposit_address', 'created_at']
-        read_only_fields = ['owner', 'balance', 'created_at']
+        fields = ['id', 'owner', 'currency', 'balance', 'available_balance', 'deposit_address', 'created_at']
+        read_only_fields = ['owner', 'created_at']
+
+    def get_balance(self, obj):
+        return money.format_minor(obj.balance_minor, obj.currency)
+
+    def get_available_balance(self, obj):
+        return money.format_minor(obj.available_minor, obj.currency)
 
 
 class TransactionSerializer(serializers.ModelSerializer):
+    # Needs wallet.currency: select_related('wallet') in list views
+    amount = serializers.SerializerMethodField()
+
+    def get_amount(self, obj):
+        return money.format_minor(obj.amount_minor, obj.wallet.currency)
+
     class Meta:
         model = Transaction
         fields = ['id', 'wallet', 'type', 'amount', 'counterparty', 'metadata', 'created_at']
@@ -17,7 +34,41 @@ class TransactionSerializer(serializers.ModelSerializer):
 
 
 class KYCDocumentSerializer(serializers.ModelSerializer):
+    thumbnail = serializers.ImageField(read_only=True)
+
+    class Meta:
+        model = KYCDocument
+        fields = ['id', 'user', 'document', 'thumbnail', 'doc_type', 'country', 'status', 'processing_status', 'reviewed_by', 'reviewed_at', 'created_at']
+        read_only_fields = ['user', 'status', 'processing_status', 'reviewed_by', 'reviewed_at', 'created_at']
+
+
+class KYCReviewQueueSerializer(serializers.ModelSerializer):
+    """One row of the admin review queue; no extracted data, kept small"""
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+    assigned_to_email = serializers.EmailField(source='assigned_to.email', read_only=True, default=None)
+    document_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    review_url = serializers.SerializerMethodField()
+
     class Meta:
         model = KYCDocument
-        fields = ['id', 'user', 'document', 'doc_type', 'country', 'status', 'reviewed_by', 'reviewed_at', 'created_at']
-        read_only_fields = ['user', 'status', 'reviewed_by', 'reviewed_at', 'created_at']
+        fields = ['id', 'user_email', 'doc_type', 'country', 'confidence_score', 'status', 'processing_status',
+                  'duplicate_of', 'assigned_to_email', 'claimed_at', 'created_at',
+                  'document_url', 'thumbnail_url', 'review_url']
+        read_only_fields = fields
+
+    def get_document_url(self, obj):
+        return obj.document.url if obj.document else None
+
+    def get_thumbnail_url(self, obj):
+        return obj.thumbnail.url if obj.thumbnail else None
+
+    def get_review_url(self, obj):
+        # Falls back to the original until the worker has rendered it
+        return obj.review_image.url if obj.review_image else self.get_document_url(obj)
+
+
+class KYCReviewDetailSerializer(KYCReviewQueueSerializer):
+    class Meta(KYCReviewQueueSerializer.Meta):
+        fields = KYCReviewQueueSerializer.Meta.fields + ['extracted_data']
+        read_only_fields = fields
@@ -1,22 +1,11 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Wallet
+from .account_service import AccountProvisioningService
 
 @receiver(post_save, sender=User)
 def create_default_wallets(sender, instance, created, **kwargs):
     """Create mandatory NGN and KES wallets for new users"""
-    if created:
-        # Create NGN wallet
-        Wallet.objects.create(
-            owner=instance,
-            currency='NGN',
-            balance=0
-        )
-        
-        # Create KES wallet
-        Wallet.objects.create(
-            owner=instance,
-            currency='KES', 
-            balance=0
-        )
\ No newline at end of file
+    # Accounts created through AccountProvisioningService already have them
+    if created and not getattr(instance, '_skip_default_wallets', False):
+        AccountProvisioningService.create_default_wallets(instance)
\ No newline at end of file
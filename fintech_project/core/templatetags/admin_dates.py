@@ -0,0 +1,100 @@
+import datetime
+from django import template
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.db import models
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def _bounds(queryset, field_name):
+    """Oldest and newest value of field_name; MIN/MAX are index lookups"""
+    bounds = queryset.aggregate(first=models.Min(field_name), last=models.Max(field_name))
+    if not (bounds['first'] and bounds['last']):
+        return None, None
+    return tuple(timezone.localtime(v) if timezone.is_aware(v) else v for v in (bounds['first'], bounds['last']))
+
+
+def indexed_date_hierarchy(cl):
+    """Like admin's date_hierarchy, but choices span MIN..MAX of the current
+    level instead of SELECT DISTINCT over every row. A period with no rows
+    can be listed; it links to an empty page."""
+    field_name = cl.date_hierarchy
+    year_field = f"{field_name}__year"
+    month_field = f"{field_name}__month"
+    day_field = f"{field_name}__day"
+    year_lookup = cl.params.get(year_field)
+    month_lookup = cl.params.get(month_field)
+    day_lookup = cl.params.get(day_field)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f"{field_name}__"])
+
+    if year_lookup and month_lookup and day_lookup:
+        day = datetime.date(int(year_lookup), int(month_lookup), int(day_lookup))
+        return {
+            'show': True,
+            'back': {
+                'link': link({year_field: year_lookup, month_field: month_lookup}),
+                'title': capfirst(formats.date_format(day, 'YEAR_MONTH_FORMAT')),
+            },
+            'choices': [{'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))}],
+        }
+
+    # cl.queryset is already narrowed to the selected year/month
+    first, last = _bounds(cl.queryset, field_name)
+    if not (year_lookup or month_lookup) and first:
+        if first.year == last.year:
+            year_lookup = first.year
+            if first.month == last.month:
+                month_lookup = first.month
+
+    if year_lookup and month_lookup:
+        days = range(first.day, last.day + 1) if first else []
+        return {
+            'show': True,
+            'back': {'link': link({year_field: year_lookup}), 'title': str(year_lookup)},
+            'choices': [
+                {
+                    'link': link({year_field: year_lookup, month_field: month_lookup, day_field: day}),
+                    'title': capfirst(formats.date_format(
+                        datetime.date(int(year_lookup), int(month_lookup), day), 'MONTH_DAY_FORMAT'
+                    )),
+                }
+                for day in days
+            ],
+        }
+    if year_lookup:
+        months = range(first.month, last.month + 1) if first else []
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [
+                {
+                    'link': link({year_field: year_lookup, month_field: month}),
+                    'title': capfirst(formats.date_format(
+                        datetime.date(int(year_lookup), month, 1), 'YEAR_MONTH_FORMAT'
+                    )),
+                }
+                for month in months
+            ],
+        }
+    years = range(first.year, last.year + 1) if first else []
+    return {
+        'show': True,
+        'back': None,
+        'choices': [{'link': link({year_field: str(year)}), 'title': str(year)} for year in years],
+    }
+
+
+@register.tag(name='indexed_date_hierarchy')
+def indexed_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=indexed_date_hierarchy,
+        template_name='date_hierarchy.html',
+        takes_context=False,
+    )
@@ -0,0 +1,130 @@
+"""A local SMTP stand-in for tests and benchmarks.
+
+Speaks just enough SMTP for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN, MAIL,
+RCPT, DATA, RSET, NOOP and QUIT. Each connection is served by its own
+thread. ``greeting_delay`` holds back the greeting to model the cost of
+opening a real connection (TCP, STARTTLS and LOGIN round trips to a
+remote server). Recipients in ``refuse`` are rejected with 550.
+"""
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.open_connections += 1
+            server.max_open_connections = max(server.max_open_connections, server.open_connections)
+            server.sockets.add(self.connection)
+        try:
+            time.sleep(server.greeting_delay)
+            self.reply('220 localhost SMTP stand-in')
+            self.session()
+        except OSError:
+            pass
+        finally:
+            with server.lock:
+                server.open_connections -= 1
+                server.sockets.discard(self.connection)
+
+    def session(self):
+        server = self.server
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(' ', 1)[0].upper()
+            with server.lock:
+                server.commands.append(verb)
+
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 AUTH PLAIN LOGIN')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'AUTH':
+                if command.upper().startswith('AUTH LOGIN'):
+                    # Username, then password, each prompted for
+                    for prompt in ('334 VXNlcm5hbWU6', '334 UGFzc3dvcmQ6'):
+                        self.reply(prompt)
+                        self.rfile.readline()
+                self.reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip().strip('<>')
+                if address in server.refuse:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b'.\r\n':
+                        break
+                    lines.append(data)
+                with server.lock:
+                    server.messages.append((recipients, b''.join(lines)))
+                self.reply('250 OK queued')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Start with ``with SMTPStandIn() as smtp:``; connect to smtp.port on 127.0.0.1"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, greeting_delay=0.0, refuse=()):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.greeting_delay = greeting_delay
+        self.refuse = set(refuse)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.commands = []
+        self.messages = []
+        self.sockets = set()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def drop_connections(self):
+        """Close every client connection from the server side"""
+        with self.lock:
+            sockets = list(self.sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(2)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.drop_connections()
+        self.server_close()
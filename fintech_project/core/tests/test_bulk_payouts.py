@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from core.bulk_payouts import BulkPayoutService
+from core.models import Wallet, PaymentGateway, WithdrawalRequest
+
+
+class BulkPayoutDestinationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('payer@example.com', 'payer@example.com', 'pw')
+        PaymentGateway.objects.create(name='FLUTTERWAVE', config={'supported_currencies': ['NGN']})
+        PaymentGateway.objects.create(name='SASAPAY', config={'supported_currencies': ['KES']})
+        for currency in ('NGN', 'KES'):
+            wallet, _ = Wallet.objects.get_or_create(owner=self.user, currency=currency)
+            Wallet.objects.filter(id=wallet.id).update(balance_minor=100000)
+
+    def upload(self, body):
+        results = list(BulkPayoutService.process(self.user, body.encode().splitlines(keepends=True), 'csv'))
+        return results[:-1]
+
+    def test_malformed_fiat_destinations_are_rejected_before_the_hold(self):
+        rows = self.upload(
+            'currency,amount,destination\n'
+            'NGN,10,x\n'
+            'NGN,10,0123456789\n'
+            'KES,10,12345\n'
+            'KES,10,+254712345678\n'
+        )
+        self.assertEqual([row['status'] for row in rows], ['rejected', 'accepted', 'rejected', 'accepted'])
+        self.assertIn('bank account', rows[0]['error'])
+        self.assertIn('M-Pesa', rows[2]['error'])
+        self.assertEqual(WithdrawalRequest.objects.count(), 2)
+        self.assertEqual(Wallet.objects.get(owner=self.user, currency='NGN').held_minor, 1000)
@@ -0,0 +1,169 @@
+import json
+import time
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from core.google_auth import GoogleAuthService, GoogleKeySet
+
+try:
+    import jwt
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jwt.algorithms import RSAAlgorithm
+except ImportError:
+    jwt = None
+
+CLIENT_ID = 'test-client.apps.googleusercontent.com'
+JWKS_URL = 'https://jwks.test/certs'
+
+
+def make_key(kid):
+    """(private key, public JWK dict) for a fresh RSA key"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=kid, alg='RS256', use='sig')
+    return private_key, jwk
+
+
+def jwks_response(*jwks, max_age=3600):
+    """A stand-in for requests' response to the JWKS URL"""
+    response = mock.Mock(headers={'Cache-Control': f'public, max-age={max_age}'})
+    response.json.return_value = {'keys': list(jwks)}
+    response.raise_for_status.return_value = None
+    return response
+
+
+def sign(private_key, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        'iss': 'https://accounts.google.com',
+        'aud': CLIENT_ID,
+        'sub': '1234567890',
+        'email': 'ada@example.com',
+        'email_verified': True,
+        'name': 'Ada Lovelace',
+        'iat': now,
+        'exp': now + 3600,
+        **overrides,
+    }
+    return jwt.encode(claims, private_key, algorithm='RS256', headers={'kid': kid})
+
+
+class JWKSTestMixin:
+    """A local JWKS with one key, installed on a fresh GoogleAuthService.key_set"""
+
+    def setUp(self):
+        super().setUp()
+        self.private_key, self.jwk = make_key('key-1')
+        self.key_set = GoogleKeySet(JWKS_URL)
+        self.key_set.load({'keys': [self.jwk]})
+        # A fetch has just happened, as after a real cold start
+        self.key_set._last_fetch = time.time()
+        patcher = mock.patch.object(GoogleAuthService, 'key_set', self.key_set)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(GOOGLE_CLIENT_ID=CLIENT_ID)
+class VerifyIdTokenTests(JWKSTestMixin, SimpleTestCase):
+
+    def setUp(self):
+        if jwt is None:
+            self.skipTest('PyJWT[crypto] not installed')
+        super().setUp()
+
+    def test_valid_token(self):
+        info = GoogleAuthService.verify_id_token(sign(self.private_key, 'key-1'))
+        self.assertEqual(info['email'], 'ada@example.com')
+        self.assertEqual(info['name'], 'Ada Lovelace')
+        self.assertTrue(info['verified_email'])
+
+    def test_wrong_audience(self):
+        token = sign(self.private_key, 'key-1', aud='someone-else.apps.googleusercontent.com')
+        self.assertIsNone(GoogleAuthService.verify_id_token(token))
+
+    def test_wrong_issuer(self):
+        token = sign(self.private_key, 'key-1', iss='https://evil.example.com')
+        self.assertIsNone(GoogleAuthService.verify_id_token(token))
+
+    def test_expired_token(self):
+        token = sign(self.private_key, 'key-1', iat=int(time.time()) - 7200, exp=int(time.time()) - 3600)
+        self.assertIsNone(GoogleAuthService.verify_id_token(token))
+
+    def test_signed_by_another_key(self):
+        other_key, _ = make_key('key-1')
+        self.assertIsNone(GoogleAuthService.verify_id_token(sign(other_key, 'key-1')))
+
+    def test_unknown_kid_refreshes_keys(self):
+        new_key, new_jwk = make_key('key-2')
+        self.key_set._last_fetch = 0.0
+        with mock.patch('core.google_auth.requests.get', return_value=jwks_response(self.jwk, new_jwk)) as get:
+            info = GoogleAuthService.verify_id_token(sign(new_key, 'key-2'))
+        get.assert_called_once_with(JWKS_URL, timeout=10)
+        self.assertEqual(info['email'], 'ada@example.com')
+
+    def test_unknown_kid_refresh_is_throttled(self):
+        rogue_key, _ = make_key('key-9')
+        with mock.patch('core.google_auth.requests.get') as get:
+            self.assertIsNone(GoogleAuthService.verify_id_token(sign(rogue_key, 'key-9')))
+        get.assert_not_called()
+
+
+class KeySetRefreshTests(JWKSTestMixin, SimpleTestCase):
+
+    def setUp(self):
+        if jwt is None:
+            self.skipTest('PyJWT[crypto] not installed')
+        super().setUp()
+        # Keys expired a minute ago, last fetched before that
+        self.key_set._expires_at = time.time() - 60
+        self.key_set._last_fetch = time.time() - 3600
+
+    def refresh_quietly(self):
+        # _refresh_in_background() without the thread
+        try:
+            self.key_set.refresh()
+        except Exception:
+            pass
+
+    def test_last_good_keys_served_after_failed_refresh(self):
+        with mock.patch('core.google_auth.requests.get', side_effect=ConnectionError('unreachable')) as get, \
+                mock.patch.object(self.key_set, '_refresh_in_background', side_effect=self.refresh_quietly):
+            for _ in range(5):
+                self.assertIsNotNone(self.key_set.get_key('key-1'))
+        get.assert_called_once()
+
+    def test_failed_refresh_is_throttled(self):
+        self.key_set.stale_grace = 0
+        with mock.patch('core.google_auth.requests.get', side_effect=ConnectionError('unreachable')) as get:
+            for _ in range(5):
+                self.assertIsNone(self.key_set.get_key('key-1'))
+        get.assert_called_once()
+
+    def test_keys_dropped_after_grace_period(self):
+        self.key_set._expires_at = time.time() - self.key_set.stale_grace - 1
+        with mock.patch('core.google_auth.requests.get', side_effect=ConnectionError('unreachable')):
+            self.assertIsNone(self.key_set.get_key('key-1'))
+
+
+@override_settings(GOOGLE_CLIENT_ID=CLIENT_ID)
+class GoogleAuthViewTests(JWKSTestMixin, TestCase):
+
+    def setUp(self):
+        if jwt is None:
+            self.skipTest('PyJWT[crypto] not installed')
+        super().setUp()
+
+    def test_accepts_credential(self):
+        # What the frontend's Google Identity Services button posts
+        response = APIClient().post(
+            '/api/auth/google/', {'credential': sign(self.private_key, 'key-1')}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertTrue(User.objects.filter(email='ada@example.com').exists())
+
+    def test_rejects_bad_credential(self):
+        token = sign(self.private_key, 'key-1', aud='someone-else.apps.googleusercontent.com')
+        response = APIClient().post('/api/auth/google/', {'credential': token}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,84 @@
+import smtplib
+import threading
+import time
+from django.test import SimpleTestCase
+from core.mail_transport import SMTPConnectionPool
+from core.tests.smtp_server import SMTPStandIn
+
+MESSAGE = 'Subject: Your code\r\n\r\n123456\r\n'
+
+
+class SMTPConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.smtp = SMTPStandIn(refuse={'nobody@example.com'}).__enter__()
+        self.addCleanup(self.smtp.__exit__, None, None, None)
+
+    def make_pool(self, **kwargs):
+        pool = SMTPConnectionPool('127.0.0.1', self.smtp.port, username='user', password='secret',
+                                  use_tls=False, **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_one_connection(self):
+        pool = self.make_pool()
+        for _ in range(5):
+            pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        self.assertEqual(len(self.smtp.messages), 5)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(self.smtp.commands.count('AUTH'), 1)
+
+    def test_concurrent_senders_share_size_connections(self):
+        pool = self.make_pool(size=2)
+
+        def send():
+            for _ in range(5):
+                pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.smtp.messages), 20)
+        self.assertLessEqual(self.smtp.max_open_connections, 2)
+
+    def test_reconnects_after_server_drops_connection(self):
+        pool = self.make_pool()
+        pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        self.smtp.drop_connections()
+        time.sleep(0.1)
+        pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertEqual(self.smtp.connections, 2)
+
+    def test_refused_recipient_keeps_connection(self):
+        pool = self.make_pool()
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            pool.send('bank@example.com', ['nobody@example.com'], MESSAGE)
+        pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertEqual(self.smtp.connections, 1)
+
+    def test_idle_connection_checked_before_reuse(self):
+        pool = self.make_pool(max_idle=0)
+        pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        self.assertIn('NOOP', self.smtp.commands)
+        self.assertEqual(self.smtp.connections, 1)
+
+    def test_pooled_sends_skip_the_handshake(self):
+        # Each new connection pays for a greeting and EHLO; pooled sends pay once
+        pool = self.make_pool()
+        for _ in range(5):
+            pool.send('bank@example.com', ['ada@example.com'], MESSAGE)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(self.smtp.commands.count('EHLO'), 1)
+
+        for _ in range(5):
+            server = smtplib.SMTP('127.0.0.1', self.smtp.port, timeout=10)
+            server.sendmail('bank@example.com', ['ada@example.com'], MESSAGE)
+            server.quit()
+        self.assertEqual(self.smtp.connections, 6)
+        self.assertEqual(self.smtp.commands.count('EHLO'), 6)
+        self.assertEqual(len(self.smtp.messages), 10)
@@ -0,0 +1,43 @@
+import os
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+from core.media import ProtectedMediaStorage
+
+CONTENT = b'0123456789' * 10
+
+
+class ProtectedMediaTests(SimpleTestCase):
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(MEDIA_ROOT=root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.name = 'kyc/my passport?.jpg'
+        os.makedirs(os.path.join(root.name, 'kyc'))
+        with open(os.path.join(root.name, self.name), 'wb') as handle:
+            handle.write(CONTENT)
+        self.mtime = os.stat(os.path.join(root.name, self.name)).st_mtime
+        self.url = ProtectedMediaStorage().url(self.name)
+
+    def test_range_honoured_when_if_range_matches_etag_or_date(self):
+        etag = self.client.get(self.url)['ETag']
+        for validator in (etag, http_date(self.mtime)):
+            with self.subTest(validator=validator):
+                response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=validator)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), CONTENT[:10])
+
+    def test_stale_if_range_serves_the_whole_file(self):
+        for validator in ('"stale"', http_date(self.mtime - 60), 'not a date'):
+            with self.subTest(validator=validator):
+                response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=validator)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    @override_settings(MEDIA_DELIVERY='x-accel', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_accel_redirect_path_is_quoted(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/kyc/my%20passport%3F.jpg')
@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+from core.notification_templates import CompiledText, NotificationTemplate
+
+
+class CompiledTextTests(SimpleTestCase):
+
+    def test_renders_escaped_fields(self):
+        text = CompiledText('<p>100% {code} for {name}</p>')
+        self.assertEqual(text.render({'code': '123456', 'name': '<b>'}), '<p>100% 123456 for &lt;b&gt;</p>')
+
+    def test_rejects_specs_conversions_and_lookups(self):
+        for template in ('{amount:,.2f}', '{name!r}', '{user.email}', '{0}', '{}'):
+            with self.subTest(template=template), self.assertRaises(ValueError):
+                CompiledText(template)
+
+
+class NotificationTemplateTests(SimpleTestCase):
+
+    def test_rejects_line_breaks_in_rendered_subject(self):
+        template = NotificationTemplate('Hello {name}', '<p>{code}</p>')
+        for name in ('Ada\r\nBcc: eve@example.com', 'Ada\nBcc: eve@example.com'):
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                template.render_message('bank@example.com', 'ada@example.com', {'name': name, 'code': '1'})
+
+    def test_rejects_multiline_static_subject(self):
+        with self.assertRaises(ValueError):
+            NotificationTemplate('Hello\nBcc: eve@example.com', '<p>{code}</p>')
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from core.otp_service import OTPService, OTPLocked
+
+EMAIL = 'ada@example.com'
+
+
+class OTPServiceTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def wrong(self, code):
+        return '000000' if code != '000000' else '111111'
+
+    def test_code_is_consumed_once(self):
+        code = OTPService.issue('register', EMAIL, ('Ada', 'hash'))
+        self.assertEqual(OTPService.verify('register', EMAIL, code), ('Ada', 'hash'))
+        self.assertIsNone(OTPService.verify('register', EMAIL, code))
+
+    def test_last_allowed_attempt_can_succeed(self):
+        code = OTPService.issue('login', EMAIL)
+        for _ in range(OTPService.MAX_ATTEMPTS - 1):
+            self.assertIsNone(OTPService.verify('login', EMAIL, self.wrong(code)))
+        self.assertFalse(OTPService.is_locked('login', EMAIL))
+        self.assertIs(OTPService.verify('login', EMAIL, code), True)
+
+    def test_locked_after_max_attempts(self):
+        code = OTPService.issue('login', EMAIL)
+        for _ in range(OTPService.MAX_ATTEMPTS):
+            self.assertIsNone(OTPService.verify('login', EMAIL, self.wrong(code)))
+        self.assertTrue(OTPService.is_locked('login', EMAIL))
+        self.assertIsNone(OTPService.verify('login', EMAIL, code))
+        with self.assertRaises(OTPLocked):
+            OTPService.issue('login', EMAIL)
+
+    def test_replaced_code_cannot_consume_the_new_one(self):
+        old = OTPService.issue('reset', EMAIL)
+        new = OTPService.issue('reset', EMAIL)
+        if old != new:
+            self.assertIsNone(OTPService.verify('reset', EMAIL, old))
+        self.assertIs(OTPService.verify('reset', EMAIL, new), True)
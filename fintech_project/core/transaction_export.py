@@ -0,0 +1,136 @@
+import io
+import csv
+import json
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from . import money
+from .models import Transaction
+
+
+class TransactionExportService:
+    """Constant-memory CSV / NDJSON export of the transaction ledger.
+
+    Rows are read through a server-side cursor (``iterator(chunk_size)``)
+    as plain tuples, never model instances, and encoded one chunk at a
+    time. The same generators back the admin API endpoint, which streams
+    them as they are produced, and the export_transactions command.
+    """
+
+    CHUNK_SIZE = 2000
+
+    FORMATS = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+
+    COLUMNS = (
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('user_email', 'wallet__owner__email'),
+        ('currency', 'wallet__currency'),
+        ('type', 'type'),
+        ('amount', 'amount_minor'),
+        ('counterparty', 'counterparty'),
+        ('metadata', 'metadata'),
+    )
+
+    # Free-text columns a spreadsheet could read as a formula
+    TEXT_COLUMNS = ('user_email', 'counterparty')
+
+    @staticmethod
+    def _parse_bound(value, end=False):
+        """Datetime for a from/to filter; a bare date covers that whole day"""
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f"Invalid date: {value}")
+            moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    @staticmethod
+    def queryset(user=None, currency=None, type=None, date_from=None, date_to=None):
+        """Rows to export, oldest first; user is an email or a user id"""
+        queryset = Transaction.objects.all()
+
+        if user:
+            if str(user).isdigit():
+                queryset = queryset.filter(wallet__owner_id=int(user))
+            else:
+                queryset = queryset.filter(wallet__owner__email__iexact=user)
+        if currency:
+            queryset = queryset.filter(wallet__currency=currency.upper())
+        if type:
+            if type.upper() not in dict(Transaction.TRANSACTION_TYPES):
+                raise ValueError(f"Unknown transaction type: {type}")
+            queryset = queryset.filter(type=type.upper())
+        if date_from:
+            queryset = queryset.filter(created_at__gte=TransactionExportService._parse_bound(date_from))
+        if date_to:
+            queryset = queryset.filter(created_at__lt=TransactionExportService._parse_bound(date_to, end=True))
+
+        return queryset.order_by('id').values_list(*[lookup for _, lookup in TransactionExportService.COLUMNS])
+
+    @staticmethod
+    def _records(queryset, chunk_size):
+        names = [name for name, _ in TransactionExportService.COLUMNS]
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield dict(zip(names, row))
+
+    @staticmethod
+    def _safe_cell(value):
+        if value and value[0] in '=+-@\t\r':
+            return "'" + value
+        return value
+
+    @staticmethod
+    def csv_chunks(queryset, chunk_size=None):
+        """CSV text, header first, in pieces of about chunk_size rows"""
+        chunk_size = chunk_size or TransactionExportService.CHUNK_SIZE
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _ in TransactionExportService.COLUMNS])
+        # Send the header before the first chunk is fetched
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        for count, record in enumerate(TransactionExportService._records(queryset, chunk_size), 1):
+            for name in TransactionExportService.TEXT_COLUMNS:
+                record[name] = TransactionExportService._safe_cell(record[name])
+            record['created_at'] = record['created_at'].isoformat()
+            record['amount'] = money.format_minor(record['amount'], record['currency'])
+            record['metadata'] = json.dumps(record['metadata'], default=str) if record['metadata'] else ''
+            writer.writerow(record.values())
+            if count % chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    @staticmethod
+    def ndjson_chunks(queryset, chunk_size=None):
+        """One JSON object per line, in pieces of about chunk_size rows"""
+        chunk_size = chunk_size or TransactionExportService.CHUNK_SIZE
+        lines = []
+        for record in TransactionExportService._records(queryset, chunk_size):
+            record['created_at'] = record['created_at'].isoformat()
+            # Amounts stay strings so no precision is lost to floats
+            record['amount'] = money.format_minor(record['amount'], record['currency'])
+            lines.append(json.dumps(record, default=str))
+            if len(lines) == chunk_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def chunks(queryset, export_format, chunk_size=None):
+        if export_format == 'csv':
+            return TransactionExportService.csv_chunks(queryset, chunk_size)
+        if export_format == 'ndjson':
+            return TransactionExportService.ndjson_chunks(queryset, chunk_size)
+        raise ValueError(f"Unknown export format: {export_format}")
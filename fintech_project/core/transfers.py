@@ -0,0 +1,190 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Wallet, Transaction, BalanceHold, Transfer
+from .holds import BalanceHoldService, InsufficientFunds
+
+
+class TransferService:
+    """User-to-user transfers, booked as a TRANSFER leg on each wallet.
+
+    Wallet rows are always locked in id order, so two transfers touching
+    the same pair of wallets in opposite directions queue behind each
+    other instead of deadlocking.
+
+    transfer() settles one transfer in its own transaction. queue() only
+    holds the sender's funds; settle_batch() then books thousands of
+    queued transfers in one transaction, netting them into a single row
+    update per wallet. A popular recipient is written once per batch
+    rather than once per transfer, which is what serialises instant
+    transfers under contention.
+    """
+
+    BATCH_SIZE = 2000
+
+    @staticmethod
+    def _check(sender, recipient, amount_minor):
+        if sender.id == recipient.id:
+            raise ValueError("Cannot transfer to the same wallet")
+        if sender.currency != recipient.currency:
+            raise ValueError("Wallets must have the same currency")
+        if amount_minor <= 0:
+            raise ValueError("Amount must be greater than 0")
+
+    @staticmethod
+    def _lock(wallet_ids):
+        """Lock the wallets in id order; returns {id: Wallet}"""
+        return {
+            wallet.id: wallet
+            for wallet in (
+                Wallet.objects
+                .select_for_update()
+                .filter(id__in=wallet_ids)
+                .order_by('id')
+                .only('id', 'balance_minor', 'held_minor')
+            )
+        }
+
+    @staticmethod
+    def _legs(transfer, sender_email, recipient_email):
+        metadata = {'transfer_id': transfer.id, 'note': transfer.note}
+        return [
+            Transaction(
+                wallet_id=transfer.sender_id,
+                type='TRANSFER',
+                amount_minor=-transfer.amount_minor,
+                counterparty=recipient_email,
+                metadata={**metadata, 'to_wallet': transfer.recipient_id},
+            ),
+            Transaction(
+                wallet_id=transfer.recipient_id,
+                type='TRANSFER',
+                amount_minor=transfer.amount_minor,
+                counterparty=sender_email,
+                metadata={**metadata, 'from_wallet': transfer.sender_id},
+            ),
+        ]
+
+    @staticmethod
+    def transfer(sender, recipient, amount_minor, note='', limit_check=None):
+        """Move amount_minor from sender to recipient now; raises InsufficientFunds or ValueError.
+
+        limit_check, if given, is called once the sender's wallet is locked,
+        so a daily limit is checked against outgoing totals that no
+        concurrent transfer from the same wallet can change; whatever it
+        raises aborts the transfer.
+        """
+        TransferService._check(sender, recipient, amount_minor)
+
+        with transaction.atomic():
+            wallets = TransferService._lock([sender.id, recipient.id])
+            if limit_check:
+                limit_check()
+            if wallets[sender.id].balance_minor - wallets[sender.id].held_minor < amount_minor:
+                raise InsufficientFunds("Insufficient balance")
+
+            Wallet.objects.filter(id=sender.id).update(balance_minor=F('balance_minor') - amount_minor)
+            Wallet.objects.filter(id=recipient.id).update(balance_minor=F('balance_minor') + amount_minor)
+            transfer = Transfer.objects.create(
+                sender=sender,
+                recipient=recipient,
+                amount_minor=amount_minor,
+                note=note,
+                status='SETTLED',
+                settled_at=timezone.now(),
+            )
+            Transaction.objects.bulk_create(TransferService._legs(transfer, sender.owner.email, recipient.owner.email))
+        return transfer
+
+    @staticmethod
+    def queue(sender, recipient, amount_minor, note='', limit_check=None):
+        """Hold the funds and queue the transfer for settle_batch(); raises InsufficientFunds or ValueError.
+
+        limit_check is called with the sender's wallet locked, as in transfer().
+        """
+        TransferService._check(sender, recipient, amount_minor)
+
+        with transaction.atomic():
+            if limit_check:
+                TransferService._lock([sender.id])
+                limit_check()
+            hold = BalanceHoldService.place(
+                sender, amount_minor, 'TRANSFER',
+                counterparty=recipient.owner.email,
+                metadata={'to_wallet': recipient.id},
+            )
+            return Transfer.objects.create(
+                sender=sender,
+                recipient=recipient,
+                amount_minor=amount_minor,
+                note=note,
+                hold=hold,
+            )
+
+    @staticmethod
+    def settle_batch(batch_size=None):
+        """Settle up to batch_size queued transfers in one transaction, returning (settled, rejected)"""
+        now = timezone.now()
+        with transaction.atomic():
+            # skip_locked lets several settlers run side by side
+            transfers = list(
+                Transfer.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(status='QUEUED')
+                .select_related('sender__owner', 'recipient__owner')
+                .order_by('id')[:batch_size or TransferService.BATCH_SIZE]
+            )
+            if not transfers:
+                return 0, 0
+
+            # Locked so an operator releasing a hold waits for this batch
+            active_holds = set(
+                BalanceHold.objects
+                .select_for_update()
+                .filter(id__in=[t.hold_id for t in transfers if t.hold_id], status='HELD')
+                .values_list('id', flat=True)
+            )
+            wallets = TransferService._lock(
+                {t.sender_id for t in transfers} | {t.recipient_id for t in transfers}
+            )
+            balances = {wallet_id: wallet.balance_minor for wallet_id, wallet in wallets.items()}
+            held = defaultdict(int)
+            settled, captured, released, rejected = [], [], [], defaultdict(list)
+
+            # Applied in queue order against the locked balances
+            for t in transfers:
+                if t.hold_id not in active_holds:
+                    rejected['Hold is no longer active'].append(t.id)
+                    continue
+                if balances[t.sender_id] < t.amount_minor:
+                    # Only if the balance was lowered past its holds; give the funds back
+                    rejected['Insufficient balance'].append(t.id)
+                    released.append(t.hold_id)
+                    held[t.sender_id] -= t.amount_minor
+                    continue
+                balances[t.sender_id] -= t.amount_minor
+                balances[t.recipient_id] += t.amount_minor
+                held[t.sender_id] -= t.amount_minor
+                captured.append(t.hold_id)
+                settled.append(t)
+
+            changed = []
+            for wallet_id, wallet in wallets.items():
+                if balances[wallet_id] != wallet.balance_minor or held[wallet_id]:
+                    wallet.balance_minor = balances[wallet_id]
+                    wallet.held_minor += held[wallet_id]
+                    changed.append(wallet)
+            Wallet.objects.bulk_update(changed, ['balance_minor', 'held_minor'], batch_size=500)
+
+            BalanceHold.objects.filter(id__in=captured).update(status='CAPTURED', resolved_at=now)
+            BalanceHold.objects.filter(id__in=released).update(status='RELEASED', resolved_at=now)
+            Transfer.objects.filter(id__in=[t.id for t in settled]).update(status='SETTLED', settled_at=now)
+            for error, ids in rejected.items():
+                Transfer.objects.filter(id__in=ids).update(status='REJECTED', error=error, settled_at=now)
+            Transaction.objects.bulk_create(
+                [leg for t in settled for leg in TransferService._legs(t, t.sender.owner.email, t.recipient.owner.email)],
+                batch_size=1000
+            )
+
+        return len(settled), sum(len(ids) for ids in rejected.values())
@@ -21,10 +21,17 @@ urlpatterns = [
     path('auth/google/', views.google_auth, name='google_auth'),
     path('auth/magic-login/', views.magic_login, name='magic_login'),
     path('wallets/convert/', views.convert_currency, name='convert_currency'),
+    path('transfers/', views.transfer_funds, name='transfer_funds'),
+    path('payouts/bulk/', views.bulk_payout, name='bulk_payout'),
     path('crypto/deposit/', views.crypto_deposit, name='crypto_deposit'),
     path('crypto/withdraw/', views.crypto_withdraw, name='crypto_withdraw'),
     path('admin/kyc/', views.admin_kyc_list, name='admin_kyc_list'),
     path('admin/kyc/<int:kyc_id>/review/', views.admin_review_kyc, name='admin_review_kyc'),
+    path('admin/kyc/queue/', views.AdminKYCQueueView.as_view(), name='admin_kyc_queue'),
+    path('admin/kyc/queue/claim-next/', views.admin_claim_next_kyc, name='admin_claim_next_kyc'),
+    path('admin/kyc/<int:kyc_id>/claim/', views.admin_claim_kyc, name='admin_claim_kyc'),
+    path('admin/kyc/<int:kyc_id>/release/', views.admin_release_kyc, name='admin_release_kyc'),
+    path('admin/transactions/export/', views.admin_export_transactions, name='admin_export_transactions'),
     path('user/profile/', views.user_profile, name='user_profile'),
     path('user/profile/update/', views.update_user_profile, name='update_user_profile'),
     path('payment-methods/', views.payment_methods, name='payment_methods'),
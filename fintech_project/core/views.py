@@ -1,17 +1,44 @@
+import logging
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from decimal import Decimal, ROUND_DOWN
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from .models import Wallet, Transaction, KYCDocument, ExchangeRate
 from .serializers import WalletSerializer, TransactionSerializer, KYCDocumentSerializer
+from .serializers import KYCReviewQueueSerializer, KYCReviewDetailSerializer
 from .services import CryptoRateService
-from .email_service import EmailService
 from .luna_service import LunaWalletService
-from .kyc_service import KYCVerificationService
 from .models import UserProfile, PaymentMethod
 from .google_auth import GoogleAuthService
 from .alternative_email import AlternativeEmailService
+from .password_service import PasswordHashingService, PasswordPoolBusy
+from .otp_service import OTPService, OTPLocked
+from .account_service import AccountProvisioningService
+from .notification_service import NotificationService
+from .kyc_review import KYCReviewService
+from .transaction_export import TransactionExportService
+from .holds import BalanceHoldService, InsufficientFunds
+from .transfers import TransferService
+from .bulk_payouts import BulkPayoutService
+from .security import FinancialValidator
+from . import money
+
+logger = logging.getLogger(__name__)
+
+def _server_busy_response():
+    return Response({'error': 'Server busy, please try again shortly'}, status=503, headers={'Retry-After': '1'})
+
+def _otp_locked_response():
+    return Response({'error': 'Too many incorrect codes. Please try again later.'}, status=429)
 
 class WalletListCreateView(generics.ListCreateAPIView):
     serializer_class = WalletSerializer
@@ -29,7 +56,7 @@ class TransactionListView(generics.ListAPIView):
 
     def get_queryset(self):
         user_wallets = Wallet.objects.filter(owner=self.request.user)
-        return Transaction.objects.filter(wallet__in=user_wallets).order_by('-created_at')
+        return Transaction.objects.filter(wallet__in=user_wallets).select_related('wallet').order_by('-created_at')
 
 class KYCListCreateView(generics.ListCreateAPIView):
     serializer_class = KYCDocumentSerializer
@@ -42,67 +69,9 @@ class KYCListCreateView(generics.ListCreateAPIView):
         # Get country from request data
         country = self.request.data.get('country')
         
-        # Save KYC document
-        doc = serializer.save(user=self.request.user, country=country)
-        
-        # Real verification process
-        try:
-            # Extract data using OCR if available
-            result = KYCVerificationService.extract_document_data(
-                doc.document.path, 
-                doc.doc_type, 
-                doc.country
-            )
-            
-            if result['success']:
-                doc.extracted_data = result['extracted_data']
-                doc.confidence_score = result['confidence_score']
-                
-                # Auto-detect country if not provided
-                if not doc.country:
-                    detected_country = KYCVerificationService.determine_country_from_document(
-                        result.get('raw_text', ''), doc.doc_type
-                    )
-                    if detected_country:
-                        doc.country = detected_country
-                
-                # Real verification criteria
-                should_approve, reason = KYCVerificationService.auto_approve_kyc(
-                    result['extracted_data'], 
-                    result['confidence_score'], 
-                    doc.doc_type
-                )
-                
-                if should_approve:
-                    doc.status = 'APPROVED'
-                    from django.utils import timezone
-                    doc.reviewed_at = timezone.now()
-                    
-                    # Update user profile only if truly verified
-                    profile, created = UserProfile.objects.get_or_create(user=self.request.user)
-                    profile.verification_status = 'APPROVED'
-                    if doc.country:
-                        profile.country = doc.country
-                    profile.update_limits()
-                else:
-                    # Requires manual review
-                    doc.status = 'PENDING'
-                    print(f"KYC requires manual review: {reason}")
-            else:
-                # OCR failed - manual review required
-                doc.status = 'PENDING'
-                doc.extracted_data = {'error': result.get('error', 'OCR processing failed')}
-                doc.confidence_score = 0.0
-                print(f"KYC OCR failed: {result.get('error')}")
-        
-        except Exception as e:
-            # Any error - manual review required
-            doc.status = 'PENDING'
-            doc.confidence_score = 0.0
-            doc.extracted_data = {'error': str(e)}
-            print(f"KYC processing error: {e}")
-        
-        doc.save()
+        # Save KYC document; OCR and auto-approval run in the
+        # process_kyc_jobs worker, clients poll processing_status
+        serializer.save(user=self.request.user, country=country, processing_status='QUEUED')
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -159,7 +128,6 @@ def create_crypto_wallet(request):
         wallet = Wallet.objects.create(
             owner=request.user,
             currency=currency,
-            balance=0,
             deposit_address=deposit_address
         )
         
@@ -178,14 +146,13 @@ def request_login_code(request):
     
     try:
         user = User.objects.get(email=email)
-        if user.check_password(password):
+        if PasswordHashingService.verify(user, password):
             # Generate and store verification code
-            code = EmailService.generate_code()
-            EmailService.store_code(email, code)
+            code = OTPService.issue('login', email)
             print(f"Login code for {email}: {code}")
             
-            # Try multiple email methods
-            email_sent = EmailService.send_verification_code(email, code)
+            # Delivered by the notification worker
+            NotificationService.enqueue('login_code', email, code=code)
             
             # Generate magic link as alternative
             magic_result = AlternativeEmailService.generate_magic_link(email, code)
@@ -195,7 +162,7 @@ def request_login_code(request):
             response_data = {
                 'message': f'Verification code: {code}',
                 'debug_code': code,
-                'email_sent': email_sent
+                'email_queued': True
             }
             
             # Add magic link if generated successfully
@@ -208,6 +175,10 @@ def request_login_code(request):
             return Response({'error': 'Invalid credentials'}, status=400)
     except User.DoesNotExist:
         return Response({'error': 'User not found'}, status=400)
+    except PasswordPoolBusy:
+        return _server_busy_response()
+    except OTPLocked:
+        return _otp_locked_response()
     except Exception as e:
         print(f"Login code error: {e}")
         return Response({'error': 'Login failed'}, status=500)
@@ -222,7 +193,7 @@ def verify_login_code(request):
     try:
         user = User.objects.get(email=email)
         # Verify real code from cache
-        if EmailService.verify_code(email, code):
+        if OTPService.verify('login', email, code):
             from rest_framework_simplejwt.tokens import RefreshToken
             refresh = RefreshToken.for_user(user)
             return Response({
@@ -251,21 +222,12 @@ def register_user(request):
         if User.objects.filter(email=email).exists():
             return Response({'error': 'Email already registered'}, status=400)
         
-        # Generate verification code
-        code = EmailService.generate_code()
+        # Generate verification code, keeping only the password hash with it
+        code = OTPService.issue('register', email, (full_name, PasswordHashingService.hash(password)))
         print(f"Generated code: {code}")
         
-        # Store registration data temporarily
-        EmailService.store_registration_data(email, {
-            'email': email,
-            'password': password,
-            'full_name': full_name,
-            'code': code
-        })
-        print("Registration data stored")
-        
-        # Try multiple email methods
-        email_sent = EmailService.send_registration_code(email, code)
+        # Delivered by the notification worker
+        NotificationService.enqueue('registration_code', email, code=code)
         
         # Generate magic link as alternative
         magic_result = AlternativeEmailService.generate_magic_link(email, code)
@@ -275,7 +237,7 @@ def register_user(request):
         response_data = {
             'message': f'Verification code: {code}',
             'debug_code': code,
-            'email_sent': email_sent
+            'email_queued': True
         }
         
         # Add magic link if generated successfully
@@ -285,6 +247,10 @@ def register_user(request):
         
         return Response(response_data)
             
+    except PasswordPoolBusy:
+        return _server_busy_response()
+    except OTPLocked:
+        return _otp_locked_response()
     except Exception as e:
         print(f"Registration error: {e}")
         import traceback
@@ -304,42 +270,22 @@ def verify_registration(request):
         if not all([email, code]):
             return Response({'error': 'Email and code required'}, status=400)
         
-        # Get stored registration data
-        reg_data = EmailService.get_registration_data(email)
-        print(f"Retrieved reg_data: {reg_data}")
+        # Consume the code and get the stored registration data
+        reg_data = OTPService.verify('register', email, code)
         
-        if not reg_data or reg_data['code'] != code:
-            print(f"Code mismatch: stored={reg_data['code'] if reg_data else None}, provided={code}")
+        if not reg_data:
+            print(f"Invalid registration code for {email}")
             return Response({'error': 'Invalid or expired code'}, status=400)
         
-        print("Creating user...")
-        # Create user
-        user = User.objects.create_user(
-            username=reg_data['email'],
-            email=reg_data['email'],
-            password=reg_data['password'],
-            first_name=reg_data['full_name'].split(' ')[0],
-            last_name=' '.join(reg_data['full_name'].split(' ')[1:]) if len(reg_data['full_name'].split(' ')) > 1 else ''
-        )
-        print(f"User created: {user.email}")
-        
-        # Create profile
-        UserProfile.objects.create(
-            user=user,
-            full_name=reg_data['full_name']
-        )
-        print("Profile created")
+        full_name, password_hash = reg_data
         
-        # Create default NGN wallet (if not exists)
-        wallet, created = Wallet.objects.get_or_create(
-            owner=user,
-            currency='NGN',
-            defaults={'balance': 0}
-        )
-        print(f"Wallet {'created' if created else 'already exists'}")
+        print("Creating user...")
+        # Create user, profile and default wallets in one transaction
+        # (password was hashed at registration time)
+        user, created = AccountProvisioningService.provision_user(email, full_name, password_hash)
+        if not created:
+            return Response({'error': 'Email already registered'}, status=400)
         
-        # Clean up stored data
-        EmailService.delete_registration_data(email)
         print("Registration completed successfully")
         
         return Response({'message': 'Registration successful! You can now login.'})
@@ -358,19 +304,20 @@ def forgot_password(request):
     try:
         user = User.objects.get(email=email)
         # Generate and send reset code
-        code = EmailService.generate_code()
-        EmailService.store_code(f"reset_{email}", code)
+        code = OTPService.issue('reset', email)
         
-        # Always show debug code since email might not work on Render
-        email_sent = EmailService.send_reset_code(email, code)
+        NotificationService.enqueue('reset_code', email, code=code)
         print(f"Reset code for {email}: {code}")
         
+        # Always show debug code since email might not work on Render
         return Response({
             'message': f'Code sent! Check email or use: {code}',
             'debug_code': code
         })
     except User.DoesNotExist:
         return Response({'error': 'Email not found'}, status=400)
+    except OTPLocked:
+        return _otp_locked_response()
 
 @api_view(['POST'])
 @permission_classes([])
@@ -387,18 +334,20 @@ def reset_password(request):
         user = User.objects.get(email=email)
         
         # Check if new password is same as current password
-        if user.check_password(new_password):
+        if PasswordHashingService.verify(user, new_password):
             return Response({'error': 'New password cannot be the same as your current password'}, status=400)
         
         # Verify reset code
-        if EmailService.verify_code(f"reset_{email}", code):
-            user.set_password(new_password)
+        if OTPService.verify('reset', email, code):
+            PasswordHashingService.set_password(user, new_password)
             user.save()
             return Response({'message': 'Password reset successful'})
         else:
             return Response({'error': 'Invalid or expired code'}, status=400)
     except User.DoesNotExist:
         return Response({'error': 'User not found'}, status=400)
+    except PasswordPoolBusy:
+        return _server_busy_response()
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -406,14 +355,13 @@ def convert_currency(request):
     """Convert fiat to crypto"""
     from_currency = request.data.get('from_currency')
     to_currency = request.data.get('to_currency')
-    amount = request.data.get('amount')
     
+    if to_currency not in money.SCALES:
+        return Response({'error': f'Unsupported currency: {to_currency}'}, status=400)
     try:
-        amount = float(amount)
-        if amount <= 0:
-            return Response({'error': 'Amount must be greater than 0'}, status=400)
-    except (ValueError, TypeError):
-        return Response({'error': 'Invalid amount'}, status=400)
+        amount_minor = money.parse_amount(request.data.get('amount'), from_currency)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     
     # Get source wallet
     try:
@@ -421,15 +369,14 @@ def convert_currency(request):
     except Wallet.DoesNotExist:
         return Response({'error': f'{from_currency} wallet not found'}, status=400)
     
-    # Check sufficient balance
-    if float(source_wallet.balance) < amount:
+    # Check sufficient balance; funds held for pending withdrawals are not spendable
+    if source_wallet.available_minor < amount_minor:
         return Response({'error': 'Insufficient balance'}, status=400)
     
     # Get or create target wallet
     target_wallet, created = Wallet.objects.get_or_create(
         owner=request.user,
-        currency=to_currency,
-        defaults={'balance': 0}
+        currency=to_currency
     )
     
     # Get conversion rate
@@ -437,40 +384,52 @@ def convert_currency(request):
     if not rate:
         return Response({'error': 'Exchange rate not available'}, status=400)
     
-    # Calculate converted amount
-    converted_amount = amount / float(rate)
+    # Calculate converted amount, rounded down to the target currency's unit
+    try:
+        converted_minor = money.to_minor(
+            money.to_decimal(amount_minor, from_currency) / Decimal(str(rate)), to_currency, rounding=ROUND_DOWN
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    if converted_minor <= 0:
+        return Response({'error': 'Amount too small to convert'}, status=400)
+    amount_display = money.format_minor(amount_minor, from_currency)
+    converted_display = money.format_minor(converted_minor, to_currency)
     
     try:
-        from django.db import transaction
         with transaction.atomic():
-            # Deduct from source
-            source_wallet.balance = float(source_wallet.balance) - amount
-            source_wallet.save()
+            # Deduct from source; the available-balance condition makes it race-free
+            debited = (
+                Wallet.objects
+                .filter(id=source_wallet.id, balance_minor__gte=F('held_minor') + amount_minor)
+                .update(balance_minor=F('balance_minor') - amount_minor)
+            )
+            if not debited:
+                return Response({'error': 'Insufficient balance'}, status=400)
             
             # Add to target
-            target_wallet.balance = float(target_wallet.balance) + converted_amount
-            target_wallet.save()
+            Wallet.objects.filter(id=target_wallet.id).update(balance_minor=F('balance_minor') + converted_minor)
             
             # Record transactions
             Transaction.objects.create(
                 wallet=source_wallet,
                 type='CONVERT',
-                amount=-amount,
+                amount_minor=-amount_minor,
                 counterparty=f'Convert to {to_currency}',
-                metadata={'to_currency': to_currency, 'rate': float(rate), 'converted_amount': converted_amount}
+                metadata={'to_currency': to_currency, 'rate': str(rate), 'converted_amount': converted_display}
             )
             
             Transaction.objects.create(
                 wallet=target_wallet,
                 type='CONVERT',
-                amount=converted_amount,
+                amount_minor=converted_minor,
                 counterparty=f'Convert from {from_currency}',
-                metadata={'from_currency': from_currency, 'rate': float(rate), 'source_amount': amount}
+                metadata={'from_currency': from_currency, 'rate': str(rate), 'source_amount': amount_display}
             )
         
         return Response({
             'message': 'Conversion successful',
-            'converted_amount': converted_amount,
+            'converted_amount': converted_display,
             'rate': float(rate)
         })
         
@@ -478,6 +437,70 @@ def convert_currency(request):
         print(f"Conversion error: {e}")
         return Response({'error': 'Conversion failed'}, status=500)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def transfer_funds(request):
+    """Send funds to another user's wallet in the same currency.
+
+    With queue=true the funds are held and the transfer is settled in the
+    next settle_transfers batch (202); otherwise it settles immediately.
+    Either way the sender's KYC status and daily limit are checked first.
+    """
+    currency = request.data.get('currency')
+    recipient_email = (request.data.get('recipient') or '').strip()
+    note = (request.data.get('note') or '')[:255]
+    queued = str(request.data.get('queue', '')).lower() in ('1', 'true')
+    
+    if not currency or not recipient_email:
+        return Response({'error': 'Currency, amount, and recipient required'}, status=400)
+    try:
+        amount_minor = money.parse_amount(request.data.get('amount'), currency)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    try:
+        sender_wallet = Wallet.objects.select_related('owner').get(owner=request.user, currency=currency)
+    except Wallet.DoesNotExist:
+        return Response({'error': f'{currency} wallet not found'}, status=400)
+    
+    recipient = User.objects.filter(email__iexact=recipient_email, is_active=True).order_by('id').first()
+    if recipient is None:
+        return Response({'error': 'Recipient not found'}, status=400)
+    if recipient.id == request.user.id:
+        return Response({'error': 'Cannot transfer to yourself'}, status=400)
+    
+    # Unverified accounts get the lower daily limit; rejected ones cannot send
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or profile.verification_status == 'REJECTED':
+        return Response({'error': 'Transfers require an account in good KYC standing'}, status=403)
+    
+    recipient_wallet, created = Wallet.objects.get_or_create(owner=recipient, currency=currency)
+    
+    # Run under the sender's wallet lock, so concurrent transfers cannot all pass the same limit
+    def check_daily_limit():
+        FinancialValidator.check_daily_limits(request.user, money.to_decimal(amount_minor, currency), currency)
+    
+    try:
+        if queued:
+            transfer = TransferService.queue(sender_wallet, recipient_wallet, amount_minor, note, limit_check=check_daily_limit)
+        else:
+            transfer = TransferService.transfer(sender_wallet, recipient_wallet, amount_minor, note, limit_check=check_daily_limit)
+    except DjangoValidationError as e:
+        return Response({'error': e.messages[0]}, status=400)
+    except InsufficientFunds:
+        return Response({'error': 'Insufficient balance'}, status=400)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    return Response({
+        'message': 'Transfer queued' if queued else 'Transfer completed',
+        'transfer_id': transfer.id,
+        'status': transfer.status,
+        'amount': money.format_minor(amount_minor, currency),
+        'currency': currency,
+        'recipient': recipient.email
+    }, status=202 if queued else 200)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def crypto_deposit(request):
@@ -490,35 +513,32 @@ def crypto_deposit(request):
         return Response({'error': 'Currency, tx_hash, and amount required'}, status=400)
     
     try:
-        amount = float(amount)
-        if amount <= 0:
-            return Response({'error': 'Amount must be greater than 0'}, status=400)
-    except (ValueError, TypeError):
-        return Response({'error': 'Invalid amount'}, status=400)
+        amount_minor = money.parse_amount(amount, currency)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     
     try:
         wallet = Wallet.objects.get(owner=request.user, currency=currency)
         
         # TODO: Verify transaction on blockchain via Luna API
         # For now, auto-approve and credit user balance
-        from django.db import transaction
         with transaction.atomic():
             # Credit user wallet
-            wallet.balance = float(wallet.balance) + amount
-            wallet.save()
+            Wallet.objects.filter(id=wallet.id).update(balance_minor=F('balance_minor') + amount_minor)
             
             # Record transaction
             Transaction.objects.create(
                 wallet=wallet,
                 type='DEPOSIT',
-                amount=amount,
+                amount_minor=amount_minor,
                 counterparty='Luna Business Wallet',
                 metadata={'tx_hash': tx_hash, 'status': 'confirmed'}
             )
         
+        wallet.refresh_from_db(fields=['balance_minor'])
         return Response({
             'message': 'Deposit confirmed and credited to your wallet',
-            'new_balance': float(wallet.balance)
+            'new_balance': money.format_minor(wallet.balance_minor, currency)
         })
         
     except Wallet.DoesNotExist:
@@ -538,54 +558,75 @@ def crypto_withdraw(request):
         return Response({'error': 'Currency, amount, and to_address required'}, status=400)
     
     try:
-        amount = float(amount)
-        if amount <= 0:
-            return Response({'error': 'Amount must be greater than 0'}, status=400)
-    except (ValueError, TypeError):
-        return Response({'error': 'Invalid amount'}, status=400)
+        amount_minor = money.parse_amount(amount, currency)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     
     try:
         wallet = Wallet.objects.get(owner=request.user, currency=currency)
-        
-        # Check balance
-        if float(wallet.balance) < amount:
-            return Response({'error': 'Insufficient balance'}, status=400)
-        
-        # Validate address
-        luna_service = LunaWalletService()
-        if not luna_service.validate_address(currency, to_address):
-            return Response({'error': 'Invalid address format'}, status=400)
-        
-        # Send via Luna API
-        result = luna_service.send_crypto(currency, amount, to_address, request.user.id)
-        
-        if result['success']:
-            from django.db import transaction
-            with transaction.atomic():
-                # Deduct from wallet
-                wallet.balance = float(wallet.balance) - amount
-                wallet.save()
-                
-                # Record transaction
-                Transaction.objects.create(
-                    wallet=wallet,
-                    type='WITHDRAW',
-                    amount=-amount,
-                    counterparty=to_address,
-                    metadata={'tx_hash': result['tx_hash'], 'status': 'pending'}
-                )
-            
-            return Response({
-                'message': 'Withdrawal initiated',
-                'tx_hash': result['tx_hash']
-            })
-        else:
-            return Response({'error': result['error']}, status=500)
-            
     except Wallet.DoesNotExist:
         return Response({'error': f'{currency} wallet not found'}, status=400)
-    except Exception as e:
+    
+    # Validate address
+    luna_service = LunaWalletService()
+    if not luna_service.validate_address(currency, to_address):
+        return Response({'error': 'Invalid address format'}, status=400)
+    
+    # Reserve the funds first; the provider call below runs with no lock held
+    try:
+        hold = BalanceHoldService.place(wallet, amount_minor, 'WITHDRAW', counterparty=to_address)
+    except InsufficientFunds:
+        return Response({'error': 'Insufficient balance'}, status=400)
+    
+    try:
+        result = luna_service.send_crypto(currency, money.to_decimal(amount_minor, currency), to_address, request.user.id)
+    except Exception:
+        # The outcome is unknown, so the funds stay held for an operator to resolve
+        logger.exception("Withdrawal hold %s left open: provider call failed", hold.id)
         return Response({'error': 'Withdrawal failed'}, status=500)
+    
+    if not result['success']:
+        BalanceHoldService.release(hold, reason=result['error'])
+        return Response({'error': result['error']}, status=500)
+    
+    BalanceHoldService.capture(hold, reference=result['tx_hash'], metadata={'tx_hash': result['tx_hash'], 'status': 'pending'})
+    
+    return Response({
+        'message': 'Withdrawal initiated',
+        'tx_hash': result['tx_hash']
+    })
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_payout(request):
+    """Create withdrawal requests from a CSV or NDJSON file of payouts.
+
+    The request body is the file itself (Content-Type text/csv or
+    application/x-ndjson, or ?input_format=csv|ndjson), with currency,
+    amount, destination and an optional reference per row. It is read as
+    a stream and fully processed before the response starts; per-row
+    results and a summary then stream back as NDJSON. Send an
+    Idempotency-Key header to make retrying the upload safe.
+    """
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or not profile.is_verified():
+        return Response({'error': 'Bulk payouts require a verified account'}, status=403)
+    
+    input_format = request.GET.get('input_format') or BulkPayoutService.format_for(request.content_type.split(';')[0].strip())
+    if input_format not in BulkPayoutService.FORMATS:
+        return Response({'error': f'Upload text/csv or application/x-ndjson, or set input_format to one of {", ".join(BulkPayoutService.FORMATS)}'}, status=400)
+    
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+    if len(idempotency_key) > 100:
+        return Response({'error': 'Idempotency-Key is limited to 100 characters'}, status=400)
+    
+    # Never request.data: that would read the whole file into memory
+    stream = request.stream
+    if stream is None:
+        return Response({'error': 'Empty file'}, status=400)
+    
+    results = BulkPayoutService.run(request.user, stream, input_format, batch=idempotency_key or None)
+    return StreamingHttpResponse(results, content_type='application/x-ndjson')
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -600,29 +641,18 @@ def admin_review_kyc(request, kyc_id):
     try:
         kyc_doc = KYCDocument.objects.get(id=kyc_id)
         
-        if action == 'approve':
-            kyc_doc.status = 'APPROVED'
-            # Update user profile
-            profile, created = UserProfile.objects.get_or_create(user=kyc_doc.user)
-            profile.verification_status = 'APPROVED'
-            if kyc_doc.country:
-                profile.country = kyc_doc.country
-            profile.update_limits()
-            
-        elif action == 'reject':
-            kyc_doc.status = 'REJECTED'
-            # Update user profile
-            profile, created = UserProfile.objects.get_or_create(user=kyc_doc.user)
-            profile.verification_status = 'REJECTED'
+        if KYCReviewService.held_by_other(kyc_doc, request.user):
+            return Response({'error': 'Document is claimed by another reviewer'}, status=409)
         
-        from django.utils import timezone
-        kyc_doc.reviewed_by = request.user
-        kyc_doc.reviewed_at = timezone.now()
-        kyc_doc.save()
+        if action not in KYCReviewService.DECISIONS:
+            return Response({'error': "Action must be 'approve' or 'reject'"}, status=400)
+        
+        # Same set-based path as the admin bulk actions
+        KYCReviewService.decide(KYCDocument.objects.filter(id=kyc_doc.id), action, request.user)
         
         return Response({
-            'message': f'KYC {action}d successfully',
-            'status': kyc_doc.status
+            'message': f'KYC {KYCReviewService.DECISIONS[action].lower()} successfully',
+            'status': KYCReviewService.DECISIONS[action]
         })
         
     except KYCDocument.DoesNotExist:
@@ -633,15 +663,23 @@ def admin_review_kyc(request, kyc_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_kyc_list(request):
-    """List all KYC documents for admin review"""
+    """KYC documents with a given status (default PENDING), newest first, cursor-paginated"""
     if not request.user.is_staff:
         return Response({'error': 'Admin access required'}, status=403)
     
     status_filter = request.GET.get('status', 'PENDING')
-    kyc_docs = KYCDocument.objects.filter(status=status_filter).order_by('-created_at')
+    kyc_docs = (
+        KYCDocument.objects
+        .filter(status=status_filter)
+        .select_related('user')
+        .only('id', 'user__email', 'doc_type', 'country', 'confidence_score',
+              'extracted_data', 'status', 'created_at', 'document', 'thumbnail', 'review_image')
+    )
+    paginator = KYCDocumentListPagination()
+    page = paginator.paginate_queryset(kyc_docs, request)
     
     data = []
-    for doc in kyc_docs:
+    for doc in page:
         data.append({
             'id': doc.id,
             'user_email': doc.user.email,
@@ -651,10 +689,126 @@ def admin_kyc_list(request):
             'extracted_data': doc.extracted_data,
             'status': doc.status,
             'created_at': doc.created_at,
-            'document_url': doc.document.url if doc.document else None
+            'document_url': doc.document.url if doc.document else None,
+            'thumbnail_url': doc.thumbnail.url if doc.thumbnail else None,
+            'review_url': doc.review_image.url if doc.review_image else None
         })
     
-    return Response(data)
+    return paginator.get_paginated_response(data)
+
+class KYCReviewQueuePagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('created_at', 'id')
+
+class KYCDocumentListPagination(KYCReviewQueuePagination):
+    ordering = ('-created_at', '-id')
+
+class AdminKYCQueueView(generics.ListAPIView):
+    """Cursor-paginated KYC review queue, oldest first.
+
+    Filters: status (default PENDING), confidence (low/medium/high),
+    country, doc_type, assignment (mine/available).
+    """
+    serializer_class = KYCReviewQueueSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = KYCReviewQueuePagination
+
+    def get_queryset(self):
+        return _review_queue(self.request.user, self.request.query_params)
+
+def _review_queue(reviewer, params):
+    try:
+        return KYCReviewService.queue(
+            status=params.get('status', 'PENDING'),
+            confidence_band=params.get('confidence'),
+            country=params.get('country'),
+            doc_type=params.get('doc_type'),
+            assignment=params.get('assignment'),
+            reviewer=reviewer
+        )
+    except ValueError as e:
+        raise ValidationError({'error': str(e)})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def admin_claim_kyc(request, kyc_id):
+    """Claim a KYC document for review"""
+    if not request.user.is_staff:
+        return Response({'error': 'Admin access required'}, status=403)
+    
+    if not KYCReviewService.claim(kyc_id, request.user):
+        doc = KYCDocument.objects.filter(id=kyc_id).select_related('assigned_to').first()
+        if not doc or doc.status != 'PENDING':
+            return Response({'error': 'No pending KYC document with that id'}, status=404)
+        return Response({
+            'error': 'Document is claimed by another reviewer',
+            'assigned_to': doc.assigned_to.email if doc.assigned_to else None
+        }, status=409)
+    
+    doc = KYCDocument.objects.select_related('user', 'assigned_to').get(id=kyc_id)
+    return Response(KYCReviewDetailSerializer(doc).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def admin_claim_next_kyc(request):
+    """Claim the oldest available document matching the queue filters"""
+    if not request.user.is_staff:
+        return Response({'error': 'Admin access required'}, status=403)
+    
+    params = request.data.copy()
+    params['status'] = 'PENDING'
+    doc_id = KYCReviewService.claim_next(request.user, _review_queue(request.user, params))
+    if doc_id is None:
+        return Response(status=204)
+    
+    doc = KYCDocument.objects.select_related('user', 'assigned_to').get(id=doc_id)
+    return Response(KYCReviewDetailSerializer(doc).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def admin_release_kyc(request, kyc_id):
+    """Release a claimed KYC document back to the queue"""
+    if not request.user.is_staff:
+        return Response({'error': 'Admin access required'}, status=403)
+    
+    if not KYCReviewService.release(kyc_id, request.user):
+        return Response({'error': 'You do not hold a claim on this document'}, status=409)
+    return Response({'message': 'Claim released'})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_export_transactions(request):
+    """Stream transactions as CSV or NDJSON (filters: user, currency, type, from, to)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Admin access required'}, status=403)
+    
+    # 'format' is taken by DRF's content negotiation
+    export_format = request.GET.get('export_format', 'csv')
+    if export_format not in TransactionExportService.FORMATS:
+        return Response({'error': f'export_format must be one of {", ".join(TransactionExportService.FORMATS)}'}, status=400)
+    
+    try:
+        queryset = TransactionExportService.queryset(
+            user=request.GET.get('user'),
+            currency=request.GET.get('currency'),
+            type=request.GET.get('type'),
+            date_from=request.GET.get('from'),
+            date_to=request.GET.get('to')
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    response = StreamingHttpResponse(
+        TransactionExportService.chunks(queryset, export_format),
+        content_type=TransactionExportService.FORMATS[export_format]
+    )
+    filename = f"transactions-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Let proxies pass bytes through as they are produced
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -783,13 +937,19 @@ def payment_methods(request):
 def google_auth(request):
     """Handle Google OAuth authentication"""
     try:
+        # Google Identity Services hands the client an ID token as `credential`
+        id_token = request.data.get('id_token') or request.data.get('credential')
         access_token = request.data.get('access_token')
         
-        if not access_token:
-            return Response({'error': 'Access token required'}, status=400)
+        if not id_token and not access_token:
+            return Response({'error': 'ID token or access token required'}, status=400)
         
-        # Verify Google token and get user info
-        google_user_info = GoogleAuthService.verify_google_token(access_token)
+        # Verify Google token and get user info. ID tokens are checked
+        # locally against cached signing keys, access tokens need Google.
+        if id_token:
+            google_user_info = GoogleAuthService.verify_id_token(id_token)
+        else:
+            google_user_info = GoogleAuthService.verify_google_token(access_token)
         
         if not google_user_info:
             return Response({'error': 'Invalid Google token'}, status=400)
@@ -837,16 +997,16 @@ def magic_login(request):
         
         from django.utils.http import urlsafe_base64_decode
         from django.utils.encoding import force_str
-        import hashlib
+        import hmac
         
         try:
             email = force_str(urlsafe_base64_decode(email_b64))
         except:
             return Response({'error': 'Invalid email'}, status=400)
         
-        expected_token = hashlib.sha256(f"{email}:{code}:{settings.SECRET_KEY}".encode()).hexdigest()[:32]
+        expected_token = OTPService.link_token('login', email, code)
         
-        if token != expected_token or not EmailService.verify_code(email, code):
+        if not hmac.compare_digest(str(token), expected_token) or not OTPService.verify('login', email, code):
             return Response({'error': 'Invalid or expired link'}, status=400)
         
         user = User.objects.get(email=email)
@@ -886,6 +1046,8 @@ def login_user(request):
             })
         else:
             return Response({'error': 'Invalid credentials'}, status=400)
+    except PasswordPoolBusy:
+        return _server_busy_response()
     except Exception as e:
         return Response({'error': 'Login failed'}, status=500)
 
@@ -11,12 +11,12 @@ from core.models import Wallet
 for user in User.objects.all():
     # Create NGN wallet if doesn't exist
     if not Wallet.objects.filter(owner=user, currency='NGN').exists():
-        Wallet.objects.create(owner=user, currency='NGN', balance=0)
+        Wallet.objects.create(owner=user, currency='NGN')
         print(f"Created NGN wallet for {user.email}")
     
     # Create KES wallet if doesn't exist  
     if not Wallet.objects.filter(owner=user, currency='KES').exists():
-        Wallet.objects.create(owner=user, currency='KES', balance=0)
+        Wallet.objects.create(owner=user, currency='KES')
         print(f"Created KES wallet for {user.email}")
 
 print("Default wallets created successfully!")
\ No newline at end of file
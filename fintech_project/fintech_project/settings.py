@@ -41,6 +41,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'core.middleware.AuditLogMiddleware',
+    'core.middleware.ServerBusyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -140,6 +141,17 @@ REST_FRAMEWORK = {
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Uploaded files are only reachable through signed, expiring URLs (core.media)
+DEFAULT_FILE_STORAGE = 'core.media.ProtectedMediaStorage'
+MEDIA_URL_TTL = int(os.environ.get('MEDIA_URL_TTL', '3600'))
+# How protected media is sent: 'django' (FileResponse / os.sendfile),
+# 'x-accel' (nginx) or 'x-sendfile' (Apache, lighttpd)
+MEDIA_DELIVERY = os.environ.get('MEDIA_DELIVERY', 'django')
+# nginx 'internal' location aliased to MEDIA_ROOT, for x-accel
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+# Most rows accepted in one bulk payout upload (core.bulk_payouts); later rows are refused
+BULK_PAYOUT_MAX_ROWS = int(os.environ.get('BULK_PAYOUT_MAX_ROWS', '100000'))
 
 # Payment Gateway Settings
 FLUTTERWAVE_SECRET_KEY = os.environ.get('FLUTTERWAVE_SECRET_KEY', '')
@@ -151,6 +163,12 @@ SASAPAY_MERCHANT_CODE = os.environ.get('SASAPAY_MERCHANT_CODE', '')
 
 CRYPTO_API_KEY = os.environ.get('CRYPTO_API_KEY', '')
 
+# Google Sign-In
+GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID', '')
+GOOGLE_JWKS_URL = os.environ.get('GOOGLE_JWKS_URL', 'https://www.googleapis.com/oauth2/v3/certs')
+GOOGLE_TOKEN_CACHE_TTL = int(os.environ.get('GOOGLE_TOKEN_CACHE_TTL', '300'))
+GOOGLE_TOKEN_NEGATIVE_TTL = int(os.environ.get('GOOGLE_TOKEN_NEGATIVE_TTL', '30'))
+
 # Frontend/Backend URLs
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
 BACKEND_URL = os.environ.get('BACKEND_URL', 'http://localhost:8000')
@@ -200,17 +218,30 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.environ.get('EMAIL_HOST_USER')
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '10'))
+EMAIL_POOL_SIZE = int(os.environ.get('EMAIL_POOL_SIZE', '2'))
 
 # Email credentials validation only for production
 if not DEBUG and (not EMAIL_HOST_USER or not EMAIL_HOST_PASSWORD):
     raise ValueError('Email credentials are required for production')
 
 # Authentication Backends
+# EmailBackend alone: it also accepts usernames, and a second backend would
+# re-check failed passwords outside the hashing pool
 AUTHENTICATION_BACKENDS = [
     'core.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Password hashing pool (keeps PBKDF2 off the request threads)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_QUEUE_DEPTH = int(os.environ.get('PASSWORD_HASH_QUEUE_DEPTH', '16'))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', '10'))
+
+# KYC OCR workers: address-space cap per worker process (0 disables)
+KYC_WORKER_MEMORY_MB = int(os.environ.get('KYC_WORKER_MEMORY_MB', '1536'))
+# Extraction results are reused for byte-identical re-uploads for this long
+KYC_OCR_CACHE_TTL = int(os.environ.get('KYC_OCR_CACHE_TTL', str(7 * 24 * 3600)))
+
 # Cache Configuration
 REDIS_URL = os.environ.get('REDIS_URL')
 if REDIS_URL:
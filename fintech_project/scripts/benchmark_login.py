@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""Benchmark for login bursts against wallet endpoint latency.
+
+Creates a throwaway user, then sends a burst of logins (a mix of right
+and wrong passwords) from --login-threads request threads. Meanwhile one
+thread polls GET /api/wallets/ as another user. Requests go through
+Django's full request stack in-process. It runs twice:
+
+- inline: PBKDF2 on the request threads, as login_user used to do;
+- pool: through PasswordHashingService, with PASSWORD_HASH_WORKERS
+  workers and excess logins shed with 503.
+
+For each mode it reports logins per second, how many were shed, and the
+p50/p95 wallet latency, compared with an idle baseline. Every request
+comes from its own client address, so the per-IP rate limit stays out
+of the way:
+
+    python scripts/benchmark_login.py --logins 400 --login-threads 32
+
+Use a scratch database.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import itertools
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fintech_project.settings')
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import setup_test_environment
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.password_service import PasswordHashingService
+
+PREFIX = 'bench-login-'
+PASSWORD = 'benchmark-password'
+
+
+_addresses = itertools.count(1)
+
+
+def client_address():
+    """A fresh 10.x.y.z address"""
+    n = next(_addresses)
+    return f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}'
+
+
+def run_inline(func, *args):
+    """PasswordHashingService._run without the pool: hash on the calling thread"""
+    return func(*args)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)]
+
+
+def poll_wallets(token, stop):
+    """Wallet list latencies (seconds) until stop is set"""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    latencies = []
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = client.get('/api/wallets/', REMOTE_ADDR=client_address())
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+            time.sleep(0.01)
+    finally:
+        connection.close()
+    return latencies
+
+
+def burst(email, logins, threads):
+    """Status code counts for a burst of logins, and its duration"""
+    def login(i):
+        try:
+            password = PASSWORD if i % 2 else 'wrong-password'
+            return APIClient().post(
+                '/api/auth/login/', {'email': email, 'password': password}, format='json', REMOTE_ADDR=client_address()
+            ).status_code
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        codes = list(executor.map(login, range(logins)))
+    return codes, time.perf_counter() - started
+
+
+def measure(label, email, token, logins, threads):
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as poller:
+        latencies = poller.submit(poll_wallets, token, stop)
+        if logins:
+            codes, elapsed = burst(email, logins, threads)
+        else:
+            time.sleep(2)
+        stop.set()
+        latencies = latencies.result()
+
+    line = f"{label:<10} wallets p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms"
+    if logins:
+        answered = sum(1 for code in codes if code in (200, 400))
+        shed = codes.count(503)
+        line += f"   logins {answered / elapsed:7.1f}/s answered, {shed} shed (503)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--login-threads', type=int, default=32)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # One line per rejected or shed login otherwise
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    logging.getLogger('core.password_service').setLevel(logging.CRITICAL)
+    User.objects.filter(username__startswith=PREFIX).delete()
+    try:
+        email = f'{PREFIX}user@example.com'
+        User.objects.create_user(email, email, PASSWORD)
+        reader = User.objects.create_user(f'{PREFIX}reader', f'{PREFIX}reader@example.com', PASSWORD)
+        token = str(RefreshToken.for_user(reader).access_token)
+
+        print(f"{args.logins} logins from {args.login_threads} threads, "
+              f"{settings.PASSWORD_HASH_WORKERS} hashing workers, queue depth {settings.PASSWORD_HASH_QUEUE_DEPTH}")
+        measure('idle', email, token, 0, 0)
+        with mock.patch.object(PasswordHashingService, '_run', staticmethod(run_inline)):
+            measure('inline', email, token, args.logins, args.login_threads)
+        measure('pool', email, token, args.logins, args.login_threads)
+        return 0
+    finally:
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
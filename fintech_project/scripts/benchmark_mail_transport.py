@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Benchmark for per-message email latency with and without the SMTP pool.
+
+Sends through a local SMTP stand-in (core.tests.smtp_server), whose
+greeting is delayed by --handshake-ms to model the TCP, STARTTLS and
+LOGIN round trips of a new connection to a remote server. Each message
+is sent first the old way (connect, send, quit) and then through
+SMTPConnectionPool, from --threads concurrent senders, and the mean, p50
+and p95 latencies are reported:
+
+    python scripts/benchmark_mail_transport.py --messages 200 --handshake-ms 150 --threads 4
+"""
+import os
+import sys
+import time
+import smtplib
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.mail_transport import SMTPConnectionPool
+from core.tests.smtp_server import SMTPStandIn
+
+MESSAGE = 'Subject: Your verification code\r\n\r\n123456\r\n'
+SENDER = 'bank@example.com'
+RECIPIENT = 'ada@example.com'
+
+
+def send_fresh(port):
+    server = smtplib.SMTP('127.0.0.1', port, timeout=10)
+    try:
+        server.login('user', 'secret')
+        server.sendmail(SENDER, [RECIPIENT], MESSAGE)
+    finally:
+        server.quit()
+
+
+def measure(send, messages, threads):
+    """Per-message latencies in seconds"""
+    def timed(_):
+        started = time.perf_counter()
+        send()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(timed, range(messages)))
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<24} mean {statistics.mean(latencies) * 1000:8.1f} ms   "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--handshake-ms', type=float, default=100, help='Delay before the greeting of each new connection')
+    parser.add_argument('--threads', type=int, default=1, help='Concurrent senders')
+    parser.add_argument('--pool-size', type=int, default=2)
+    args = parser.parse_args()
+
+    with SMTPStandIn(greeting_delay=args.handshake_ms / 1000) as smtp:
+        print(f"{args.messages} messages, {args.threads} senders, {args.handshake_ms:g} ms per new connection")
+
+        report('New connection each', measure(lambda: send_fresh(smtp.port), args.messages, args.threads))
+        connections = smtp.connections
+
+        pool = SMTPConnectionPool('127.0.0.1', smtp.port, username='user', password='secret',
+                                  use_tls=False, size=args.pool_size)
+        try:
+            report(f'Pool of {args.pool_size}', measure(
+                lambda: pool.send(SENDER, [RECIPIENT], MESSAGE), args.messages, args.threads
+            ))
+        finally:
+            pool.close()
+
+        print(f"\nConnections opened: {connections} without the pool, {smtp.connections - connections} with it")
+        delivered = len(smtp.messages) == 2 * args.messages
+        print(f"All messages delivered: {delivered}")
+    return 0 if delivered else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
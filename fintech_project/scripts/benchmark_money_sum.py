@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Benchmark for summing ledger amounts: NUMERIC(30,8) vs BIGINT minor units.
+
+Fills a temporary table with random amounts stored both ways. It times
+SUM() in the configured database and then summing the fetched values in
+Python, and checks that both representations give the same total:
+
+    python scripts/benchmark_money_sum.py --rows 2000000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fintech_project.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection
+from core import money
+
+TABLE = 'benchmark_money_sum'
+
+
+def fill(cursor, rows, currency, batch_size=10000):
+    cursor.execute(f'CREATE TEMPORARY TABLE {TABLE} (amount NUMERIC(30, 8), amount_minor BIGINT)')
+    rng = random.Random(42)
+    scale = money.scale(currency)
+    for start in range(0, rows, batch_size):
+        batch = []
+        for _ in range(min(batch_size, rows - start)):
+            minor = rng.randint(-10 ** (scale + 5), 10 ** (scale + 5))
+            batch.append((money.to_decimal(minor, currency), minor))
+        cursor.executemany(f'INSERT INTO {TABLE} (amount, amount_minor) VALUES (%s, %s)', batch)
+
+
+def timed(label, fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--currency', default='BTC', choices=sorted(money.SCALES))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with connection.cursor() as cursor:
+        print(f"Filling {args.rows} rows ({connection.vendor})...")
+        fill(cursor, args.rows, args.currency)
+
+        def db_sum(column):
+            cursor.execute(f'SELECT SUM({column}) FROM {TABLE}')
+            return cursor.fetchone()[0]
+
+        decimal_total = timed('SQL SUM(NUMERIC)', lambda: db_sum('amount'), args.repeat)
+        minor_total = timed('SQL SUM(BIGINT)', lambda: db_sum('amount_minor'), args.repeat)
+
+        cursor.execute(f'SELECT amount_minor FROM {TABLE}')
+        ints = [int(minor) for minor, in cursor.fetchall()]
+        # Built from the exact values: SQLite hands NUMERIC back as float
+        decimals = [money.to_decimal(minor, args.currency) for minor in ints]
+        python_decimal = timed('Python sum(Decimal)', lambda: sum(decimals, Decimal(0)), args.repeat)
+        python_int = timed('Python sum(int)', lambda: sum(ints), args.repeat)
+
+        cursor.execute(f'DROP TABLE {TABLE}')
+
+    exact_total = money.to_decimal(minor_total, args.currency)
+    print()
+    print(f"SQL SUM(BIGINT):  {exact_total:f}")
+    print(f"SQL SUM(NUMERIC): {decimal_total} (off by {Decimal(str(decimal_total)) - exact_total:f})")
+    exact = money.to_minor(python_decimal, args.currency) == python_int == minor_total
+    print(f"Python totals agree with SUM(BIGINT): {exact}")
+    return 0 if exact else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
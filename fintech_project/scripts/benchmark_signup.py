@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Benchmark for account provisioning on signup.
+
+Creates throwaway accounts two ways: the old verify_registration steps
+(User.objects.create, a post_save signal inserting the NGN and KES
+wallets one row at a time, the profile, then get_or_create on the NGN
+wallet, all in autocommit) and AccountProvisioningService.provision_user
+(one transaction, wallets in one bulk_create). It reports signups per
+second and queries per signup, and checks that every account ends up
+with a profile and both default wallets:
+
+    DATABASE_URL=postgres://... python scripts/benchmark_signup.py --signups 2000 --threads 8
+
+Use a scratch database. SQLite allows a single writer, so it runs with
+one thread there.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fintech_project.settings')
+
+import django
+
+django.setup()
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import Wallet, UserProfile
+from core.account_service import AccountProvisioningService, DEFAULT_WALLET_CURRENCIES
+
+PREFIX = 'bench-signup-'
+
+
+def legacy_signup(email, full_name, password_hash):
+    """verify_registration and the post_save signal before provision_user"""
+    user = User(
+        username=email,
+        email=email,
+        password=password_hash,
+        first_name=full_name.split(' ')[0],
+        last_name=' '.join(full_name.split(' ')[1:]),
+    )
+    # The current signal is skipped; its old per-row inserts are replayed below
+    user._skip_default_wallets = True
+    user.save()
+    for currency in DEFAULT_WALLET_CURRENCIES:
+        Wallet.objects.create(owner=user, currency=currency)
+    UserProfile.objects.create(user=user, full_name=full_name)
+    Wallet.objects.get_or_create(owner=user, currency='NGN')
+    return user
+
+
+def provision_signup(email, full_name, password_hash):
+    return AccountProvisioningService.provision_user(email, full_name, password_hash)[0]
+
+
+def run(signup, label, count, threads, password_hash):
+    def work(i):
+        try:
+            signup(f'{PREFIX}{label}-{i}@example.com', f'Bench User {i}', password_hash)
+        finally:
+            connection.close()
+
+    # Query count from one extra signup on this thread
+    with CaptureQueriesContext(connection) as queries:
+        signup(f'{PREFIX}{label}-probe@example.com', 'Bench Probe', password_hash)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, range(count)))
+    elapsed = time.perf_counter() - started
+    return elapsed, len(queries.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--signups', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    threads = 1 if connection.vendor == 'sqlite' else args.threads
+    # Hashing is benchmarked separately; every account shares one hash
+    password_hash = make_password('benchmark-password')
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+    try:
+        print(f"{args.signups} signups per mode, {threads} threads ({connection.vendor})")
+        for label, signup in (('legacy', legacy_signup), ('provision', provision_signup)):
+            elapsed, queries = run(signup, label, args.signups, threads, password_hash)
+            print(f"{label:<12} {elapsed:8.2f} s {args.signups / elapsed:10.0f} signups/s {queries:4d} queries/signup")
+
+        users = User.objects.filter(username__startswith=PREFIX)
+        complete = (
+            users.filter(profile__isnull=False).count() == users.count()
+            and Wallet.objects.filter(owner__in=users).count() == users.count() * len(DEFAULT_WALLET_CURRENCIES)
+        )
+        print(f"\nEvery account has a profile and its default wallets: {complete}")
+        return 0 if complete else 1
+    finally:
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
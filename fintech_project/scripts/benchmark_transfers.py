@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""Benchmark for P2P transfers contending on a few popular recipient wallets.
+
+Creates throwaway users, one funded NGN wallet each. A pool of threads
+sends transfers from every sender to a handful of hot recipients, first
+as instant transfers and then queued and settled in batches. It reports
+the throughput of each mode and checks that every wallet still equals
+the sum of its ledger:
+
+    DATABASE_URL=postgres://... python scripts/benchmark_transfers.py --senders 500 --recipients 3
+
+Use a scratch database. SQLite allows a single writer, so it runs with
+one thread there.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fintech_project.settings')
+
+import django
+
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+from core.models import Wallet, Transaction
+from core.balance_adjustments import BalanceAdjustmentService
+from core.transfers import TransferService
+
+PREFIX = 'bench-transfer-'
+CURRENCY = 'NGN'
+
+
+def setup(senders, recipients):
+    # bulk_create skips the signal that opens default wallets
+    User.objects.bulk_create([
+        User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com')
+        for i in range(senders + recipients)
+    ])
+    users = list(User.objects.filter(username__startswith=PREFIX).order_by('id'))
+    Wallet.objects.bulk_create([Wallet(owner=user, currency=CURRENCY) for user in users])
+    wallets = list(Wallet.objects.filter(owner__in=users).select_related('owner').order_by('id'))
+    BalanceAdjustmentService.credit(
+        Wallet.objects.filter(id__in=[w.id for w in wallets[:senders]]), {CURRENCY: Decimal('1000000')}, 'Benchmark funding'
+    )
+    return wallets[:senders], wallets[senders:]
+
+
+def run_threads(fn, jobs, threads):
+    def work(job):
+        try:
+            return fn(*job)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, jobs))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--senders', type=int, default=200)
+    parser.add_argument('--recipients', type=int, default=3, help='Hot recipient wallets')
+    parser.add_argument('--per-sender', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=TransferService.BATCH_SIZE)
+    args = parser.parse_args()
+
+    threads = 1 if connection.vendor == 'sqlite' else args.threads
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+    try:
+        senders, recipients = setup(args.senders, args.recipients)
+        rng = random.Random(42)
+        jobs = [
+            (sender, rng.choice(recipients), 100)
+            for sender in senders
+            for _ in range(args.per_sender)
+        ]
+        rng.shuffle(jobs)
+        print(f"{len(jobs)} transfers, {args.senders} senders -> {args.recipients} recipients, "
+              f"{threads} threads ({connection.vendor})")
+
+        elapsed = run_threads(TransferService.transfer, jobs, threads)
+        print(f"{'Instant transfer()':<28} {elapsed:8.2f} s {len(jobs) / elapsed:10.0f} /s")
+
+        queue_elapsed = run_threads(TransferService.queue, jobs, threads)
+        print(f"{'queue()':<28} {queue_elapsed:8.2f} s {len(jobs) / queue_elapsed:10.0f} /s")
+
+        started = time.perf_counter()
+        batches = 0
+        while TransferService.settle_batch(args.batch_size) != (0, 0):
+            batches += 1
+        settle_elapsed = time.perf_counter() - started
+        print(f"{'settle_batch()':<28} {settle_elapsed:8.2f} s {len(jobs) / settle_elapsed:10.0f} /s ({batches} batches)")
+        total = queue_elapsed + settle_elapsed
+        print(f"{'Queued end to end':<28} {total:8.2f} s {len(jobs) / total:10.0f} /s")
+
+        wallet_ids = [w.id for w in senders + recipients]
+        ledger = dict(
+            Transaction.objects.filter(wallet_id__in=wallet_ids)
+            .values('wallet_id').annotate(total=Sum('amount_minor')).values_list('wallet_id', 'total')
+        )
+        balances = Wallet.objects.filter(id__in=wallet_ids).values_list('id', 'balance_minor', 'held_minor')
+        consistent = all(ledger.get(wallet_id, 0) == balance and held == 0 for wallet_id, balance, held in balances)
+        print(f"\nBalances match ledger, no funds left held: {consistent}")
+        return 0 if consistent else 1
+    finally:
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
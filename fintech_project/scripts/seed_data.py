@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
-from core.models import Wallet, Transaction
+from core.models import Wallet
+from core import money
+from core.balance_adjustments import BalanceAdjustmentService
+from core.transfers import TransferService
 from decimal import Decimal
 
 User = get_user_model()
@@ -16,10 +19,10 @@ for username, email, password in [
     u.save()
 
 def create_wallet(user, currency, balance):
-    w, created = Wallet.objects.get_or_create(owner=user, currency=currency, defaults={'balance': Decimal(str(balance))})
-    if not created:
-        w.balance = Decimal(str(balance))
-        w.save()
+    w, created = Wallet.objects.get_or_create(owner=user, currency=currency)
+    # Booked as an adjustment so the ledger matches the balance
+    BalanceAdjustmentService.set_balance(w.id, money.to_minor(balance, currency), 'Seed opening balance')
+    w.refresh_from_db()
     return w
 
 alice = User.objects.get(username='alice')
@@ -31,12 +34,8 @@ create_wallet(bob, 'KES', 5000)
 create_wallet(bob, 'BTC', Decimal('0.01'))
 
 # sample transfer: alice -> bob 0.005 BTC
-w_alice_btc = Wallet.objects.get(owner=alice, currency='BTC')
-w_bob_btc = Wallet.objects.get(owner=bob, currency='BTC')
-Transaction.objects.create(wallet=w_alice_btc, type='TRANSFER', amount=Decimal('0.005'), counterparty='bob', metadata={'to_wallet': w_bob_btc.id})
-w_alice_btc.balance -= Decimal('0.005')
-w_alice_btc.save()
-w_bob_btc.balance += Decimal('0.005')
-w_bob_btc.save()
+w_alice_btc = Wallet.objects.select_related('owner').get(owner=alice, currency='BTC')
+w_bob_btc = Wallet.objects.select_related('owner').get(owner=bob, currency='BTC')
+TransferService.transfer(w_alice_btc, w_bob_btc, money.to_minor(Decimal('0.005'), 'BTC'), 'Seed transfer')
 
 print('Seed complete: admin/alice/bob created with wallets.')
@@ -741,10 +741,10 @@ const WithdrawModal = ({ account, onClose }) => {
                 onChange={(e) => setAmount(e.target.value)}
                 className="w-full p-3 bg-slate-700 border border-slate-600 rounded-lg text-white focus:outline-none focus:ring-2 focus:ring-red-500"
                 placeholder={`Enter ${account.currency} amount`}
-                max={account.balance}
+                max={account.available_balance}
                 required
               />
-              <p className="text-xs text-slate-400 mt-1">Available: {account.balance} {account.currency}</p>
+              <p className="text-xs text-slate-400 mt-1">Available: {account.available_balance} {account.currency}</p>
             </div>
             
             <div>
@@ -830,7 +830,7 @@ const ConvertModal = ({ account, onClose }) => {
         headers: { Authorization: `Bearer ${token}` }
       });
       
-      alert(`Conversion successful! You received ${response.data.converted_amount.toFixed(6)} ${toCurrency}`);
+      alert(`Conversion successful! You received ${parseFloat(response.data.converted_amount).toFixed(6)} ${toCurrency}`);
       onClose();
       window.location.reload();
     } catch (error) {
@@ -859,9 +859,9 @@ const ConvertModal = ({ account, onClose }) => {
               onChange={(e) => setAmount(e.target.value)}
               className="w-full p-3 bg-slate-700 border border-slate-600 rounded-lg text-white focus:outline-none focus:ring-2 focus:ring-purple-500"
               placeholder={`Enter ${account.currency} amount`}
-              max={account.balance}
+              max={account.available_balance}
             />
-            <p className="text-xs text-slate-400 mt-1">Available: {account.balance} {account.currency}</p>
+            <p className="text-xs text-slate-400 mt-1">Available: {account.available_balance} {account.currency}</p>
           </div>
           
           <div>
@@ -922,7 +922,7 @@ const ExchangeModal = ({ account, onClose }) => {
         headers: { Authorization: `Bearer ${token}` }
       });
       
-      alert(`Exchange successful! You received ${response.data.converted_amount.toFixed(2)} ${toFiat}`);
+      alert(`Exchange successful! You received ${parseFloat(response.data.converted_amount).toFixed(2)} ${toFiat}`);
       onClose();
       window.location.reload();
     } catch (error) {
@@ -952,10 +952,10 @@ const ExchangeModal = ({ account, onClose }) => {
               onChange={(e) => setAmount(e.target.value)}
               className="w-full p-3 bg-slate-700 border border-slate-600 rounded-lg text-white focus:outline-none focus:ring-2 focus:ring-blue-500"
               placeholder={`Enter ${account.currency} amount`}
-              max={account.balance}
+              max={account.available_balance}
               required
             />
-            <p className="text-xs text-slate-400 mt-1">Available: {account.balance} {account.currency}</p>
+            <p className="text-xs text-slate-400 mt-1">Available: {account.available_balance} {account.currency}</p>
           </div>
           
           <div>
@@ -41,7 +41,8 @@ const Transactions = () => {
       DEPOSIT: 'arrow-down-left',
       WITHDRAW: 'arrow-up-right', 
       TRANSFER: 'arrow-left-right',
-      CONVERT: 'arrow-repeat'
+      CONVERT: 'arrow-repeat',
+      ADJUSTMENT: 'sliders'
     };
     return icons[type] || 'circle';
   };
@@ -51,7 +52,8 @@ const Transactions = () => {
       DEPOSIT: 'bg-green-500/20 text-green-400',
       WITHDRAW: 'bg-red-500/20 text-red-400',
       TRANSFER: 'bg-blue-500/20 text-blue-400',
-      CONVERT: 'bg-purple-500/20 text-purple-400'
+      CONVERT: 'bg-purple-500/20 text-purple-400',
+      ADJUSTMENT: 'bg-yellow-500/20 text-yellow-400'
     };
     return colors[type] || 'bg-gray-500/20 text-gray-400';
   };
@@ -85,6 +87,7 @@ const Transactions = () => {
             <option value="WITHDRAW">Withdrawals</option>
             <option value="TRANSFER">Transfers</option>
             <option value="CONVERT">Conversions</option>
+            <option value="ADJUSTMENT">Adjustments</option>
           </select>
         </div>
 